@@ -9,13 +9,15 @@ from uvloop import install
 install()
 from asyncio import Lock, new_event_loop, set_event_loop
 from logging import ERROR, INFO, WARNING, FileHandler, StreamHandler, basicConfig, getLogger
-from os import cpu_count
 from time import time
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from integrations.sabnzbdapi import SabnzbdClient
 
+from .core.task_index import TaskDict
+from .core.task_queue import FairQueue
+
 getLogger("requests").setLevel(WARNING)
 getLogger("urllib3").setLevel(WARNING)
 getLogger("pyrogram").setLevel(ERROR)
@@ -37,9 +39,6 @@ basicConfig(
 )
 
 LOGGER = getLogger(__name__)
-cpu_no = cpu_count()
-threads = max(1, cpu_no // 2)
-cores = ",".join(str(i) for i in reversed(range(threads)))
 
 DOWNLOAD_DIR = "/app/downloads/"
 intervals = {"status": {}, "qb": "", "jd": "", "nzb": "", "stopAll": False}
@@ -50,10 +49,10 @@ user_data = {}
 aria2_options = {}
 qbit_options = {}
 nzb_options = {}
-queued_dl = {}
-queued_up = {}
+queued_dl = FairQueue()
+queued_up = FairQueue()
 status_dict = {}
-task_dict = {}
+task_dict = TaskDict()
 rss_dict = {}
 auth_chats = {}
 excluded_extensions = ["aria2", "!qB"]
@@ -66,11 +65,9 @@ non_queued_dl = set()
 non_queued_up = set()
 multi_tags = set()
 task_dict_lock = Lock()
-queue_dict_lock = Lock()
 qb_listener_lock = Lock()
 nzb_listener_lock = Lock()
 jd_listener_lock = Lock()
-cpu_eater_lock = Lock()
 same_directory_lock = Lock()
 
 sabnzbd_client = SabnzbdClient(
@@ -91,6 +88,7 @@ ui_settings = {
         "cpu": 90,
         "ram": 90,
         "disk": 95,
+        "net": 0,
         "last_trigger": 0,
     },
 }
@@ -0,0 +1,115 @@
+from asyncio import Lock, gather
+from time import monotonic
+
+from .. import LOGGER
+
+ARIA2_STATUS_KEYS = [
+    "gid",
+    "status",
+    "totalLength",
+    "completedLength",
+    "uploadLength",
+    "downloadSpeed",
+    "uploadSpeed",
+    "numSeeders",
+    "connections",
+    "seeder",
+    "followedBy",
+    "following",
+    "errorCode",
+    "errorMessage",
+    "dir",
+    "files",
+    "bittorrent",
+]
+
+
+class Aria2Snapshot:
+    """In-memory view of every aria2 download, refreshed in one batch per tick.
+
+    Readers share the same snapshot: the first caller after ``max_age`` seconds
+    fetches active, waiting and stopped downloads with a ``keys`` projection,
+    concurrent callers wait on the same fetch instead of issuing their own.
+    ``followedBy`` redirections (metadata -> torrent) are tracked so a stale
+    gid always resolves to the download that replaced it.
+    """
+
+    def __init__(self, client, max_age=1.0, batch=1000):
+        self.client = client
+        self.max_age = max_age
+        self.batch = batch
+        self._downloads = {}
+        self._redirects = {}
+        self._stamp = 0
+        self._lock = Lock()
+
+    def _store(self, download):
+        gid = download.get("gid")
+        if not gid:
+            return
+        self._downloads[gid] = download
+        if followed := download.get("followedBy"):
+            self._redirects[gid] = followed[0]
+
+    async def refresh(self, force=False):
+        if not force and monotonic() - self._stamp < self.max_age:
+            return
+        stamp = self._stamp
+        async with self._lock:
+            if self._stamp != stamp:
+                return
+            try:
+                active, waiting, stopped = await gather(
+                    self.client.tellActive(ARIA2_STATUS_KEYS),
+                    self.client.tellWaiting(0, self.batch, ARIA2_STATUS_KEYS),
+                    self.client.tellStopped(0, self.batch, ARIA2_STATUS_KEYS),
+                )
+            except Exception as e:
+                LOGGER.error(f"{e}: Aria2c, Error while refreshing snapshot")
+                self._stamp = monotonic()
+                return
+            self._downloads = {}
+            for download in (*active, *waiting, *stopped):
+                self._store(download)
+            self._stamp = monotonic()
+
+    def resolve(self, gid):
+        seen = set()
+        while gid in self._redirects and gid not in seen:
+            seen.add(gid)
+            gid = self._redirects[gid]
+        return gid
+
+    async def fetch(self, gid):
+        download = await self.client.tellStatus(gid, ARIA2_STATUS_KEYS)
+        if download:
+            self._store(download)
+        return download
+
+    async def get(self, gid, old_info=None):
+        await self.refresh()
+        gid = self.resolve(gid)
+        if download := self._downloads.get(gid):
+            return download
+        try:
+            download = await self.fetch(gid)
+            if (new_gid := self.resolve(gid)) != gid:
+                download = self._downloads.get(new_gid) or await self.fetch(new_gid)
+            return download or old_info
+        except Exception as e:
+            LOGGER.error(f"{e}: Aria2c, Error while getting torrent info")
+            return old_info
+
+    def peek(self, gid):
+        return self._downloads.get(self.resolve(gid))
+
+    def downloads(self, status=None):
+        if status is None:
+            return list(self._downloads.values())
+        return [d for d in self._downloads.values() if d.get("status") == status]
+
+    def discard(self, gid):
+        self._downloads.pop(gid, None)
+        for src, dst in list(self._redirects.items()):
+            if gid in (src, dst):
+                del self._redirects[src]
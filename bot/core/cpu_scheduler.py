@@ -0,0 +1,151 @@
+from asyncio import CancelledError, get_running_loop
+from collections import deque
+from contextlib import asynccontextmanager
+from os import cpu_count, getloadavg, sched_getaffinity
+from time import monotonic
+
+from .metrics import metrics
+
+
+class CpuSlot:
+    __slots__ = ("kind", "cpus")
+
+    def __init__(self, kind, cpus):
+        self.kind = kind
+        self.cpus = cpus
+
+    @property
+    def cores(self):
+        return ",".join(str(cpu) for cpu in self.cpus)
+
+    @property
+    def threads(self):
+        return len(self.cpus)
+
+    def taskset(self):
+        return ["taskset", "-c", self.cores]
+
+
+class CpuScheduler:
+    """Hands out disjoint CPU sets to ffmpeg and 7z jobs.
+
+    Heavy jobs (conversions, custom ffmpeg commands, archives) ask for half of
+    the pool and light ones (thumbnails, screenshots, splits) for a single
+    core. A job gets at most what is free when its turn comes and is queued
+    in arrival order while no core is free. When the load average shows the
+    machine is already saturated by other processes, new grants are halved.
+    One core is kept out of the pool on machines with more than two CPUs so
+    that the bot itself stays responsive. ``throttle`` caps how many cores
+    may be handed out at once while the auto-pause controller sees pressure.
+    """
+
+    HEAVY = {"ffmpeg", "convert", "sample", "extract", "compress"}
+
+    def __init__(self, cpus=None):
+        if cpus is None:
+            try:
+                cpus = sched_getaffinity(0)
+            except (AttributeError, OSError):
+                cpus = range(cpu_count() or 1)
+        cpus = sorted(cpus)
+        self._pool = cpus[1:] if len(cpus) > 2 else cpus
+        self._free = list(self._pool)
+        self._waiters = deque()
+        self._cap = None
+
+    @property
+    def total(self):
+        return len(self._pool)
+
+    def _load(self):
+        try:
+            return getloadavg()[0]
+        except OSError:
+            return 0
+
+    def _want(self, kind, want):
+        if want is None:
+            want = max(1, self.total // 2) if kind in self.HEAVY else 1
+        want = max(1, min(want, self.total))
+        busy = self.total - len(self._free)
+        if want > 1 and self._load() - busy > self.total:
+            want = max(1, want // 2)
+        return want
+
+    def _available(self):
+        if self._cap is None:
+            return len(self._free)
+        return min(len(self._free), self._cap - (self.total - len(self._free)))
+
+    def _allocate(self, kind, want):
+        if (available := self._available()) <= 0:
+            return None
+        count = min(self._want(kind, want), available)
+        cpus = self._free[-count:]
+        del self._free[-count:]
+        return CpuSlot(kind, cpus)
+
+    def _publish(self):
+        metrics.record_cpu_scheduler(
+            sum(not future.done() for future, *_ in self._waiters),
+            self.total - len(self._free),
+        )
+
+    def _wake(self):
+        while self._waiters:
+            future, kind, want, queued_at = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if (slot := self._allocate(kind, want)) is None:
+                break
+            self._waiters.popleft()
+            future.set_result(slot)
+            metrics.record_cpu_job_wait(kind, monotonic() - queued_at)
+        self._publish()
+
+    async def acquire(self, kind, want=None):
+        if not any(not future.done() for future, *_ in self._waiters):
+            if (slot := self._allocate(kind, want)) is not None:
+                metrics.record_cpu_job_wait(kind, 0)
+                self._publish()
+                return slot
+        future = get_running_loop().create_future()
+        self._waiters.append((future, kind, want, monotonic()))
+        self._publish()
+        try:
+            return await future
+        except CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(future.result())
+            else:
+                self._wake()
+            raise
+
+    def release(self, slot):
+        self._free.extend(slot.cpus)
+        self._free.sort()
+        slot.cpus = []
+        self._wake()
+
+    def throttle(self, cores=None):
+        self._cap = None if cores is None else max(1, min(cores, self.total))
+        self._wake()
+
+    @asynccontextmanager
+    async def job(self, kind, want=None):
+        slot = await self.acquire(kind, want)
+        try:
+            yield slot
+        finally:
+            self.release(slot)
+
+    def stats(self):
+        return {
+            "total": self.total,
+            "free": len(self._free),
+            "queued": sum(not future.done() for future, *_ in self._waiters),
+        }
+
+
+cpu_scheduler = CpuScheduler()
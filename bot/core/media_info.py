@@ -7,7 +7,7 @@ Provides detailed codec, resolution, bitrate, and quality information.
 Technologies:
 - FFprobe: Media file analysis (part of FFmpeg)
 - subprocess: Execute FFprobe commands
-- json: Parse FFprobe JSON output
+- MediaProbe: Shared, memoized FFprobe results
 
 Use Cases:
 - Pre-download quality verification
@@ -20,12 +20,13 @@ Created: 2026-01-30
 """
 
 import asyncio
-import json
 import logging
 import os
 from typing import Optional, Dict, List
 from pathlib import Path
 
+from ..helper.ext_utils.media_utils import MediaProbe
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -86,31 +87,11 @@ class MediaInfoExtractor:
                 LOGGER.error(f"File not found: {file_path}")
                 return None
             
-            # Run ffprobe command
-            cmd = [
-                self.ffprobe_path,
-                '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_format',
-                '-show_streams',
-                file_path
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                LOGGER.error(f"FFprobe error: {stderr.decode()}")
+            # Single shared ffprobe run, memoized per (path, size, mtime)
+            data = await MediaProbe.probe(file_path)
+            if data is None:
                 return None
             
-            # Parse JSON output
-            data = json.loads(stdout.decode())
-            
             # Process and organize information
             media_info = {
                 'format': self._parse_format(data.get('format', {})),
@@ -133,12 +114,6 @@ class MediaInfoExtractor:
             
             return media_info
             
-        except FileNotFoundError:
-            LOGGER.error("FFprobe not found. Install FFmpeg package.")
-            return None
-        except json.JSONDecodeError as e:
-            LOGGER.error(f"Failed to parse FFprobe output: {e}")
-            return None
         except Exception as e:
             LOGGER.error(f"Media info extraction error: {e}")
             return None
@@ -191,6 +191,40 @@ class MetricsCollector:
             registry=self._registry
         )
         
+        self.cpu_jobs_queued = Gauge(
+            'mltb_cpu_jobs_queued',
+            'Number of ffmpeg/7z jobs waiting for CPU cores',
+            registry=self._registry
+        )
+        
+        self.cpu_cores_allocated = Gauge(
+            'mltb_cpu_cores_allocated',
+            'Number of CPU cores currently handed to ffmpeg/7z jobs',
+            registry=self._registry
+        )
+        
+        self.tasks_queued = Gauge(
+            'mltb_tasks_queued',
+            'Number of tasks waiting in the download/upload queue',
+            ['lane'],
+            registry=self._registry
+        )
+        
+        self.tasks_running = Gauge(
+            'mltb_tasks_running',
+            'Number of tasks holding a download/upload queue slot',
+            ['lane'],
+            registry=self._registry
+        )
+        
+        self.cpu_job_wait_seconds = Histogram(
+            'mltb_cpu_job_wait_seconds',
+            'Time ffmpeg/7z jobs waited for CPU cores',
+            ['kind'],
+            buckets=[0.1, 1, 5, 15, 60, 300, 900, 3600],
+            registry=self._registry
+        )
+        
         # ==================== ERROR METRICS ====================
         self.errors_total = Counter(
             'mltb_errors_total',
@@ -305,6 +339,29 @@ class MetricsCollector:
         
         self.cache_misses.labels(cache_type=cache_type).inc()
     
+    def record_cpu_scheduler(self, queued: int, allocated: int):
+        """Record CPU scheduler queue depth and allocated cores"""
+        if not self._enabled:
+            return
+        
+        self.cpu_jobs_queued.set(queued)
+        self.cpu_cores_allocated.set(allocated)
+    
+    def record_cpu_job_wait(self, kind: str, seconds: float):
+        """Record how long a job waited for CPU cores"""
+        if not self._enabled:
+            return
+        
+        self.cpu_job_wait_seconds.labels(kind=kind).observe(seconds)
+    
+    def record_task_queue(self, lane: str, queued: int, running: int):
+        """Record download/upload queue depth and occupied slots"""
+        if not self._enabled:
+            return
+        
+        self.tasks_queued.labels(lane=lane).set(queued)
+        self.tasks_running.labels(lane=lane).set(running)
+    
     # ==================== SYSTEM MONITORING ====================
     
     def update_system_metrics(self):
@@ -0,0 +1,50 @@
+from time import monotonic
+
+
+class PressureController:
+    """Decides when the auto-pause loop should pause or resume downloads.
+
+    Every sample is folded into an exponential moving average per signal so
+    that a single spike does not pause anything. A signal enters pressure
+    once its average reaches the threshold and only leaves it after falling
+    ``BAND`` below it; the loop resumes work only after every signal has
+    stayed calm for ``HOLD`` seconds. Signals without a threshold are
+    tracked but never cause pressure.
+    """
+
+    ALPHA = 0.3
+    BAND = 0.05
+    HOLD = 60
+
+    def __init__(self):
+        self.levels = {}
+        self.active = set()
+        self._calm_since = None
+
+    def sample(self, readings, thresholds, now=None):
+        now = monotonic() if now is None else now
+        for name, value in readings.items():
+            if (level := self.levels.get(name)) is None:
+                level = value
+            else:
+                level += self.ALPHA * (value - level)
+            self.levels[name] = level
+            if not (limit := thresholds.get(name)):
+                self.active.discard(name)
+            elif level >= limit:
+                self.active.add(name)
+            elif level < limit * (1 - self.BAND):
+                self.active.discard(name)
+        if self.active:
+            self._calm_since = None
+            return "pause"
+        if self._calm_since is None:
+            self._calm_since = now
+        if now - self._calm_since >= self.HOLD:
+            return "resume"
+        return None
+
+    def reset(self):
+        self.levels.clear()
+        self.active.clear()
+        self._calm_since = None
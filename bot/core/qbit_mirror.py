@@ -0,0 +1,152 @@
+from asyncio import Lock
+from datetime import datetime, timedelta
+from time import monotonic
+
+from .. import LOGGER
+
+
+def _as_dict(obj):
+    if obj is None:
+        return {}
+    if isinstance(obj, dict):
+        return obj
+    try:
+        fields = vars(obj)
+    except TypeError:
+        fields = {k: getattr(obj, k, None) for k in getattr(obj, "__slots__", ())}
+    return {k: v for k, v in fields.items() if v is not None}
+
+
+def _to_timedelta(value):
+    if isinstance(value, timedelta):
+        return value
+    return timedelta(seconds=int(value or 0))
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromtimestamp(int(value if value is not None else -1))
+
+
+def _to_tags(value):
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [t.strip() for t in (value or "").split(",") if t.strip()]
+
+
+_CONVERTERS = {
+    "eta": _to_timedelta,
+    "seeding_time": _to_timedelta,
+    "time_active": _to_timedelta,
+    "added_on": _to_datetime,
+    "completion_on": _to_datetime,
+    "last_activity": _to_datetime,
+    "tags": _to_tags,
+}
+
+
+class QbTorrent:
+    """Mirrored torrent row exposing the same attributes as ``TorrentInfo``.
+
+    ``sync/maindata`` only sends the fields that changed since the previous
+    ``rid``, so the raw fields are patched in place and converted on access.
+    """
+
+    __slots__ = ("hash", "_fields")
+
+    def __init__(self, hash_, fields):
+        self.hash = hash_
+        self._fields = dict(fields)
+
+    def patch(self, fields):
+        self._fields.update(fields)
+
+    def __getattr__(self, key):
+        if key.startswith("__"):
+            raise AttributeError(key)
+        value = self._fields.get(key)
+        if converter := _CONVERTERS.get(key):
+            return converter(value)
+        return value
+
+
+class QbittorrentMirror:
+    """Hash-indexed local copy of qBittorrent state kept in sync through the
+    ``sync/maindata`` rid delta protocol.
+
+    Every refresh only transfers torrents whose fields changed since the last
+    response. A lost or rejected rid falls back to a full update on the next
+    call, and ``refresh`` returns False until a sync succeeds again. A tag
+    index maps the bot's per-task tags to torrent hashes.
+    """
+
+    def __init__(self, client, max_age=1.0):
+        self.client = client
+        self.max_age = max_age
+        self.server_state = {}
+        self._rid = 0
+        self._torrents = {}
+        self._tags = {}
+        self._stamp = 0
+        self._synced = False
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._torrents)
+
+    def _unindex(self, torrent):
+        for tag in torrent.tags:
+            if self._tags.get(tag) == torrent.hash:
+                del self._tags[tag]
+
+    def _apply(self, data):
+        if data.get("full_update"):
+            self._torrents = {}
+            self._tags = {}
+            self.server_state = {}
+        for hash_, fields in (data.get("torrents") or {}).items():
+            fields = _as_dict(fields)
+            if torrent := self._torrents.get(hash_):
+                if "tags" in fields:
+                    self._unindex(torrent)
+                torrent.patch(fields)
+            else:
+                torrent = self._torrents[hash_] = QbTorrent(hash_, fields)
+            if "tags" in fields:
+                for tag in torrent.tags:
+                    self._tags[tag] = hash_
+        for hash_ in data.get("torrents_removed") or []:
+            if torrent := self._torrents.pop(hash_, None):
+                self._unindex(torrent)
+        self.server_state.update(_as_dict(data.get("server_state")))
+        self._rid = data.get("rid", 0)
+
+    async def refresh(self, force=False):
+        if not force and monotonic() - self._stamp < self.max_age:
+            return self._synced
+        stamp = self._stamp
+        async with self._lock:
+            if self._stamp != stamp:
+                return self._synced
+            try:
+                data = await self.client.sync.maindata(self._rid)
+                self._apply(_as_dict(data))
+                self._synced = True
+            except Exception as e:
+                LOGGER.error(f"{e}: Qbittorrent, while syncing maindata")
+                self._rid = 0
+                self._synced = False
+            self._stamp = monotonic()
+            return self._synced
+
+    def get(self, hash_):
+        return self._torrents.get(hash_)
+
+    def get_by_tag(self, tag):
+        if hash_ := self._tags.get(tag):
+            return self._torrents.get(hash_)
+        return None
+
+    def torrents(self):
+        return list(self._torrents.values())
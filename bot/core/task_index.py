@@ -0,0 +1,94 @@
+class TaskDict(dict):
+    """``task_dict`` with secondary gid and tag indexes.
+
+    Entries are keyed by listener mid as before. Every add, replace or remove
+    keeps ``gid -> mid`` and ``tag -> mid`` in step, so lookups are O(1) and
+    never need to refresh task state. Status objects whose gid changes after
+    creation (aria2 ``followedBy``, qBittorrent hashes) register the new gid
+    through ``reindex`` or ``alias``; old aliases stay valid until the entry
+    is removed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._by_gid = {}
+        self._by_tag = {}
+        self._aliases = {}
+        self.update(*args, **kwargs)
+
+    def _link(self, mid, gid):
+        if not gid:
+            return
+        self._by_gid[gid] = mid
+        self._aliases.setdefault(mid, set()).add(gid)
+
+    def _index(self, mid, task):
+        try:
+            gid = task.gid()
+        except Exception:
+            gid = None
+        self._link(mid, gid)
+        self._by_tag[f"{mid}"] = mid
+
+    def _unindex(self, mid):
+        for gid in self._aliases.pop(mid, ()):
+            if self._by_gid.get(gid) == mid:
+                del self._by_gid[gid]
+        self._by_tag.pop(f"{mid}", None)
+
+    def __setitem__(self, mid, task):
+        if mid in self:
+            self._unindex(mid)
+        super().__setitem__(mid, task)
+        self._index(mid, task)
+
+    def __delitem__(self, mid):
+        super().__delitem__(mid)
+        self._unindex(mid)
+
+    def pop(self, mid, *default):
+        if mid in self:
+            self._unindex(mid)
+        return super().pop(mid, *default)
+
+    def popitem(self):
+        mid, task = super().popitem()
+        self._unindex(mid)
+        return mid, task
+
+    def setdefault(self, mid, task=None):
+        if mid not in self:
+            self[mid] = task
+        return self[mid]
+
+    def update(self, *args, **kwargs):
+        for mid, task in dict(*args, **kwargs).items():
+            self[mid] = task
+
+    def clear(self):
+        super().clear()
+        self._by_gid.clear()
+        self._by_tag.clear()
+        self._aliases.clear()
+
+    def _owner(self, task):
+        mid = task.listener.mid
+        return mid if self.get(mid) is task else None
+
+    def reindex(self, task):
+        if (mid := self._owner(task)) is not None:
+            self._index(mid, task)
+
+    def alias(self, gid, task):
+        if (mid := self._owner(task)) is not None:
+            self._link(mid, gid)
+
+    def get_by_gid(self, gid):
+        if (mid := self._by_gid.get(gid)) is not None:
+            return self.get(mid)
+        return None
+
+    def get_by_tag(self, tag):
+        if (mid := self._by_tag.get(f"{tag}")) is not None:
+            return self.get(mid)
+        return None
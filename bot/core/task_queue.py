@@ -0,0 +1,161 @@
+from heapq import heapify, heappop, heappush
+from itertools import count
+from time import monotonic
+
+
+class QueuedTask:
+    __slots__ = ("mid", "user_id", "priority", "cost", "tag", "seq", "queued_at")
+
+    def __init__(self, mid, user_id, priority, cost, tag, seq, queued_at):
+        self.mid = mid
+        self.user_id = user_id
+        self.priority = priority
+        self.cost = cost
+        self.tag = tag
+        self.seq = seq
+        self.queued_at = queued_at
+
+    def key(self, aging):
+        return self.tag + self.queued_at / aging, self.seq
+
+
+class FairQueue(dict):
+    """``queued_dl``/``queued_up`` with weighted-fair ordering.
+
+    Entries are still ``mid -> Event`` so membership tests, ``set()`` on
+    cancel and ``del`` keep working. Each task also gets a virtual finish
+    tag: it starts where its user's previous task finished (or at the
+    queue's current virtual time if that is later) and advances by the
+    task's cost divided by its weight. Tasks are started in tag order, so a
+    user with 200 queued links gets one slot for every slot of a user with a
+    single link instead of running all of them first.
+
+    The weight doubles with every priority level, small tasks cost less than
+    large ones and every ``AGING`` seconds spent waiting take one unit off the
+    tag so that nothing waits forever behind higher priorities. Aging moves
+    every waiting task at the same rate, so the order only changes on push,
+    ``bump``, ``move`` and ``set_priority`` and the head is kept in a heap
+    with lazily dropped stale entries.
+    """
+
+    AGING = 600
+    LARGE = 8 * 1024**3
+
+    def __init__(self):
+        super().__init__()
+        self._meta = {}
+        self._last = {}
+        self._users = {}
+        self._vtime = 0.0
+        self._seq = count()
+        self._heap = []
+
+    @classmethod
+    def cost(cls, size):
+        if not size:
+            return 1.0
+        return 0.5 + min(size, cls.LARGE) / cls.LARGE
+
+    def push(self, mid, event, user_id=None, priority=0, size=0):
+        if mid in self:
+            self._drop(mid)
+        cost = self.cost(size)
+        start = max(self._vtime, self._last.get(user_id, 0.0))
+        tag = start + cost / 2**priority
+        self._last[user_id] = tag
+        self._users[user_id] = self._users.get(user_id, 0) + 1
+        super().__setitem__(mid, event)
+        self._meta[mid] = QueuedTask(
+            mid, user_id, priority, cost, tag, next(self._seq), monotonic()
+        )
+        self._index(mid)
+
+    def _index(self, mid):
+        heappush(self._heap, (*self._meta[mid].key(self.AGING), mid))
+        if len(self._heap) > 2 * len(self._meta) + 16:
+            self._heap = [(*entry.key(self.AGING), mid) for mid, entry in self._meta.items()]
+            heapify(self._heap)
+
+    def __setitem__(self, mid, event):
+        self.push(mid, event)
+
+    def _drop(self, mid):
+        entry = self._meta.pop(mid)
+        if self._users[entry.user_id] == 1:
+            del self._users[entry.user_id]
+            self._last.pop(entry.user_id, None)
+        else:
+            self._users[entry.user_id] -= 1
+        return entry
+
+    def __delitem__(self, mid):
+        super().__delitem__(mid)
+        self._drop(mid)
+
+    def pop(self, mid, *default):
+        if mid in self:
+            self._drop(mid)
+        return super().pop(mid, *default)
+
+    def clear(self):
+        super().clear()
+        self._meta.clear()
+        self._last.clear()
+        self._users.clear()
+        self._heap.clear()
+
+    def start(self, mid):
+        tag = self._meta[mid].tag
+        event = self.pop(mid)
+        self._vtime = max(self._vtime, tag)
+        return event
+
+    def head(self):
+        while self._heap:
+            *key, mid = self._heap[0]
+            if (entry := self._meta.get(mid)) is not None and tuple(key) == entry.key(self.AGING):
+                return mid
+            heappop(self._heap)
+        return None
+
+    def order(self):
+        return sorted(self._meta, key=lambda mid: self._meta[mid].key(self.AGING))
+
+    def position(self, mid):
+        order = self.order()
+        return order.index(mid) + 1 if mid in self else None
+
+    def move(self, mid, index):
+        if mid not in self:
+            return False
+        order = [m for m in self.order() if m != mid]
+        index = max(0, min(index, len(order)))
+        keys = [self._meta[m].key(self.AGING)[0] for m in order]
+        if not keys:
+            return True
+        if index == 0:
+            key = keys[0] - 1
+        elif index == len(keys):
+            key = keys[-1] + 1
+        else:
+            key = (keys[index - 1] + keys[index]) / 2
+        entry = self._meta[mid]
+        entry.tag = key - entry.queued_at / self.AGING
+        entry.seq = self._meta[order[index]].seq - 0.5 if index < len(order) else next(self._seq)
+        self._index(mid)
+        return True
+
+    def bump(self, mid):
+        return self.move(mid, 0)
+
+    def set_priority(self, mid, priority):
+        if (entry := self._meta.get(mid)) is None:
+            return False
+        start = entry.tag - entry.cost / 2**entry.priority
+        entry.tag = max(start, self._vtime) + entry.cost / 2**priority
+        entry.priority = priority
+        self._index(mid)
+        return True
+
+    def stats(self):
+        return {"queued": len(self), "users": dict(self._users), "vtime": self._vtime}
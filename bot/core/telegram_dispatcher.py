@@ -0,0 +1,248 @@
+from asyncio import Event, TimeoutError, get_running_loop, wait_for
+from collections import deque
+from enum import IntEnum
+from time import monotonic
+
+from pyrogram.errors import FloodWait, FloodPremiumWait
+
+from .. import LOGGER
+
+
+class Lane(IntEnum):
+    RESULT = 0
+    STATUS = 1
+    RSS = 2
+
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts to the FloodWaits it observes.
+
+    A FloodWait blocks the bucket for the requested time and halves its rate;
+    every successful send moves the rate back toward ``nominal`` by a small
+    step, so a chat that keeps getting flooded settles on a slower pace.
+    """
+
+    def __init__(self, rate, capacity, floor=None):
+        self.nominal = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.floor = floor or rate / 8
+        self.tokens = capacity
+        self.blocked_until = 0
+        self._stamp = monotonic()
+
+    def _refill(self, now):
+        if (elapsed := now - self._stamp) > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._stamp = now
+
+    def wait_time(self, now=None):
+        if now is None:
+            now = monotonic()
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def idle(self, now=None):
+        if now is None:
+            now = monotonic()
+        self._refill(now)
+        return self.blocked_until <= now and self.tokens >= self.capacity
+
+    def take(self):
+        self._refill(monotonic())
+        self.tokens -= 1
+
+    def penalize(self, seconds):
+        self.blocked_until = max(self.blocked_until, monotonic() + seconds)
+        self.rate = max(self.floor, self.rate / 2)
+        self.tokens = 0
+        self._stamp = self.blocked_until
+
+    def reward(self):
+        self.rate = min(self.nominal, self.rate + self.nominal / 20)
+
+
+class _Job:
+    __slots__ = ("chat_id", "lane", "call", "key", "waiters")
+
+    def __init__(self, chat_id, lane, call, key):
+        self.chat_id = chat_id
+        self.lane = lane
+        self.call = call
+        self.key = key
+        self.waiters = []
+
+    def pending(self):
+        return any(not future.done() for future, _ in self.waiters)
+
+
+class TelegramDispatcher:
+    """Single outbound queue for Telegram sends and edits.
+
+    Every call waits for a token from the global bucket and from its chat's
+    bucket (about one message per second in private chats and twenty per
+    minute in groups) before it is started. Ready jobs are taken by lane, so
+    task results go ahead of status edits and status edits ahead of RSS
+    posts, and a chat serving a flood ban never holds back other chats.
+    Edits queued for the same message are coalesced: only the latest call
+    is sent and every caller receives its result.
+
+    Callers passing ``block=False`` are failed with the FloodWait instead of
+    being retried, and fail fast while their chat is still banned. Buckets of
+    chats that are idle and fully refilled are dropped every
+    ``PRUNE_INTERVAL`` seconds.
+    """
+
+    GLOBAL_RATE = 25
+    PRIVATE_RATE = 1
+    GROUP_RATE = 20 / 60
+    BURST = 3
+    PRUNE_INTERVAL = 600
+
+    def __init__(self):
+        self._global = TokenBucket(self.GLOBAL_RATE, self.GLOBAL_RATE)
+        self._chats = {}
+        self._lanes = {lane: deque() for lane in Lane}
+        self._pending = {}
+        self._wakeup = Event()
+        self._worker = None
+        self._inflight = set()
+        self._pruned = monotonic()
+
+    def _bucket(self, chat_id):
+        if (bucket := self._chats.get(chat_id)) is None:
+            rate = (
+                self.GROUP_RATE if isinstance(chat_id, int) and chat_id < 0 else self.PRIVATE_RATE
+            )
+            bucket = self._chats[chat_id] = TokenBucket(rate, self.BURST)
+        return bucket
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._worker = get_running_loop().create_task(self._run())
+
+    def submit(self, chat_id, call, lane=Lane.RESULT, key=None, block=True):
+        future = get_running_loop().create_future()
+        bucket = self._bucket(chat_id)
+        if not block and (banned := bucket.blocked_until - monotonic()) > 0:
+            future.set_exception(FloodWait(value=int(banned) + 1))
+            return future
+        if key is not None and (job := self._pending.get(key)) is not None:
+            job.call = call
+        else:
+            job = _Job(chat_id, lane, call, key)
+            self._lanes[lane].append(job)
+            if key is not None:
+                self._pending[key] = job
+        job.waiters.append((future, block))
+        self._ensure_worker()
+        self._wakeup.set()
+        return future
+
+    async def acquire(self, chat_id, lane=Lane.RESULT):
+        """Wait for a send slot without routing the call through the queue.
+
+        Used for long running uploads, which must not occupy the dispatcher
+        while their file is transferred.
+        """
+        await self.submit(chat_id, _noop, lane)
+
+    def flood(self, chat_id, seconds):
+        self._bucket(chat_id).penalize(seconds)
+
+    def _prune(self, now):
+        if now - self._pruned < self.PRUNE_INTERVAL:
+            return
+        self._pruned = now
+        queued = {job.chat_id for lane in self._lanes.values() for job in lane}
+        for chat_id, bucket in list(self._chats.items()):
+            if chat_id not in queued and bucket.idle(now):
+                del self._chats[chat_id]
+
+    def _dequeue(self, lane, job):
+        self._lanes[lane].remove(job)
+        if job.key is not None and self._pending.get(job.key) is job:
+            del self._pending[job.key]
+
+    def _next(self):
+        now = monotonic()
+        wait = None
+        global_wait = self._global.wait_time(now)
+        for lane in Lane:
+            for job in list(self._lanes[lane]):
+                if not job.pending():
+                    self._dequeue(lane, job)
+                    continue
+                job_wait = max(global_wait, self._bucket(job.chat_id).wait_time(now))
+                if job_wait == 0:
+                    self._dequeue(lane, job)
+                    return job, None
+                wait = job_wait if wait is None else min(wait, job_wait)
+        return None, wait
+
+    async def _run(self):
+        loop = get_running_loop()
+        while True:
+            job, wait = self._next()
+            if job is None:
+                self._prune(monotonic())
+                self._wakeup.clear()
+                try:
+                    await wait_for(self._wakeup.wait(), wait)
+                except TimeoutError:
+                    pass
+                continue
+            self._global.take()
+            self._bucket(job.chat_id).take()
+            # The loop only keeps weak references to running tasks
+            task = loop.create_task(self._execute(job))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _execute(self, job):
+        try:
+            result = await job.call()
+        except (FloodWait, FloodPremiumWait) as f:
+            LOGGER.warning(str(f))
+            self.flood(job.chat_id, f.value * 1.2)
+            self._retry(job, f)
+            return
+        except Exception as e:
+            for future, _ in job.waiters:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self._bucket(job.chat_id).reward()
+        for future, _ in job.waiters:
+            if not future.done():
+                future.set_result(result)
+
+    def _retry(self, job, error):
+        waiters = []
+        for future, block in job.waiters:
+            if future.done():
+                continue
+            if block:
+                waiters.append((future, block))
+            else:
+                future.set_exception(error)
+        if not waiters:
+            return
+        if job.key is not None and (newer := self._pending.get(job.key)) is not None:
+            newer.waiters.extend(waiters)
+        else:
+            job.waiters = waiters
+            self._lanes[job.lane].appendleft(job)
+            if job.key is not None:
+                self._pending[job.key] = job
+        self._wakeup.set()
+
+
+async def _noop():
+    return None
+
+
+message_dispatcher = TelegramDispatcher()
@@ -1,6 +1,6 @@
 """
 Smart Thumbnail Manager - Intelligent thumbnail generation and caching
-- Cache thumbnails with TTL (7 days)
+- Cache thumbnails by content fingerprint with LRU, size and TTL (7 days) bounds
 - Auto-regenerate if dimensions changed
 - Generate sprite sheets for video
 - Async processing
@@ -12,8 +12,11 @@ Date: February 8, 2026
 
 import hashlib
 import asyncio
+import os
+import time
+from collections import OrderedDict
 from typing import Optional, Dict, Tuple, Any
-from datetime import datetime, timedelta
+from datetime import timedelta
 from pathlib import Path
 import json
 
@@ -21,156 +24,246 @@ from .. import LOGGER
 
 
 class ThumbnailCache:
-    """In-memory + disk cache for thumbnails"""
+    """
+    Content-addressed LRU cache for thumbnails
     
-    def __init__(self, cache_dir: str = "data/thumbnails"):
+    Keys are built from the source size and hashes of sampled head, middle
+    and tail blocks, so the same file downloaded again under another path
+    hits the cache. Entries are bounded by count, disk bytes and TTL. The
+    index lives in an append-only log that is written in batches and
+    compacted on load.
+    """
+    
+    SAMPLE_SIZE = 64 * 1024
+    FLUSH_BATCH = 32
+    FLUSH_INTERVAL = 30
+    
+    def __init__(
+        self,
+        cache_dir: str = "data/thumbnails",
+        max_entries: int = 2000,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: timedelta = timedelta(days=7),
+    ):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_ttl = ttl
         
-        # In-memory cache with TTL
-        self.memory_cache: Dict[str, Dict] = {}
-        self.cache_ttl = timedelta(days=7)
+        # key -> {"source", "path", "size", "cached_at"}, oldest use first
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.total_bytes = 0
         
-        # Metadata file for disk cache
-        self.metadata_file = self.cache_dir / ".metadata.json"
-        self._load_metadata()
+        self.log_file = self.cache_dir / ".index.log"
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._load()
     
-    def _load_metadata(self):
-        """Load cache metadata from disk"""
-        if self.metadata_file.exists():
-            try:
-                with open(self.metadata_file) as f:
-                    self.metadata = json.load(f)
-            except Exception as e:
-                LOGGER.warning(f"Failed to load cache metadata: {e}")
-                self.metadata = {}
-        else:
-            self.metadata = {}
+    # ==================== KEYS ====================
     
-    def _save_metadata(self):
-        """Save cache metadata to disk"""
-        try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f)
-        except Exception as e:
-            LOGGER.error(f"Failed to save cache metadata: {e}")
+    def fingerprint(self, file_path: str) -> str:
+        """Hash of the file size and sampled head/middle/tail blocks (blocking)"""
+        size = os.path.getsize(file_path)
+        digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+        with open(file_path, "rb") as f:
+            offsets = {
+                0,
+                max(0, size // 2 - self.SAMPLE_SIZE // 2),
+                max(0, size - self.SAMPLE_SIZE),
+            }
+            for offset in sorted(offsets):
+                f.seek(offset)
+                digest.update(f.read(self.SAMPLE_SIZE))
+        return digest.hexdigest()
     
-    def _get_cache_key(self, file_path: str, dimensions: Optional[Tuple[int, int]] = None) -> str:
-        """Generate cache key from file path and dimensions"""
-        key = f"{file_path}"
+    def key(self, file_path: str, dimensions: Optional[Tuple[int, int]] = None) -> str:
+        """Cache key for a source file and thumbnail dimensions (blocking)"""
+        key = self.fingerprint(file_path)
         if dimensions:
             key += f"_{dimensions[0]}x{dimensions[1]}"
-        return hashlib.md5(key.encode()).hexdigest()
+        return key
     
-    def get(self, file_path: str, dimensions: Optional[Tuple[int, int]] = None) -> Optional[Path]:
+    def path_for(self, key: str) -> Path:
+        """Where the thumbnail for a key is stored"""
+        return self.cache_dir / f"{key}.jpg"
+    
+    def owns(self, thumb_path) -> bool:
+        """Whether a thumbnail path belongs to this cache"""
+        return Path(thumb_path).parent.resolve() == self.cache_dir.resolve()
+    
+    # ==================== LOOKUP ====================
+    
+    def get(self, key: str) -> Optional[Path]:
         """
         Get cached thumbnail
         
         Returns:
             Path to cached thumbnail or None if expired/missing
         """
-        cache_key = self._get_cache_key(file_path, dimensions)
-        
-        # Check memory cache first
-        if cache_key in self.memory_cache:
-            entry = self.memory_cache[cache_key]
-            if datetime.now() < entry["expires"]:
-                return Path(entry["path"])
-            else:
-                del self.memory_cache[cache_key]
-        
-        # Check disk cache
-        if cache_key in self.metadata:
-            meta = self.metadata[cache_key]
-            thumb_path = Path(meta["path"])
-            
-            if thumb_path.exists():
-                # Check expiry
-                cached_at = datetime.fromisoformat(meta["cached_at"])
-                if datetime.now() - cached_at < self.cache_ttl:
-                    # Add to memory cache
-                    self.memory_cache[cache_key] = {
-                        "path": str(thumb_path),
-                        "expires": datetime.now() + self.cache_ttl,
-                    }
-                    return thumb_path
-                else:
-                    # Expired, remove
-                    try:
-                        thumb_path.unlink()
-                        del self.metadata[cache_key]
-                        self._save_metadata()
-                    except Exception as e:
-                        LOGGER.warning(f"Failed to delete expired cache: {e}")
-        
-        return None
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        thumb_path = Path(entry["path"])
+        if self._expired(entry) or not thumb_path.exists():
+            self._drop(key)
+            return None
+        self.entries.move_to_end(key)
+        self._log({"op": "hit", "key": key})
+        return thumb_path
     
-    def set(self, file_path: str, thumb_path: Path, dimensions: Optional[Tuple[int, int]] = None):
+    def set(self, key: str, file_path: str, thumb_path: Path):
         """
         Cache a thumbnail
         
         Args:
+            key: Content key from key()
             file_path: Source file path
             thumb_path: Generated thumbnail path
-            dimensions: Thumbnail dimensions (width, height)
         """
-        cache_key = self._get_cache_key(file_path, dimensions)
-        
-        # Memory cache
-        self.memory_cache[cache_key] = {
-            "path": str(thumb_path),
-            "expires": datetime.now() + self.cache_ttl,
-        }
-        
-        # Disk metadata
-        self.metadata[cache_key] = {
+        if key in self.entries:
+            self._drop(key, unlink=Path(self.entries[key]["path"]) != Path(thumb_path))
+        try:
+            size = Path(thumb_path).stat().st_size
+        except OSError:
+            return
+        entry = {
             "source": file_path,
             "path": str(thumb_path),
-            "cached_at": datetime.now().isoformat(),
-            "dimensions": dimensions,
-            "expires_at": (datetime.now() + self.cache_ttl).isoformat(),
+            "size": size,
+            "cached_at": time.time(),
         }
-        self._save_metadata()
+        self.entries[key] = entry
+        self.total_bytes += size
+        self._log({"op": "put", "key": key, **entry})
+        self._evict()
         
-        LOGGER.debug(f"💾 Cached thumbnail: {cache_key}")
+        LOGGER.debug(f"💾 Cached thumbnail: {key}")
     
     def invalidate(self, file_path: str):
         """Invalidate all cache entries for a file"""
         keys_to_remove = [
-            k for k in self.metadata.keys()
-            if self.metadata[k]["source"] == file_path
+            k for k, entry in self.entries.items()
+            if entry["source"] == file_path
         ]
         
         for key in keys_to_remove:
-            try:
-                Path(self.metadata[key]["path"]).unlink()
-            except Exception:
-                pass
-            del self.metadata[key]
-            if key in self.memory_cache:
-                del self.memory_cache[key]
-        
-        self._save_metadata()
+            self._drop(key)
+        self.flush()
         
         if keys_to_remove:
             LOGGER.info(f"🗑️  Invalidated {len(keys_to_remove)} cached thumbnails for {file_path}")
     
-    def get_stats(self) -> Dict[str, Any]:
-        """Get cache statistics"""
-        memory_items = len(self.memory_cache)
-        disk_items = len(self.metadata)
-        
-        total_size = 0
-        for meta in self.metadata.values():
+    def remove_expired(self) -> int:
+        """Drop expired entries and flush the index"""
+        expired = [k for k, entry in self.entries.items() if self._expired(entry)]
+        for key in expired:
+            self._drop(key)
+        self.flush()
+        return len(expired)
+    
+    # ==================== BOUNDS ====================
+    
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["cached_at"] > self.cache_ttl.total_seconds()
+    
+    def _drop(self, key: str, unlink: bool = True):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry["size"]
+        if unlink:
             try:
-                total_size += Path(meta["path"]).stat().st_size
-            except Exception:
+                Path(entry["path"]).unlink()
+            except OSError:
                 pass
-        
+        self._log({"op": "del", "key": key})
+    
+    def _evict(self):
+        while self.entries and (
+            len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes
+        ):
+            self._drop(next(iter(self.entries)))
+    
+    # ==================== PERSISTENCE ====================
+    
+    def _log(self, record: Dict[str, Any]):
+        self._pending.append(record)
+        if (
+            len(self._pending) >= self.FLUSH_BATCH
+            or time.monotonic() - self._last_flush > self.FLUSH_INTERVAL
+        ):
+            self.flush()
+    
+    def flush(self):
+        """Append pending index records to the log"""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        records, self._pending = self._pending, []
+        try:
+            with open(self.log_file, "a") as f:
+                f.writelines(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        except Exception as e:
+            LOGGER.error(f"Failed to save cache index: {e}")
+    
+    def _load(self):
+        """Replay the index log, then compact it and drop orphaned files"""
+        lines = 0
+        if self.log_file.exists():
+            try:
+                with open(self.log_file) as f:
+                    for line in f:
+                        lines += 1
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        key = record.pop("key", None)
+                        op = record.pop("op", None)
+                        if op == "put":
+                            if old := self.entries.pop(key, None):
+                                self.total_bytes -= old["size"]
+                            self.entries[key] = record
+                            self.total_bytes += record["size"]
+                        elif op == "hit" and key in self.entries:
+                            self.entries.move_to_end(key)
+                        elif op == "del" and (old := self.entries.pop(key, None)):
+                            self.total_bytes -= old["size"]
+            except Exception as e:
+                LOGGER.warning(f"Failed to load cache index: {e}")
+        for key, entry in list(self.entries.items()):
+            if self._expired(entry) or not Path(entry["path"]).exists():
+                self._drop(key)
+        self._evict()
+        self._pending = []
+        known = {Path(entry["path"]).name for entry in self.entries.values()}
+        for child in self.cache_dir.iterdir():
+            if child.is_file() and child.name != self.log_file.name and child.name not in known:
+                try:
+                    child.unlink()
+                except OSError:
+                    pass
+        if lines != len(self.entries):
+            self._compact()
+    
+    def _compact(self):
+        tmp = self.log_file.with_suffix(".tmp")
+        try:
+            with open(tmp, "w") as f:
+                for key, entry in self.entries.items():
+                    record = {"op": "put", "key": key, **entry}
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            os.replace(tmp, self.log_file)
+        except Exception as e:
+            LOGGER.error(f"Failed to compact cache index: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
         return {
-            "memory_cache_items": memory_items,
-            "disk_cache_items": disk_items,
-            "total_size_mb": total_size / (1024 * 1024),
+            "memory_cache_items": len(self.entries),
+            "disk_cache_items": len(self.entries),
+            "total_size_mb": self.total_bytes / (1024 * 1024),
             "ttl_days": self.cache_ttl.days,
         }
 
@@ -181,7 +274,7 @@ class SmartThumbnailManager:
     _instance: Optional['SmartThumbnailManager'] = None
     _lock = asyncio.Lock()
     
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
@@ -217,22 +310,35 @@ class SmartThumbnailManager:
         
         Returns cached version if available, otherwise generates async
         """
+        key = await self._cache_key(file_path, (width, height))
+        if key is None:
+            return None
+        
         # Check cache first (unless force_regenerate)
         if not force_regenerate:
-            cached = self.cache.get(file_path, (width, height))
+            cached = self.cache.get(key)
             if cached:
                 LOGGER.debug(f"📷 Using cached thumbnail for {Path(file_path).name}")
                 return cached
         
         # Generate (async, non-blocking)
-        return await self._generate_or_queue(file_path, width, height)
+        return await self._generate_or_queue(key, file_path, width, height)
     
-    async def _generate_or_queue(self, file_path: str, width: int, height: int) -> Optional[Path]:
+    async def _cache_key(self, file_path: str, dimensions: Tuple[int, int]) -> Optional[str]:
+        """Fingerprint the source off the event loop"""
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, self.cache.key, file_path, dimensions)
+        except OSError as e:
+            LOGGER.error(f"Can't fingerprint {file_path}: {e}")
+            return None
+    
+    async def _generate_or_queue(self, key: str, file_path: str, width: int, height: int) -> Optional[Path]:
         """
         Generate thumbnail or return queued task
         If already generating, return existing task instead of duplicating work
         """
-        task_key = f"{file_path}_{width}x{height}"
+        task_key = key
         
         # If already generating, wait for existing task
         if task_key in self.generation_tasks:
@@ -245,7 +351,7 @@ class SmartThumbnailManager:
         
         # Create new generation task
         task = asyncio.create_task(
-            self._generate_thumbnail_async(file_path, width, height)
+            self._generate_thumbnail_async(key, file_path, width, height)
         )
         self.generation_tasks[task_key] = task
         
@@ -257,7 +363,7 @@ class SmartThumbnailManager:
             if task_key in self.generation_tasks:
                 del self.generation_tasks[task_key]
     
-    async def _generate_thumbnail_async(self, file_path: str, width: int, height: int) -> Optional[Path]:
+    async def _generate_thumbnail_async(self, key: str, file_path: str, width: int, height: int) -> Optional[Path]:
         """
         Async thumbnail generation (runs in executor to avoid blocking)
         """
@@ -268,11 +374,12 @@ class SmartThumbnailManager:
                 self._generate_thumbnail_sync,
                 file_path,
                 width,
-                height
+                height,
+                self.cache.path_for(key),
             )
             
             if thumb_path:
-                self.cache.set(file_path, thumb_path, (width, height))
+                self.cache.set(key, file_path, thumb_path)
                 LOGGER.info(f"📷 Generated thumbnail: {Path(file_path).name} ({width}x{height})")
                 return thumb_path
             return None
@@ -280,7 +387,7 @@ class SmartThumbnailManager:
             LOGGER.error(f"Error generating thumbnail: {e}")
             return None
     
-    def _generate_thumbnail_sync(self, file_path: str, width: int, height: int) -> Optional[Path]:
+    def _generate_thumbnail_sync(self, file_path: str, width: int, height: int, thumb_path: Path) -> Optional[Path]:
         """Synchronous thumbnail generation (ffmpeg)"""
         try:
             import subprocess
@@ -291,10 +398,6 @@ class SmartThumbnailManager:
                 LOGGER.error(f"File not found: {file_path}")
                 return None
             
-            # Generate thumbnail filename
-            thumb_name = f"{file_path.stem}_{width}x{height}.jpg"
-            thumb_path = self.cache.cache_dir / thumb_name
-            
             # Use ffmpeg to extract thumbnail
             cmd = [
                 "ffmpeg",
@@ -330,10 +433,15 @@ class SmartThumbnailManager:
         Generate sprite sheet for video preview
         Captures frames at intervals and stitches them together
         """
-        cache_key = f"{file_path}_sprite_{grid_cols}x{grid_cols}"
+        cache_key = await self._cache_key(
+            file_path, (thumb_width * grid_cols, thumb_height * grid_cols)
+        )
+        if cache_key is None:
+            return None
+        cache_key += "_sprite"
         
         # Check cache
-        cached = self.cache.get(file_path, (thumb_width * grid_cols, thumb_height * grid_cols))
+        cached = self.cache.get(cache_key)
         if cached:
             LOGGER.debug(f"🎬 Using cached sprite for {Path(file_path).name}")
             return cached
@@ -346,15 +454,12 @@ class SmartThumbnailManager:
                 file_path,
                 grid_cols,
                 thumb_width,
-                thumb_height
+                thumb_height,
+                self.cache.path_for(cache_key),
             )
             
             if sprite_path:
-                self.cache.set(
-                    file_path,
-                    sprite_path,
-                    (thumb_width * grid_cols, thumb_height * grid_cols)
-                )
+                self.cache.set(cache_key, file_path, sprite_path)
                 LOGGER.info(f"🎬 Generated sprite sheet: {Path(file_path).name}")
                 return sprite_path
             return None
@@ -367,7 +472,8 @@ class SmartThumbnailManager:
         file_path: str,
         grid_cols: int,
         thumb_w: int,
-        thumb_h: int
+        thumb_h: int,
+        sprite_path: Path,
     ) -> Optional[Path]:
         """Generate sprite sheet (ffmpeg + imagemagick)"""
         try:
@@ -375,7 +481,6 @@ class SmartThumbnailManager:
             from pathlib import Path
             
             file_path = Path(file_path)
-            sprite_path = self.cache.cache_dir / f"{file_path.stem}_sprite.jpg"
             
             # Generate grid of thumbnails
             cmd = [
@@ -401,22 +506,9 @@ class SmartThumbnailManager:
     
     async def cleanup_expired(self):
         """Clean up expired cache entries"""
-        removed = 0
-        
-        for cache_key, meta in list(self.cache.metadata.items()):
-            try:
-                expires_at = datetime.fromisoformat(meta["expires_at"])
-                if datetime.now() > expires_at:
-                    thumb_path = Path(meta["path"])
-                    if thumb_path.exists():
-                        thumb_path.unlink()
-                    del self.cache.metadata[cache_key]
-                    removed += 1
-            except Exception as e:
-                LOGGER.debug(f"Error cleaning up cache entry: {e}")
+        removed = self.cache.remove_expired()
         
         if removed > 0:
-            self.cache._save_metadata()
             LOGGER.info(f"🧹 Cleaned up {removed} expired thumbnails")
         
         return removed
@@ -13,6 +13,8 @@ from tenacity import (
 )
 
 from .. import LOGGER, aria2_options
+from .aria2_snapshot import Aria2Snapshot
+from .qbit_mirror import QbittorrentMirror
 
 
 def wrap_with_retry(obj, max_retries=3):
@@ -36,7 +38,9 @@ def wrap_with_retry(obj, max_retries=3):
 
 class TorrentManager:
     aria2 = None
+    aria2_snapshot = None
     qbittorrent = None
+    qbit_mirror = None
 
     @classmethod
     async def initiate(cls):
@@ -83,8 +87,10 @@ class TorrentManager:
             )
         else:
             cls.aria2 = await Aria2WebsocketClient.new(f"http://{aria2_host}:{aria2_port}/jsonrpc")
+        cls.aria2_snapshot = Aria2Snapshot(cls.aria2)
         cls.qbittorrent = qb_client
         cls.qbittorrent = wrap_with_retry(cls.qbittorrent)
+        cls.qbit_mirror = QbittorrentMirror(cls.qbittorrent)
 
     @classmethod
     async def close_all(cls):
@@ -93,6 +99,7 @@ class TorrentManager:
     @classmethod
     async def aria2_remove(cls, download):
         """Remove download from aria2 client"""
+        cls.aria2_snapshot.discard(download.get("gid", ""))
         if download.get("status", "") in ["active", "paused", "waiting"]:
             await cls.aria2.forceRemove(download.get("gid", ""))
         else:
@@ -126,11 +133,10 @@ class TorrentManager:
 
     @classmethod
     async def overall_speed(cls):
-        s1, s2 = await gather(
-            cls.qbittorrent.transfer.info(), cls.aria2.getGlobalStat()
-        )
-        download_speed = s1.dl_info_speed + int(s2.get("downloadSpeed", "0"))
-        upload_speed = s1.up_info_speed + int(s2.get("uploadSpeed", "0"))
+        _, s2 = await gather(cls.qbit_mirror.refresh(), cls.aria2.getGlobalStat())
+        s1 = cls.qbit_mirror.server_state
+        download_speed = s1.get("dl_info_speed", 0) + int(s2.get("downloadSpeed", "0"))
+        upload_speed = s1.get("up_info_speed", 0) + int(s2.get("uploadSpeed", "0"))
         return download_speed, upload_speed
 
     @classmethod
@@ -1,6 +1,6 @@
 from aiofiles.os import path as aiopath, remove, makedirs, listdir
 from asyncio import sleep, gather
-from os import walk, path as ospath
+from os import path as ospath
 from secrets import token_urlsafe
 from aioshutil import move, rmtree
 from pyrogram.enums import ChatAction
@@ -18,28 +18,30 @@ from .. import (
     task_dict,
     excluded_extensions,
     included_extensions,
-    cpu_eater_lock,
     intervals,
     DOWNLOAD_DIR,
-    cores,
 )
 from ..core.config_manager import Config
 from ..core.telegram_manager import TgClient
-from .ext_utils.bot_utils import new_task, sync_to_async, get_size_bytes
+from .ext_utils.bot_utils import new_task, get_size_bytes
 from .ext_utils.bulk_links import extract_bulk_links
 from .mirror_leech_utils.gdrive_utils.list import GoogleDriveList
 from .mirror_leech_utils.rclone_utils.list import RcloneList
 from .mirror_leech_utils.status_utils.sevenz_status import SevenZStatus
 from .mirror_leech_utils.status_utils.ffmpeg_status import FFmpegStatus
+from .mirror_leech_utils.status_utils.join_status import JoinStatus
 from .telegram_helper.bot_commands import BotCommands
 from .ext_utils.files_utils import (
     get_base_name,
     is_first_archive_split,
     is_archive,
     is_archive_split,
-    get_path_size,
-    split_file,
+    split_file_parts,
+    virtual_split,
+    SplitStream,
     SevenZ,
+    FileJoiner,
+    extension_filter,
 )
 from .ext_utils.links_utils import (
     is_gdrive_id,
@@ -50,8 +52,8 @@ from .ext_utils.links_utils import (
 from .ext_utils.media_utils import (
     create_thumb,
     take_ss,
-    get_document_type,
     FFMpeg,
+    FFMpegBatch,
 )
 from .telegram_helper.message_utils import (
     send_message,
@@ -80,7 +82,10 @@ class TaskConfig:
         self.folder_name = ""
         self.split_size = 0
         self.max_split_size = 0
+        self.virtual_parts = {}
+        self.split_plan = {}
         self.multi = 0
+        self.priority = 0
         self.size = 0
         self.subsize = 0
         self.proceed_count = 0
@@ -122,6 +127,7 @@ class TaskConfig:
         self.created_at = time()
         self.chat_thread_id = None
         self.subproc = None
+        self.manifest = None
         self.thumb = None
         self.excluded_extensions = []
         self.included_extensions = []
@@ -694,63 +700,95 @@ class TaskConfig:
                 f"Reply to text file or to telegram message that have links separated by new line! {e}",
             )
 
+    def extension_filter(self):
+        return extension_filter(self.excluded_extensions, self.included_extensions)
+
+    async def remove_unwanted_extensions(self):
+        if (name_filter := self.extension_filter()) is not None:
+            await self.manifest.remove_files(name_filter)
+
+    async def proceed_join(self, dl_path, gid):
+        joiner = FileJoiner(self)
+        async with task_dict_lock:
+            task_dict[self.mid] = JoinStatus(self, joiner, gid)
+        LOGGER.info(f"Joining: {self.name}")
+        for f_path, parts in await joiner.join(dl_path):
+            for part in parts:
+                self.manifest.discard(part)
+            await self.manifest.rescan(f_path)
+
     @staticmethod
     def _should_extract_file(file_):
         return is_first_archive_split(file_) or (
             is_archive(file_) and not file_.strip().lower().endswith(".rar")
         )
 
-    async def _collect_archives_to_extract(self, dl_path):
-        files_to_extract = []
+    def _collect_archives_to_extract(self, dl_path):
         if self.is_file and is_archive(dl_path):
-            files_to_extract.append(dl_path)
-            return files_to_extract
-        for dirpath, _, files in await sync_to_async(walk, dl_path, topdown=False):
-            for file_ in files:
-                if self._should_extract_file(file_):
-                    files_to_extract.append(ospath.join(dirpath, file_))
-        return files_to_extract
+            return [dl_path]
+        return [
+            f_path
+            for f_path in self.manifest.paths(dl_path)
+            if self._should_extract_file(ospath.basename(f_path))
+        ]
 
     async def _cleanup_extracted_archives(self, dirpath, files):
         for file_ in files:
             if is_archive_split(file_) or is_archive(file_):
                 del_path = ospath.join(dirpath, file_)
                 try:
-                    await remove(del_path)
+                    await self.manifest.remove(del_path)
                 except:
                     self.is_cancelled = True
 
     async def proceed_extract(self, dl_path, gid):
         pswd = self.extract if isinstance(self.extract, str) else ""
-        self.files_to_proceed = await self._collect_archives_to_extract(dl_path)
+        self.files_to_proceed = self._collect_archives_to_extract(dl_path)
         if not self.files_to_proceed:
             return dl_path
-        t_path = dl_path
         sevenz = SevenZ(self)
         LOGGER.info(f"Extracting: {self.name}")
         async with task_dict_lock:
             task_dict[self.mid] = SevenZStatus(self, sevenz, gid, "Extract")
-        for dirpath, _, files in await sync_to_async(
-            walk, self.up_dir or self.dir, topdown=False
-        ):
-            code = 0
-            for file_ in files:
-                if self.is_cancelled:
-                    return False
-                if self._should_extract_file(file_):
-                    self.proceed_count += 1
-                    f_path = ospath.join(dirpath, file_)
-                    t_path = get_base_name(f_path) if self.is_file else dirpath
-                    if not self.is_file:
-                        self.subname = file_
-                    code = await sevenz.extract(f_path, t_path, pswd)
-            if self.is_cancelled:
-                return code
-            if code == 0:
-                await self._cleanup_extracted_archives(dirpath, files)
-        if self.proceed_count == 0:
+
+        async def extract(archives):
+            # Archives of one directory share the output dir, -aot only renames
+            # a clashing name reliably when they run one after another
+            codes = []
+            for f_path in archives:
+                self.proceed_count += 1
+                t_path = (
+                    get_base_name(f_path) if self.is_file else ospath.dirname(f_path)
+                )
+                if not self.is_file:
+                    self.subname = ospath.basename(f_path)
+                codes.append(await sevenz.extract(f_path, t_path, pswd))
+            return codes
+
+        groups = []
+        for dirpath, files in self.manifest.walk():
+            if archives := [
+                ospath.join(dirpath, file_)
+                for file_ in files
+                if self._should_extract_file(file_)
+            ]:
+                groups.append((dirpath, files, archives))
+        if not groups:
             LOGGER.info("No files able to extract!")
-        return t_path if self.is_file and code == 0 else dl_path
+            return dl_path
+        # Directories are independent, the cpu scheduler bounds how many run at once
+        codes = await gather(*(extract(archives) for _, _, archives in groups))
+        if self.is_cancelled:
+            return False
+        results = {}
+        for (dirpath, files, archives), dir_codes in zip(groups, codes):
+            results.update(zip(archives, dir_codes))
+            if all(code == 0 for code in dir_codes):
+                await self._cleanup_extracted_archives(dirpath, files)
+        await self.manifest.rescan(self.manifest.root)
+        if self.is_file and results.get(dl_path) == 0:
+            return get_base_name(dl_path)
+        return dl_path
 
     def _build_ffmpeg_cmds(self):
         return [
@@ -796,9 +834,6 @@ class TaskConfig:
             return True
         async with task_dict_lock:
             task_dict[self.mid] = FFmpegStatus(self, ffmpeg, gid, "FFmpeg")
-        self.progress = False
-        await cpu_eater_lock.acquire()
-        self.progress = True
         return True
 
     async def _cleanup_ffmpeg_inputs(self, inputs):
@@ -810,126 +845,125 @@ class TaskConfig:
         checked = False
         inputs = {}
         cmds = self._build_ffmpeg_cmds()
-        try:
-            ffmpeg = FFMpeg(self)
-            for ffmpeg_cmd in cmds:
-                self.proceed_count = 0
-                cmd = [
-                    "taskset",
-                    "-c",
-                    f"{cores}",
-                    "ffmpeg",
-                    "-hide_banner",
-                    "-loglevel",
-                    "error",
-                    "-progress",
-                    "pipe:1",
-                ] + ffmpeg_cmd
-                if "-del" in cmd:
-                    cmd.remove("-del")
-                    delete_files = True
+        ffmpeg = FFMpeg(self)
+        for ffmpeg_cmd in cmds:
+            self.proceed_count = 0
+            cmd = [
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-progress",
+                "pipe:1",
+            ] + ffmpeg_cmd
+            if "-del" in cmd:
+                cmd.remove("-del")
+                delete_files = True
+            else:
+                delete_files = False
+            input_indexes = [
+                index for index, value in enumerate(cmd) if value == "-i"
+            ]
+            input_file = self._get_ffmpeg_input_file(cmd, input_indexes)
+            if not input_file:
+                LOGGER.error("Wrong FFmpeg cmd!")
+                return dl_path
+            ext = self._get_ffmpeg_ext(input_file)
+            if self.manifest.is_file(dl_path):
+                is_video, is_audio, _ = await self.manifest.document_type(dl_path)
+                if not is_video and not is_audio:
+                    break
+                elif is_video and ext == "audio":
+                    break
+                elif is_audio and not is_video and ext == "video":
+                    break
+                elif ext not in [
+                    "all",
+                    "audio",
+                    "video",
+                ] and not dl_path.strip().lower().endswith(ext):
+                    break
+                new_folder = ospath.splitext(dl_path)[0]
+                name = ospath.basename(dl_path)
+                await makedirs(new_folder, exist_ok=True)
+                file_path = f"{new_folder}/{name}"
+                await move(dl_path, file_path)
+                self.manifest.move(dl_path, file_path)
+                if not checked:
+                    checked = await self._ensure_ffmpeg_status(ffmpeg, gid, checked)
+                LOGGER.info(f"Running ffmpeg cmd for: {file_path}")
+                var_cmd = await self._prepare_ffmpeg_cmd(
+                    cmd, input_indexes, file_path, inputs
+                )
+                self.subsize = self.size
+                res = await ffmpeg.ffmpeg_cmds(var_cmd, file_path)
+                if res:
+                    if delete_files:
+                        await remove(file_path)
+                        if len(await listdir(new_folder)) == 1:
+                            folder = new_folder.rsplit("/", 1)[0]
+                            self.name = ospath.basename(res[0])
+                            if self.name.startswith("ffmpeg"):
+                                self.name = self.name.split(".", 1)[-1]
+                            dl_path = ospath.join(folder, self.name)
+                            await move(res[0], dl_path)
+                            await rmtree(new_folder)
+                        else:
+                            dl_path = new_folder
+                            self.name = new_folder.rsplit("/", 1)[-1]
+                    else:
+                        dl_path = new_folder
+                        self.name = new_folder.rsplit("/", 1)[-1]
+                    self.manifest.discard(new_folder)
+                    await self.manifest.rescan(dl_path)
                 else:
-                    delete_files = False
-                input_indexes = [
-                    index for index, value in enumerate(cmd) if value == "-i"
-                ]
-                input_file = self._get_ffmpeg_input_file(cmd, input_indexes)
-                if not input_file:
-                    LOGGER.error("Wrong FFmpeg cmd!")
-                    return dl_path
-                ext = self._get_ffmpeg_ext(input_file)
-                if await aiopath.isfile(dl_path):
-                    is_video, is_audio, _ = await get_document_type(dl_path)
+                    await move(file_path, dl_path)
+                    await rmtree(new_folder)
+                    self.manifest.move(file_path, dl_path)
+            else:
+                for f_path in self.manifest.paths(dl_path):
+                    if self.is_cancelled:
+                        return False
+                    dirpath, file_ = f_path.rsplit("/", 1)
+                    is_video, is_audio, _ = await self.manifest.document_type(f_path)
                     if not is_video and not is_audio:
-                        break
+                        continue
                     elif is_video and ext == "audio":
-                        break
+                        continue
                     elif is_audio and not is_video and ext == "video":
-                        break
+                        continue
                     elif ext not in [
                         "all",
                         "audio",
                         "video",
-                    ] and not dl_path.strip().lower().endswith(ext):
-                        break
-                    new_folder = ospath.splitext(dl_path)[0]
-                    name = ospath.basename(dl_path)
-                    await makedirs(new_folder, exist_ok=True)
-                    file_path = f"{new_folder}/{name}"
-                    await move(dl_path, file_path)
-                    if not checked:
-                        checked = await self._ensure_ffmpeg_status(ffmpeg, gid, checked)
-                    LOGGER.info(f"Running ffmpeg cmd for: {file_path}")
+                    ] and not f_path.strip().lower().endswith(ext):
+                        continue
+                    self.proceed_count += 1
                     var_cmd = await self._prepare_ffmpeg_cmd(
-                        cmd, input_indexes, file_path, inputs
+                        cmd, input_indexes, f_path, inputs
                     )
-                    self.subsize = self.size
-                    res = await ffmpeg.ffmpeg_cmds(var_cmd, file_path)
-                    if res:
-                        if delete_files:
-                            await remove(file_path)
-                            if len(await listdir(new_folder)) == 1:
-                                folder = new_folder.rsplit("/", 1)[0]
-                                self.name = ospath.basename(res[0])
-                                if self.name.startswith("ffmpeg"):
-                                    self.name = self.name.split(".", 1)[-1]
-                                dl_path = ospath.join(folder, self.name)
-                                await move(res[0], dl_path)
-                                await rmtree(new_folder)
-                            else:
-                                dl_path = new_folder
-                                self.name = new_folder.rsplit("/", 1)[-1]
-                        else:
-                            dl_path = new_folder
-                            self.name = new_folder.rsplit("/", 1)[-1]
-                    else:
-                        await move(file_path, dl_path)
-                        await rmtree(new_folder)
-                else:
-                    for dirpath, _, files in await sync_to_async(
-                        walk, dl_path, topdown=False
-                    ):
-                        for file_ in files:
-                            if self.is_cancelled:
-                                return False
-                            f_path = ospath.join(dirpath, file_)
-                            is_video, is_audio, _ = await get_document_type(f_path)
-                            if not is_video and not is_audio:
-                                continue
-                            elif is_video and ext == "audio":
-                                continue
-                            elif is_audio and not is_video and ext == "video":
-                                continue
-                            elif ext not in [
-                                "all",
-                                "audio",
-                                "video",
-                            ] and not f_path.strip().lower().endswith(ext):
-                                continue
-                            self.proceed_count += 1
-                            var_cmd = await self._prepare_ffmpeg_cmd(
-                                cmd, input_indexes, f_path, inputs
-                            )
-                            if not checked:
-                                checked = await self._ensure_ffmpeg_status(
-                                    ffmpeg, gid, checked
-                                )
-                            LOGGER.info(f"Running ffmpeg cmd for: {f_path}")
-                            self.subsize = await get_path_size(f_path)
-                            self.subname = file_
-                            res = await ffmpeg.ffmpeg_cmds(var_cmd, f_path)
-                            if res and delete_files:
-                                await remove(f_path)
-                                if len(res) == 1:
-                                    file_name = ospath.basename(res[0])
-                                    if file_name.startswith("ffmpeg"):
-                                        newname = file_name.split(".", 1)[-1]
-                                        newres = ospath.join(dirpath, newname)
-                                        await move(res[0], newres)
-                await self._cleanup_ffmpeg_inputs(inputs)
-        finally:
-            if checked:
-                cpu_eater_lock.release()
+                    if not checked:
+                        checked = await self._ensure_ffmpeg_status(
+                            ffmpeg, gid, checked
+                        )
+                    LOGGER.info(f"Running ffmpeg cmd for: {f_path}")
+                    self.subsize = self.manifest.file_size(f_path)
+                    self.subname = file_
+                    res = await ffmpeg.ffmpeg_cmds(var_cmd, f_path)
+                    if not res:
+                        continue
+                    for output in res:
+                        await self.manifest.rescan(output)
+                    if delete_files:
+                        await self.manifest.remove(f_path)
+                        if len(res) == 1:
+                            file_name = ospath.basename(res[0])
+                            if file_name.startswith("ffmpeg"):
+                                newname = file_name.split(".", 1)[-1]
+                                newres = ospath.join(dirpath, newname)
+                                await move(res[0], newres)
+                                self.manifest.move(res[0], newres)
+            await self._cleanup_ffmpeg_inputs(inputs)
         return dl_path
 
     async def substitute(self, dl_path):
@@ -968,15 +1002,17 @@ class TaskConfig:
                 return dl_path
             new_path = ospath.join(up_dir, new_name)
             await move(dl_path, new_path)
+            self.manifest.move(dl_path, new_path)
             return new_path
         else:
-            for dirpath, _, files in await sync_to_async(walk, dl_path, topdown=False):
-                for file_ in files:
-                    f_path = ospath.join(dirpath, file_)
-                    new_name = perform_substitution(file_, self.name_sub)
-                    if not new_name:
-                        continue
-                    await move(f_path, ospath.join(dirpath, new_name))
+            for f_path in self.manifest.paths(dl_path):
+                dirpath, file_ = f_path.rsplit("/", 1)
+                new_name = perform_substitution(file_, self.name_sub)
+                if not new_name:
+                    continue
+                new_path = ospath.join(dirpath, new_name)
+                await move(f_path, new_path)
+                self.manifest.move(f_path, new_path)
             return dl_path
 
     @staticmethod
@@ -1023,37 +1059,30 @@ class TaskConfig:
             return True
         return False
 
-    async def _collect_media_files(self, dl_path):
-        if self.is_file:
-            return [dl_path]
-        all_files = []
-        for dirpath, _, files in await sync_to_async(walk, dl_path, topdown=False):
-            for file_ in files:
-                all_files.append(ospath.join(dirpath, file_))
-        return all_files
-
     async def generate_screenshots(self, dl_path):
         ss_nb = int(self.screen_shots) if isinstance(self.screen_shots, str) else 10
         if self.is_file:
-            if (await get_document_type(dl_path))[0]:
+            if (await self.manifest.document_type(dl_path))[0]:
                 LOGGER.info(f"Creating Screenshot for: {dl_path}")
                 res = await take_ss(dl_path, ss_nb)
                 if res:
                     new_folder = ospath.splitext(dl_path)[0]
                     name = ospath.basename(dl_path)
+                    ss_folder = f"{new_folder}/{ospath.basename(res)}"
                     await makedirs(new_folder, exist_ok=True)
                     await gather(
                         move(dl_path, f"{new_folder}/{name}"),
                         move(res, new_folder),
                     )
+                    self.manifest.move(dl_path, f"{new_folder}/{name}")
+                    await self.manifest.rescan(ss_folder)
                     return new_folder
         else:
             LOGGER.info(f"Creating Screenshot for: {dl_path}")
-            for dirpath, _, files in await sync_to_async(walk, dl_path, topdown=False):
-                for file_ in files:
-                    f_path = ospath.join(dirpath, file_)
-                    if (await get_document_type(f_path))[0]:
-                        await take_ss(f_path, ss_nb)
+            for f_path in self.manifest.paths(dl_path):
+                if (await self.manifest.document_type(f_path))[0]:
+                    if res := await take_ss(f_path, ss_nb):
+                        await self.manifest.rescan(res)
         return dl_path
 
     async def convert_media(self, dl_path, gid):
@@ -1061,9 +1090,9 @@ class TaskConfig:
         aext, astatus, faext = self._parse_convert_setting(self.convert_audio)
 
         self.files_to_proceed = {}
-        all_files = await self._collect_media_files(dl_path)
+        all_files = [dl_path] if self.is_file else self.manifest.paths(dl_path)
         for f_path in all_files:
-            is_video, is_audio, _ = await get_document_type(f_path)
+            is_video, is_audio, _ = await self.manifest.document_type(f_path)
             if is_video and self._should_convert_video(f_path, vext, vstatus, fvext):
                 self.files_to_proceed[f_path] = "video"
             elif (
@@ -1074,32 +1103,30 @@ class TaskConfig:
                 self.files_to_proceed[f_path] = "audio"
 
         if self.files_to_proceed:
-            ffmpeg = FFMpeg(self)
+            batch = FFMpegBatch(self)
             async with task_dict_lock:
-                task_dict[self.mid] = FFmpegStatus(self, ffmpeg, gid, "Convert")
-            self.progress = False
-            async with cpu_eater_lock:
-                self.progress = True
-                for f_path, f_type in self.files_to_proceed.items():
-                    self.proceed_count += 1
-                    LOGGER.info(f"Converting: {f_path}")
-                    if self.is_file:
-                        self.subsize = self.size
-                    else:
-                        self.subsize = await get_path_size(f_path)
-                        self.subname = ospath.basename(f_path)
-                    if f_type == "video":
-                        res = await ffmpeg.convert_video(f_path, vext)
-                    else:
-                        res = await ffmpeg.convert_audio(f_path, aext)
-                    if res:
-                        try:
-                            await remove(f_path)
-                        except:
-                            self.is_cancelled = True
-                            return False
-                        if self.is_file:
-                            return res
+                task_dict[self.mid] = FFmpegStatus(self, batch, gid, "Convert")
+
+            async def convert(ffmpeg, f_path, f_type):
+                LOGGER.info(f"Converting: {f_path}")
+                if f_type == "video":
+                    res = await ffmpeg.convert_video(f_path, vext)
+                else:
+                    res = await ffmpeg.convert_audio(f_path, aext)
+                if res:
+                    try:
+                        await self.manifest.remove(f_path)
+                    except:
+                        self.is_cancelled = True
+                        return False
+                    await self.manifest.rescan(res)
+                return res
+
+            results = await batch.run(self.files_to_proceed.items(), convert)
+            if self.is_cancelled:
+                return False
+            if self.is_file and results[0]:
+                return results[0]
         return dl_path
 
     @staticmethod
@@ -1113,45 +1140,41 @@ class TaskConfig:
 
     async def _collect_video_files_for_sample(self, dl_path):
         files_to_sample = {}
-        if self.is_file and (await get_document_type(dl_path))[0]:
+        if self.is_file and (await self.manifest.document_type(dl_path))[0]:
             files_to_sample[dl_path] = ospath.basename(dl_path)
             return files_to_sample
-        for dirpath, _, files in await sync_to_async(walk, dl_path, topdown=False):
-            for file_ in files:
-                f_path = ospath.join(dirpath, file_)
-                if (await get_document_type(f_path))[0]:
-                    files_to_sample[f_path] = file_
+        for f_path in self.manifest.paths(dl_path):
+            if (await self.manifest.document_type(f_path))[0]:
+                files_to_sample[f_path] = ospath.basename(f_path)
         return files_to_sample
 
     async def generate_sample_video(self, dl_path, gid):
         sample_duration, part_duration = self._parse_sample_settings(self.sample_video)
         self.files_to_proceed = await self._collect_video_files_for_sample(dl_path)
         if self.files_to_proceed:
-            ffmpeg = FFMpeg(self)
+            batch = FFMpegBatch(self)
             async with task_dict_lock:
-                task_dict[self.mid] = FFmpegStatus(self, ffmpeg, gid, "Sample Video")
-            self.progress = False
-            async with cpu_eater_lock:
-                self.progress = True
-                LOGGER.info(f"Creating Sample video: {self.name}")
-                for f_path, file_ in self.files_to_proceed.items():
-                    self.proceed_count += 1
-                    if self.is_file:
-                        self.subsize = self.size
-                    else:
-                        self.subsize = await get_path_size(f_path)
-                        self.subname = file_
-                    res = await ffmpeg.sample_video(
-                        f_path, sample_duration, part_duration
-                    )
-                    if res and self.is_file:
-                        new_folder = ospath.splitext(f_path)[0]
-                        await makedirs(new_folder, exist_ok=True)
-                        await gather(
-                            move(f_path, f"{new_folder}/{file_}"),
-                            move(res, f"{new_folder}/SAMPLE.{file_}"),
-                        )
-                        return new_folder
+                task_dict[self.mid] = FFmpegStatus(self, batch, gid, "Sample Video")
+            LOGGER.info(f"Creating Sample video: {self.name}")
+
+            async def sample(ffmpeg, f_path, file_):
+                res = await ffmpeg.sample_video(f_path, sample_duration, part_duration)
+                if res:
+                    await self.manifest.rescan(res)
+                return res
+
+            results = await batch.run(self.files_to_proceed.items(), sample)
+            if self.is_file and results[0]:
+                f_path, file_ = next(iter(self.files_to_proceed.items()))
+                new_folder = ospath.splitext(f_path)[0]
+                await makedirs(new_folder, exist_ok=True)
+                await gather(
+                    move(f_path, f"{new_folder}/{file_}"),
+                    move(results[0], f"{new_folder}/SAMPLE.{file_}"),
+                )
+                self.manifest.move(f_path, f"{new_folder}/{file_}")
+                self.manifest.move(results[0], f"{new_folder}/SAMPLE.{file_}")
+                return new_folder
         return dl_path
 
     async def proceed_compress(self, dl_path, gid):
@@ -1162,56 +1185,73 @@ class TaskConfig:
             await makedirs(new_folder, exist_ok=True)
             new_dl_path = f"{new_folder}/{name}"
             await move(dl_path, new_dl_path)
+            self.manifest.move(dl_path, new_dl_path)
             dl_path = new_dl_path
-            up_path = f"{new_dl_path}.zip"
             self.is_file = False
-        else:
-            up_path = f"{dl_path}.zip"
+        up_path = f"{dl_path}{SevenZ.archive_ext(pswd)}"
         sevenz = SevenZ(self)
         async with task_dict_lock:
             task_dict[self.mid] = SevenZStatus(self, sevenz, gid, "Zip")
-        return await sevenz.zip(dl_path, up_path, pswd)
+        res = await sevenz.zip(dl_path, up_path, pswd)
+        if res == up_path:
+            self.manifest.discard(dl_path)
+            await self.manifest.rescan(ospath.dirname(up_path))
+        return res
 
-    async def proceed_split(self, dl_path, gid):
-        self.files_to_proceed = {}
-        if self.is_file:
-            f_size = await get_path_size(dl_path)
+    async def plan_split(self, dl_path):
+        self.split_plan = {}
+        for f_path in self.manifest.paths(dl_path):
+            f_size = self.manifest.file_size(f_path)
             if f_size > self.split_size:
-                self.files_to_proceed[dl_path] = [f_size, ospath.basename(dl_path)]
-        else:
-            for dirpath, _, files in await sync_to_async(walk, dl_path, topdown=False):
-                for file_ in files:
-                    f_path = ospath.join(dirpath, file_)
-                    f_size = await get_path_size(f_path)
-                    if f_size > self.split_size:
-                        self.files_to_proceed[f_path] = [f_size, file_]
-        if self.files_to_proceed:
-            ffmpeg = FFMpeg(self)
-            async with task_dict_lock:
-                task_dict[self.mid] = FFmpegStatus(self, ffmpeg, gid, "Split")
-            LOGGER.info(f"Splitting: {self.name}")
-            for f_path, (f_size, file_) in self.files_to_proceed.items():
-                self.proceed_count += 1
-                if self.is_file:
-                    self.subsize = self.size
-                else:
-                    self.subsize = f_size
-                    self.subname = file_
-                parts = -(-f_size // self.split_size)
-                if self.equal_splits:
-                    split_size = (f_size // parts) + (f_size % parts)
-                else:
-                    split_size = self.split_size
-                if not self.as_doc and (await get_document_type(f_path))[0]:
-                    self.progress = True
-                    res = await ffmpeg.split(f_path, file_, parts, split_size)
-                else:
-                    self.progress = False
-                    res = await split_file(f_path, split_size, self)
-                if self.is_cancelled:
-                    return False
-                if res or f_size >= self.max_split_size:
-                    try:
-                        await remove(f_path)
-                    except:
-                        self.is_cancelled = True
+                self.split_plan[f_path] = [f_size, ospath.basename(f_path)]
+        for f_path, (f_size, file_) in list(self.split_plan.items()):
+            is_video = (
+                not self.as_doc and (await self.manifest.document_type(f_path))[0]
+            )
+            self.split_plan[f_path].append(is_video)
+            if not is_video and Config.LEECH_VIRTUAL_SPLIT:
+                self.virtual_parts[f_path] = virtual_split(
+                    f_path, f_size, self._part_size(f_size)
+                )
+                del self.split_plan[f_path]
+
+    def _part_size(self, f_size):
+        if self.equal_splits:
+            parts = -(-f_size // self.split_size)
+            return (f_size // parts) + (f_size % parts)
+        return self.split_size
+
+    def split_stream(self, f_path):
+        f_size, file_, is_video = self.split_plan[f_path]
+
+        async def producer(on_part):
+            self.proceed_count += 1
+            if self.is_file:
+                self.subsize = self.size
+            else:
+                self.subsize = f_size
+                self.subname = file_
+            LOGGER.info(f"Splitting: {f_path}")
+            parts = -(-f_size // self.split_size)
+            split_size = self._part_size(f_size)
+            if is_video:
+                self.progress = True
+                res = await FFMpeg(self).split(
+                    f_path, file_, parts, split_size, on_part
+                )
+            else:
+                self.progress = False
+                res = await split_file_parts(
+                    f_path, f_size, split_size, self, on_part
+                )
+            if self.is_cancelled:
+                return
+            if res or f_size >= self.max_split_size:
+                try:
+                    await remove(f_path)
+                except:
+                    self.is_cancelled = True
+            else:
+                await on_part(f_path)
+
+        return SplitStream(producer)
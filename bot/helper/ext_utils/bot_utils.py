@@ -56,6 +56,32 @@ class SetInterval:
         self.task.cancel()
 
 
+class SubprocessGroup:
+    def __init__(self):
+        self._procs = set()
+
+    @property
+    def returncode(self):
+        if any(proc.returncode is None for proc in self._procs):
+            return None
+        return 0
+
+    def add(self, proc):
+        self._procs.add(proc)
+        return proc
+
+    def discard(self, proc):
+        self._procs.discard(proc)
+
+    def kill(self):
+        for proc in self._procs:
+            if proc.returncode is None:
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+
+
 def _build_command_usage(help_dict, command_key):
     buttons = ButtonMaker()
     for name in list(help_dict.keys())[1:]:
@@ -1,23 +1,54 @@
 from aioshutil import rmtree as aiormtree, move
-from asyncio import create_subprocess_exec, wait_for
+from asyncio import (
+    Queue,
+    Semaphore,
+    create_subprocess_exec,
+    create_task,
+    gather,
+    wait_for,
+)
 from asyncio.subprocess import PIPE
+from io import RawIOBase, SEEK_CUR, SEEK_END, SEEK_SET
 from magic import Magic
-from os import walk, path as ospath, readlink
-from re import split as re_split, I, search as re_search, escape
+from fcntl import ioctl
+from os import (
+    path as ospath,
+    link,
+    makedirs,
+    symlink,
+    readlink,
+    copy_file_range,
+    close as os_close,
+    pipe,
+    remove as os_remove,
+    rmdir,
+    scandir,
+    sendfile,
+    stat as os_stat,
+)
+from re import (
+    split as re_split,
+    I,
+    search as re_search,
+    escape as re_escape,
+    compile as re_compile,
+)
+from shutil import rmtree
+from stat import S_ISDIR
 from aiofiles.os import (
     remove,
     path as aiopath,
     listdir,
-    rmdir,
-    readlink as aioreadlink,
-    symlink,
     makedirs as aiomakedirs,
 )
 
 from ... import LOGGER, DOWNLOAD_DIR
+from ...core.config_manager import Config
+from ...core.cpu_scheduler import cpu_scheduler
 from ...core.torrent_manager import TorrentManager
-from .bot_utils import sync_to_async, cmd_exec
+from .bot_utils import sync_to_async, SubprocessGroup
 from .exceptions import NotSupportedExtractionArchive
+from .status_utils import get_readable_file_size
 
 ARCH_EXT = [
     ".tar.bz2",
@@ -134,42 +165,152 @@ async def clean_all():
     await aiomakedirs(DOWNLOAD_DIR, exist_ok=True)
 
 
+class PathStats:
+    __slots__ = ("size", "files", "folders", "entries", "dirs")
+
+    def __init__(self):
+        self.size = 0
+        self.files = 0
+        self.folders = 0
+        self.entries = {}
+        self.dirs = []
+
+
+def scan_path(opath, exclude=None, entries=False):
+    stats = PathStats()
+    try:
+        st = os_stat(opath)
+    except OSError:
+        return stats
+    if not S_ISDIR(st.st_mode):
+        stats.size = st.st_size
+        stats.files = 1
+        if entries:
+            stats.entries[opath] = st
+        return stats
+    stack = [opath]
+    while stack:
+        try:
+            it = scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if exclude is not None and exclude(entry):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stats.folders += 1
+                        stack.append(entry.path)
+                        if entries:
+                            stats.dirs.append(entry.path)
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if S_ISDIR(st.st_mode):
+                    stats.folders += 1
+                    continue
+                stats.files += 1
+                stats.size += st.st_size
+                if entries:
+                    stats.entries[entry.path] = st
+    return stats
+
+
+def _is_unwanted(entry):
+    name = entry.name.strip()
+    if entry.is_dir(follow_symlinks=False):
+        return name.endswith(".unwanted")
+    return name.endswith(".parts") and entry.name.startswith(".")
+
+
+def extension_filter(excluded=(), included=()):
+    if extensions := included or excluded:
+        pattern = re_compile(
+            f"(?:{'|'.join(re_escape(ext.strip().lower()) for ext in extensions)})$"
+        )
+        if included:
+            return lambda name: pattern.search(name) is None
+        return lambda name: pattern.search(name) is not None
+    return None
+
+
+class CleanResult:
+    __slots__ = ("freed", "removed", "entries")
+
+    def __init__(self):
+        self.freed = 0
+        self.removed = 0
+        self.entries = {}
+
+
+def clean_tree(opath, name_filter=None, prune_root=True):
+    result = CleanResult()
+
+    def drop(entry, st):
+        os_remove(entry.path)
+        result.removed += 1
+        if not entry.is_symlink() and st.st_nlink <= 1:
+            result.freed += st.st_size
+
+    def visit(dirpath, filtered):
+        kept = False
+        try:
+            it = scandir(dirpath)
+        except OSError:
+            return True
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if _is_unwanted(entry):
+                            size = scan_path(entry.path).size
+                            rmtree(entry.path)
+                            result.freed += size
+                        elif visit(entry.path, entry.name != "yt-dlp-thumb"):
+                            kept = True
+                        else:
+                            rmdir(entry.path)
+                        continue
+                    st = entry.stat()
+                    if _is_unwanted(entry) or (
+                        filtered
+                        and name_filter is not None
+                        and name_filter(entry.name.strip().lower())
+                    ):
+                        drop(entry, st)
+                        continue
+                except OSError:
+                    kept = True
+                    continue
+                kept = True
+                if not S_ISDIR(st.st_mode):
+                    result.entries[entry.path] = st
+        return kept
+
+    if ospath.isdir(opath) and not visit(opath, True) and prune_root:
+        try:
+            rmdir(opath)
+        except OSError:
+            pass
+    return result
+
+
 async def clean_unwanted(opath):
     LOGGER.info(f"Cleaning unwanted files/folders: {opath}")
-    for dirpath, _, files in await sync_to_async(walk, opath, topdown=False):
-        for filee in files:
-            f_path = ospath.join(dirpath, filee)
-            if filee.strip().endswith(".parts") and filee.startswith("."):
-                await remove(f_path)
-        if dirpath.strip().endswith(".unwanted"):
-            await aiormtree(dirpath, ignore_errors=True)
-    for dirpath, _, files in await sync_to_async(walk, opath, topdown=False):
-        if not await listdir(dirpath):
-            await rmdir(dirpath)
+    result = await sync_to_async(clean_tree, opath)
+    if result.freed:
+        LOGGER.info(f"Freed {get_readable_file_size(result.freed)} from {opath}")
 
 
 async def get_path_size(opath):
-    total_size = 0
-    if await aiopath.isfile(opath):
-        if await aiopath.islink(opath):
-            opath = await aioreadlink(opath)
-        return await aiopath.getsize(opath)
-    for root, _, files in await sync_to_async(walk, opath):
-        for f in files:
-            abs_path = ospath.join(root, f)
-            if await aiopath.islink(abs_path):
-                abs_path = await aioreadlink(abs_path)
-            total_size += await aiopath.getsize(abs_path)
-    return total_size
+    return (await sync_to_async(scan_path, opath)).size
 
 
 async def count_files_and_folders(opath):
-    total_files = 0
-    total_folders = 0
-    for _, dirs, files in await sync_to_async(walk, opath):
-        total_files += len(files)
-        total_folders += len(dirs)
-    return total_folders, total_files
+    stats = await sync_to_async(scan_path, opath)
+    return stats.folders, stats.files
 
 
 def get_base_name(orig_path):
@@ -182,20 +323,61 @@ def get_base_name(orig_path):
         raise NotSupportedExtractionArchive("File format not supported for extraction")
 
 
-async def create_recursive_symlink(source, destination):
-    if ospath.isdir(source):
-        await aiomakedirs(destination, exist_ok=True)
-        for item in await listdir(source):
-            item_source = ospath.join(source, item)
-            item_dest = ospath.join(destination, item)
-            await create_recursive_symlink(item_source, item_dest)
-    elif ospath.isfile(source):
+FICLONE = 0x40049409
+
+
+def _link_file(source, destination):
+    try:
+        link(source, destination)
+        return
+    except FileExistsError:
+        raise
+    except OSError:
+        pass
+    try:
+        with open(source, "rb") as fsrc, open(destination, "wb") as fdst:
+            ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return
+    except OSError:
         try:
-            await symlink(source, destination)
-        except FileExistsError:
-            LOGGER.error(f"Shortcut already exists: {destination}")
-        except Exception as e:
-            LOGGER.error(f"Error creating shortcut for {source}: {e}")
+            os_remove(destination)
+        except OSError:
+            pass
+    symlink(source, destination)
+
+
+def create_link_tree(source, destination):
+    entries = {}
+    if not ospath.isdir(source):
+        try:
+            _link_file(source, destination)
+            entries[destination] = os_stat(destination)
+        except OSError as e:
+            LOGGER.error(f"Error creating link for {source}: {e}")
+        return entries
+    stack = [(source, destination)]
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        try:
+            makedirs(dst_dir, exist_ok=True)
+            it = scandir(src_dir)
+        except OSError as e:
+            LOGGER.error(f"Error creating link tree for {src_dir}: {e}")
+            continue
+        with it:
+            for entry in it:
+                dst = ospath.join(dst_dir, entry.name)
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, dst))
+                    elif entry.is_file():
+                        _link_file(entry.path, dst)
+                        entries[dst] = entry.stat()
+                except FileExistsError:
+                    LOGGER.error(f"Link already exists: {dst}")
+                except OSError as e:
+                    LOGGER.error(f"Error creating link for {entry.path}: {e}")
+    return entries
 
 
 def get_mime_type(file_path):
@@ -207,25 +389,6 @@ def get_mime_type(file_path):
     return mime_type
 
 
-async def remove_excluded_files(fpath, ee):
-    for root, _, files in await sync_to_async(walk, fpath):
-        if root.strip().endswith("/yt-dlp-thumb"):
-            continue
-        for f in files:
-            if f.strip().lower().endswith(tuple(ee)):
-                await remove(ospath.join(root, f))
-
-
-async def remove_non_included_files(fpath, ie):
-    for root, _, files in await sync_to_async(walk, fpath):
-        if root.strip().endswith("/yt-dlp-thumb"):
-            continue
-        for f in files:
-            if f.strip().lower().endswith(tuple(ie)):
-                continue
-            await remove(ospath.join(root, f))
-
-
 async def move_and_merge(source, destination, mid):
     if not await aiopath.exists(destination):
         await aiomakedirs(destination, exist_ok=True)
@@ -246,147 +409,339 @@ async def move_and_merge(source, destination, mid):
             await move(src_path, dest_path)
 
 
-async def join_files(opath):
-    files = await listdir(opath)
-    results = []
-    exists = False
-    for file_ in files:
-        if not re_search(r"\.0+2$", file_):
-            continue
-        mime_type = await sync_to_async(get_mime_type, f"{opath}/{file_}")
-        if mime_type in ["application/x-7z-compressed", "application/zip"]:
+def virtual_split(f_path, f_size, split_size):
+    return [
+        (f"{f_path}.{index:03}", offset, min(split_size, f_size - offset))
+        for index, offset in enumerate(range(0, f_size, split_size), start=1)
+    ]
+
+
+def copy_chunks(
+    fsrc, fdst, offset, length, listener=None, on_copy=None, chunk=1 << 24
+):
+    in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+    mode = 0
+    while length > 0:
+        if listener is not None and listener.is_cancelled:
+            return False
+        size = min(chunk, length)
+        try:
+            if mode == 0:
+                copied = copy_file_range(in_fd, out_fd, size, offset)
+            elif mode == 1:
+                copied = sendfile(out_fd, in_fd, offset, size)
+            else:
+                fsrc.seek(offset)
+                copied = fdst.write(fsrc.read(size))
+        except OSError:
+            if mode == 2:
+                raise
+            mode += 1
             continue
-        exists = True
-        final_name = file_.rsplit(".", 1)[0]
-        fpath = f"{opath}/{final_name}"
-        cmd = f'cat "{fpath}."* > "{fpath}"'
-        _, stderr, code = await cmd_exec(cmd, True)
-        if code != 0:
-            LOGGER.error(f"Failed to join {final_name}, stderr: {stderr}")
+        if copied == 0:
+            break
+        offset += copied
+        length -= copied
+        if on_copy is not None:
+            on_copy(copied)
+    return length == 0
+
+
+def copy_range(src, dst, offset, length, listener=None, chunk=1 << 24):
+    with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+        return copy_chunks(fsrc, fdst, offset, length, listener, chunk=chunk)
+
+
+class FileJoiner:
+    def __init__(self, listener):
+        self._listener = listener
+        self._processed = {}
+        self.total = 0
+
+    @property
+    def processed_bytes(self):
+        return sum(self._processed.values())
+
+    @property
+    def progress(self):
+        if not self.total:
+            return "0%"
+        return f"{round(self.processed_bytes * 100 / self.total, 2)}%"
+
+    @staticmethod
+    def _split_sets(files):
+        sets = {}
+        for file_ in files:
+            if match := re_search(r"^(.+)\.(\d{3,})$", file_):
+                sets.setdefault(match[1], []).append((int(match[2]), file_))
+        for name, parts in list(sets.items()):
+            parts.sort()
+            numbers = [number for number, _ in parts]
+            if len(parts) < 2:
+                del sets[name]
+            elif numbers[0] > 1 or numbers != list(
+                range(numbers[0], numbers[0] + len(parts))
+            ):
+                # Joining and then deleting an incomplete run would lose data
+                LOGGER.warning(f"Skipping join of {name}, parts are missing!")
+                del sets[name]
+            else:
+                sets[name] = [file_ for _, file_ in parts]
+        return sets
+
+    @staticmethod
+    def _total_size(sets):
+        return sum(os_stat(part).st_size for parts in sets.values() for part in parts)
+
+    def _concat(self, fpath, parts):
+        with open(fpath, "wb", buffering=0) as fdst:
+            for part in parts:
+                with open(part, "rb", buffering=0) as fsrc:
+                    length = os_stat(fsrc.fileno()).st_size
+                    if not copy_chunks(
+                        fsrc,
+                        fdst,
+                        0,
+                        length,
+                        self._listener,
+                        lambda copied: self._on_copy(fpath, copied),
+                    ):
+                        return False
+        return True
+
+    def _on_copy(self, fpath, copied):
+        self._processed[fpath] += copied
+
+    async def _join_set(self, fpath, parts):
+        try:
+            joined = await sync_to_async(self._concat, fpath, parts)
+        except Exception as e:
+            LOGGER.error(f"Failed to join {ospath.basename(fpath)}, error: {e}")
+            joined = False
+        if not joined:
             if await aiopath.isfile(fpath):
                 await remove(fpath)
-            continue
-        results.append(final_name)
-
-    if not exists:
-        LOGGER.warning("No files to join!")
-    elif results:
-        LOGGER.info("Join Completed!")
-        for res in results:
-            for file_ in files:
-                if re_search(rf"{escape(res)}\.0[0-9]+$", file_):
-                    await remove(f"{opath}/{file_}")
-
-
-async def split_file(f_path, split_size, listener):
-    out_path = f"{f_path}."
-    if listener.is_cancelled:
-        return False
-    listener.subproc = await create_subprocess_exec(
-        "split",
-        "--numeric-suffixes=1",
-        "--suffix-length=3",
-        f"--bytes={split_size}",
-        f_path,
-        out_path,
-        stderr=PIPE,
-    )
-    _, stderr = await listener.subproc.communicate()
-    code = listener.subproc.returncode
-    if listener.is_cancelled:
-        return False
-    if code == -9:
-        listener.is_cancelled = True
-        return False
-    if code != 0:
-        try:
-            stderr = stderr.decode().strip()
-        except:
-            stderr = "Unable to decode the error!"
-        LOGGER.error(f"{stderr}. Split Document: {f_path}")
+            return None
+        for part in parts:
+            await remove(part)
+        return fpath, parts
+
+    async def join(self, opath):
+        sets = {}
+        for name, parts in self._split_sets(await listdir(opath)).items():
+            parts = [f"{opath}/{part}" for part in parts]
+            mime_type = await sync_to_async(get_mime_type, parts[1])
+            if mime_type in ["application/x-7z-compressed", "application/zip"]:
+                continue
+            sets[f"{opath}/{name}"] = parts
+        if not sets:
+            LOGGER.warning("No files to join!")
+            return []
+        self._processed = dict.fromkeys(sets, 0)
+        self.total = self._listener.subsize = await sync_to_async(
+            self._total_size, sets
+        )
+        results = await gather(
+            *(self._join_set(fpath, parts) for fpath, parts in sets.items())
+        )
+        if self._listener.is_cancelled:
+            return []
+        results = [res for res in results if res is not None]
+        if results:
+            LOGGER.info("Join Completed!")
+        return results
+
+
+async def split_file_parts(f_path, f_size, split_size, listener, on_part):
+    for part_path, offset, length in virtual_split(f_path, f_size, split_size):
+        if not await sync_to_async(
+            copy_range, f_path, part_path, offset, length, listener
+        ):
+            if listener.is_cancelled:
+                return False
+            await remove(part_path)
+            raise OSError(f"Short copy while splitting {f_path} at offset {offset}")
+        await on_part(part_path)
     return True
 
 
+class SplitStream:
+    def __init__(self, producer, slots=2):
+        self._queue = Queue()
+        self._slots = Semaphore(slots)
+        self.error = None
+        self._task = create_task(self._run(producer))
+
+    async def _run(self, producer):
+        try:
+            await self._slots.acquire()
+            await producer(self._put)
+        except Exception as e:
+            LOGGER.error(f"Split Stream: {e}")
+            self.error = e
+        finally:
+            self._queue.put_nowait(None)
+
+    async def _put(self, path):
+        await self._queue.put(path)
+        await self._slots.acquire()
+
+    def empty(self):
+        return self._queue.empty()
+
+    async def get(self):
+        return await self._queue.get()
+
+    def release(self):
+        self._slots.release()
+
+    def cancel(self):
+        self._task.cancel()
+
+
+class FilePart(RawIOBase):
+    def __init__(self, path, offset, length, name):
+        super().__init__()
+        self.name = name
+        self._fp = open(path, "rb")
+        self._offset = offset
+        self._length = length
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, pos, whence=SEEK_SET):
+        if whence == SEEK_CUR:
+            pos += self._pos
+        elif whence == SEEK_END:
+            pos += self._length
+        self._pos = max(0, min(pos, self._length))
+        return self._pos
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._length - self._pos)
+        if size <= 0:
+            return 0
+        self._fp.seek(self._offset + self._pos)
+        data = self._fp.read(size)
+        buffer[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._fp.close()
+        super().close()
+
+
 class SevenZ:
     def __init__(self, listener):
         self._listener = listener
-        self._processed_bytes = 0
-        self._percentage = "0%"
+        self._group = SubprocessGroup()
+        self._jobs = {}
 
     @property
     def processed_bytes(self):
-        return self._processed_bytes
+        return sum(done for done, _ in self._jobs.values())
 
     @property
     def progress(self):
-        return self._percentage
-
-    async def _sevenz_progress(self):
-        pattern = (
-            r"(\d+)\s+bytes|Total Physical Size\s*=\s*(\d+)|Physical Size\s*=\s*(\d+)"
-        )
-        async def _update_from_line(line_text):
-            if "%" in line_text:
-                perc = line_text.split("%", 1)[0]
-                if perc.isdigit():
-                    self._percentage = f"{perc}%"
-                    self._processed_bytes = (int(perc) / 100) * self._listener.subsize
-                else:
-                    self._percentage = "0%"
-                return
-            if match := re_search(pattern, line_text):
-                self._listener.subsize = int(match[1] or match[2] or match[3])
-
-        while not (
-            self._listener.subproc.returncode is not None
-            or self._listener.is_cancelled
-            or self._listener.subproc.stdout.at_eof()
+        total = sum(total for _, total in self._jobs.values())
+        if not total:
+            return "0%"
+        return f"{min(100, self.processed_bytes * 100 // total)}%"
+
+    @staticmethod
+    def engine(pswd=""):
+        engine = (Config.ARCHIVE_ENGINE or "7z").lower()
+        if engine == "zstd" and not pswd:
+            return "zstd"
+        return "7z"
+
+    @classmethod
+    def archive_ext(cls, pswd=""):
+        return ".tar.zst" if cls.engine(pswd) == "zstd" else ".zip"
+
+    def _start_job(self, key, total):
+        self._jobs[key] = [0, total]
+        self._listener.subproc = self._group
+        self._update_subsize()
+
+    def _update_subsize(self):
+        self._listener.subsize = sum(total for _, total in self._jobs.values())
+
+    def _parse_line(self, line, job):
+        if match := re_search(r"^(\d+)%", line):
+            job[0] = int(match[1]) * job[1] // 100
+        elif match := re_search(
+            r"(\d+)\s+bytes|Total Physical Size\s*=\s*(\d+)|Physical Size\s*=\s*(\d+)",
+            line,
         ):
+            job[1] = int(match[1] or match[2] or match[3])
+            self._update_subsize()
+        elif line.startswith("ERROR:"):
+            return line
+        return None
+
+    async def _sevenz_progress(self, proc, key):
+        job = self._jobs[key]
+        errors = []
+        pending = ""
+        while not self._listener.is_cancelled:
             try:
-                line = await wait_for(self._listener.subproc.stdout.readline(), 2)
+                chunk = await wait_for(proc.stdout.read(1 << 16), 60)
             except:
                 break
-            line = line.decode().strip()
-            await _update_from_line(line)
-        s = b""
-        while not (
-            self._listener.is_cancelled
-            or self._listener.subproc.returncode is not None
-            or self._listener.subproc.stdout.at_eof()
-        ):
-            try:
-                char = await wait_for(self._listener.subproc.stdout.read(1), 60)
-            except:
+            if not chunk:
                 break
-            if not char:
-                break
-            s += char
-            if char == b"%":
-                try:
-                    self._percentage = s.decode().rsplit(" ", 1)[-1].strip()
-                    self._processed_bytes = (
-                        int(self._percentage.strip("%")) / 100
-                    ) * self._listener.subsize
-                except:
-                    self._processed_bytes = 0
-                    self._percentage = "0%"
-                s = b""
-
-        self._processed_bytes = 0
-        self._percentage = "0%"
+            lines = re_split(r"[\r\n\x08]+", pending + chunk.decode(errors="ignore"))
+            pending = lines.pop()
+            for line in lines:
+                if error := self._parse_line(line.strip(), job):
+                    errors.append(error)
+        return errors
+
+    async def _run(self, key, cmd, kind, want=None):
+        async with cpu_scheduler.job(kind, want) as slot:
+            if self._listener.is_cancelled:
+                return False, ""
+            proc = self._group.add(
+                await create_subprocess_exec(
+                    *slot.taskset(),
+                    *cmd,
+                    f"-mmt{slot.threads}",
+                    stdout=PIPE,
+                    stderr=PIPE,
+                )
+            )
+            errors = await self._sevenz_progress(proc, key)
+            _, stderr = await proc.communicate()
+        if proc.returncode == 0:
+            self._jobs[key][0] = self._jobs[key][1]
+        try:
+            stderr = stderr.decode().strip()
+        except:
+            stderr = "Unable to decode the error!"
+        return proc.returncode, "\n".join(errors + [stderr]).strip()
 
     def _build_zip_cmd(self, dl_path, up_path, pswd, split_size):
         cmd = [
             "7z",
             f"-v{split_size}b",
             "a",
-            "-mx=0",
+            f"-mx={min(max(int(Config.ARCHIVE_LEVEL or 0), 0), 9)}",
             f"-p{pswd}",
             up_path,
             dl_path,
             "-bsp1",
             "-bse1",
-            "-bb3",
         ]
         if not pswd:
             del cmd[4]
@@ -403,33 +758,114 @@ class SevenZ:
             "-xr!@PaxHeader",
             "-bsp1",
             "-bse1",
-            "-bb3",
         ]
         if not pswd:
             del cmd[2]
         if self._listener.is_cancelled:
             return False
-        self._listener.subproc = await create_subprocess_exec(
-            *cmd,
-            stdout=PIPE,
-            stderr=PIPE,
-        )
-        await self._sevenz_progress()
-        _, stderr = await self._listener.subproc.communicate()
-        code = self._listener.subproc.returncode
-        if self._listener.is_cancelled:
+        try:
+            size = (await aiopath.getsize(f_path)) or 1
+        except OSError:
+            size = 1
+        self._start_job(f_path, size)
+        code, stderr = await self._run(f_path, cmd, "extract")
+        if code is False or self._listener.is_cancelled:
             return False
         if code == -9:
             self._listener.is_cancelled = True
             return False
         elif code != 0:
-            try:
-                stderr = stderr.decode().strip()
-            except:
-                stderr = "Unable to decode the error!"
             LOGGER.error(f"{stderr}. Unable to extract archive!. Path: {f_path}")
         return code
 
+    async def _remove_outputs(self, up_path):
+        dirpath, name = up_path.rsplit("/", 1)
+        for file_ in await listdir(dirpath):
+            if file_ == name or re_search(rf"^{re_escape(name)}\.\d+$", file_):
+                try:
+                    await remove(f"{dirpath}/{file_}")
+                except:
+                    pass
+
+    async def _relay(self, source, writer, key):
+        job = self._jobs[key]
+        try:
+            while chunk := await source.stdout.read(1 << 20):
+                if self._listener.is_cancelled:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+                job[0] = min(job[0] + len(chunk), job[1])
+            else:
+                return
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+        # Nobody reads the source anymore, it would block on a full pipe
+        if source.returncode is None:
+            try:
+                source.kill()
+            except ProcessLookupError:
+                pass
+
+    async def _zstd(self, dl_path, up_path, split_size):
+        level = min(max(int(Config.ARCHIVE_LEVEL or 0), 1), 19)
+        dirpath, name = ospath.split(dl_path)
+        async with cpu_scheduler.job("compress") as slot:
+            if self._listener.is_cancelled:
+                return False, ""
+            tar = self._group.add(
+                await create_subprocess_exec(
+                    "tar", "-cf", "-", "-C", dirpath, name, stdout=PIPE, stderr=PIPE
+                )
+            )
+            cmd = [*slot.taskset(), "zstd", f"-T{slot.threads}", f"-{level}", "-q"]
+            if split_size:
+                read_fd, write_fd = pipe()
+                try:
+                    zstd = self._group.add(
+                        await create_subprocess_exec(
+                            *cmd, "-c", stdin=PIPE, stdout=write_fd, stderr=PIPE
+                        )
+                    )
+                    splitter = self._group.add(
+                        await create_subprocess_exec(
+                            "split",
+                            "-b",
+                            f"{split_size}",
+                            "-a",
+                            "3",
+                            "--numeric-suffixes=1",
+                            "-",
+                            f"{up_path}.",
+                            stdin=read_fd,
+                            stderr=PIPE,
+                        )
+                    )
+                finally:
+                    os_close(read_fd)
+                    os_close(write_fd)
+                procs = [tar, zstd, splitter]
+            else:
+                zstd = self._group.add(
+                    await create_subprocess_exec(
+                        *cmd, "-f", "-o", up_path, stdin=PIPE, stderr=PIPE
+                    )
+                )
+                procs = [tar, zstd]
+            # stderr is drained alongside the relay so a chatty tar can't block
+            *errors, _ = await gather(
+                *(proc.stderr.read() for proc in procs),
+                self._relay(tar, zstd.stdin, up_path),
+            )
+            await gather(*(proc.wait() for proc in procs))
+        # tar is killed when its consumer fails, so report the consumer's code first
+        codes = [proc.returncode for proc in (*procs[1:], tar)]
+        code = next((code for code in codes if code), 0)
+        stderr = "\n".join(err.decode(errors="ignore").strip() for err in errors if err)
+        return code, stderr
+
     async def zip(self, dl_path, up_path, pswd):
         size = await get_path_size(dl_path)
         if self._listener.equal_splits:
@@ -437,21 +873,24 @@ class SevenZ:
             split_size = (size // parts) + (size % parts)
         else:
             split_size = self._listener.split_size
-        cmd = self._build_zip_cmd(dl_path, up_path, pswd, split_size)
-        if self._listener.is_leech and int(size) > self._listener.split_size:
+        split = self._listener.is_leech and int(size) > self._listener.split_size
+        if split:
             LOGGER.info(f"Zip: orig_path: {dl_path}, zip_path: {up_path}.0*")
         else:
-            del cmd[1]
             LOGGER.info(f"Zip: orig_path: {dl_path}, zip_path: {up_path}")
         if self._listener.is_cancelled:
             return False
-        self._listener.subproc = await create_subprocess_exec(
-            *cmd, stdout=PIPE, stderr=PIPE
-        )
-        await self._sevenz_progress()
-        _, stderr = await self._listener.subproc.communicate()
-        code = self._listener.subproc.returncode
-        if self._listener.is_cancelled:
+        self._start_job(up_path, size or 1)
+        if self.engine(pswd) == "zstd":
+            code, stderr = await self._zstd(dl_path, up_path, split_size if split else 0)
+        else:
+            cmd = self._build_zip_cmd(dl_path, up_path, pswd, split_size)
+            if not split:
+                del cmd[1]
+            # -mx=0 only stores the files, so a single core is enough
+            want = 1 if int(Config.ARCHIVE_LEVEL or 0) <= 0 else None
+            code, stderr = await self._run(up_path, cmd, "compress", want)
+        if code is False or self._listener.is_cancelled:
             return False
         if code == -9:
             self._listener.is_cancelled = True
@@ -460,11 +899,6 @@ class SevenZ:
             await clean_target(dl_path)
             return up_path
         else:
-            if await aiopath.exists(up_path):
-                await remove(up_path)
-            try:
-                stderr = stderr.decode().strip()
-            except:
-                stderr = "Unable to decode the error!"
+            await self._remove_outputs(up_path)
             LOGGER.error(f"{stderr}. Unable to zip this path: {dl_path}")
             return dl_path
@@ -1,19 +1,28 @@
 from PIL import Image
-from aiofiles.os import remove, path as aiopath, makedirs
+from aiofiles.os import remove, path as aiopath, makedirs, stat
+from array import array
 from asyncio import (
     create_subprocess_exec,
+    create_task,
+    ensure_future,
     gather,
+    shield,
     wait_for,
 )
-from asyncio.subprocess import PIPE
+from asyncio.subprocess import DEVNULL, PIPE
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from json import loads
 from os import path as ospath
 from re import search as re_search, escape
 from time import time
 from aioshutil import rmtree
 
-from ... import LOGGER, DOWNLOAD_DIR, threads, cores
+from ... import LOGGER, DOWNLOAD_DIR
 from ...core.config_manager import Config
-from .bot_utils import cmd_exec, sync_to_async
+from ...core.cpu_scheduler import cpu_scheduler
+from .bot_utils import SubprocessGroup, cmd_exec, sync_to_async
 from .files_utils import get_mime_type, is_archive, is_archive_split
 from .status_utils import time_to_seconds
 
@@ -32,34 +41,74 @@ async def create_thumb(msg, _id=""):
     return output
 
 
+class MediaProbe:
+    _cache = OrderedDict()
+    _pending = {}
+    max_entries = 512
+
+    @classmethod
+    async def probe(cls, path):
+        try:
+            st = await stat(path)
+        except Exception as e:
+            LOGGER.error(f"Media Probe: {e}. Mostly File not found! - File: {path}")
+            return None
+        key = (path, st.st_size, st.st_mtime_ns)
+        if (data := cls._cache.get(key)) is not None:
+            cls._cache.move_to_end(key)
+            return data
+        if (future := cls._pending.get(key)) is None:
+            future = cls._pending[key] = ensure_future(cls._run(path))
+            future.add_done_callback(lambda _: cls._pending.pop(key, None))
+        data = await shield(future)
+        if data is not None:
+            cls._cache[key] = data
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > cls.max_entries:
+                cls._cache.popitem(last=False)
+        return data
+
+    @staticmethod
+    async def _run(path):
+        try:
+            stdout, stderr, code = await cmd_exec(
+                [
+                    "ffprobe",
+                    "-hide_banner",
+                    "-loglevel",
+                    "error",
+                    "-print_format",
+                    "json",
+                    "-show_format",
+                    "-show_streams",
+                    path,
+                ]
+            )
+        except Exception as e:
+            LOGGER.error(f"Media Probe: {e}. Mostly File not found! - File: {path}")
+            return None
+        if code != 0 or not stdout:
+            LOGGER.error(f"Media Probe: {stderr} - File: {path}")
+            return None
+        try:
+            data = loads(stdout)
+        except ValueError as e:
+            LOGGER.error(f"Media Probe: {e} - File: {path}")
+            return None
+        data.setdefault("format", {})
+        data.setdefault("streams", [])
+        return data
+
+
 async def get_media_info(path):
-    try:
-        result = await cmd_exec(
-            [
-                "ffprobe",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-print_format",
-                "json",
-                "-show_format",
-                path,
-            ]
-        )
-    except Exception as e:
-        LOGGER.error(f"Get Media Info: {e}. Mostly File not found! - File: {path}")
+    if (data := await MediaProbe.probe(path)) is None:
         return 0, None, None
-    if result[0] and result[2] == 0:
-        fields = eval(result[0]).get("format")
-        if fields is None:
-            LOGGER.error(f"get_media_info: {result}")
-            return 0, None, None
-        duration = round(float(fields.get("duration", 0)))
-        tags = fields.get("tags", {})
-        artist = tags.get("artist") or tags.get("ARTIST") or tags.get("Artist")
-        title = tags.get("title") or tags.get("TITLE") or tags.get("Title")
-        return duration, artist, title
-    return 0, None, None
+    fields = data["format"]
+    duration = round(float(fields.get("duration", 0)))
+    tags = fields.get("tags", {})
+    artist = tags.get("artist") or tags.get("ARTIST") or tags.get("Artist")
+    title = tags.get("title") or tags.get("TITLE") or tags.get("Title")
+    return duration, artist, title
 
 
 def _is_archive_like(path):
@@ -77,49 +126,23 @@ async def get_document_type(path):
     mime_type = await sync_to_async(get_mime_type, path)
     if mime_type.startswith("image"):
         return False, False, True
-    try:
-        result = await cmd_exec(
-            [
-                "ffprobe",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-print_format",
-                "json",
-                "-show_streams",
-                path,
-            ]
-        )
-        if result[1] and mime_type.startswith("video"):
-            is_video = True
-    except Exception as e:
-        LOGGER.error(f"Get Document Type: {e}. Mostly File not found! - File: {path}")
-        if mime_type.startswith("audio"):
-            return False, True, False
-        if not mime_type.startswith("video") and not mime_type.endswith("octet-stream"):
-            return is_video, is_audio, is_image
-        if mime_type.startswith("video"):
-            is_video = True
-        return is_video, is_audio, is_image
-    if result[0] and result[2] == 0:
-        fields = eval(result[0]).get("streams")
-        if fields is None:
-            LOGGER.error(f"get_document_type: {result}")
-            return is_video, is_audio, is_image
-        is_video = False
-        for stream in fields:
-            if stream.get("codec_type") == "video":
-                codec_name = stream.get("codec_name", "").lower()
-                if codec_name not in {"mjpeg", "png", "bmp"}:
-                    is_video = True
-            elif stream.get("codec_type") == "audio":
-                is_audio = True
+    if (data := await MediaProbe.probe(path)) is None:
+        return mime_type.startswith("video"), mime_type.startswith("audio"), False
+    for stream in data["streams"]:
+        if stream.get("codec_type") == "video":
+            codec_name = stream.get("codec_name", "").lower()
+            if codec_name not in {"mjpeg", "png", "bmp"}:
+                is_video = True
+        elif stream.get("codec_type") == "audio":
+            is_audio = True
     return is_video, is_audio, is_image
 
 
 async def _extract_thumbnail(cmd, output, error_context):
     try:
-        _, err, code = await wait_for(cmd_exec(cmd), timeout=60)
+        async with cpu_scheduler.job("thumbnail") as slot:
+            cmd = [*slot.taskset(), *cmd, "-threads", f"{slot.threads}", output]
+            _, err, code = await wait_for(cmd_exec(cmd), timeout=60)
         if code != 0 or not await aiopath.exists(output):
             LOGGER.error(f"{error_context} stderr: {err}")
             return None
@@ -131,26 +154,108 @@ async def _extract_thumbnail(cmd, output, error_context):
     return output
 
 
-async def take_ss(video_file, ss_nb) -> bool:
-    duration = (await get_media_info(video_file))[0]
-    if duration != 0:
-        dirpath, name = video_file.rsplit("/", 1)
-        name, _ = ospath.splitext(name)
-        dirpath = f"{dirpath}/{name}_mltbss"
-        await makedirs(dirpath, exist_ok=True)
-        interval = duration // (ss_nb + 1)
-        cap_time = interval
+def _ss_dir(video_file):
+    dirpath, name = video_file.rsplit("/", 1)
+    name, _ = ospath.splitext(name)
+    return f"{dirpath}/{name}_mltbss", name
+
+
+async def _extract_frames(video_file, duration, ss_nb, ss_dir=None, tile=None):
+    # One ffmpeg run: every input seeks to the keyframe nearest to its
+    # timestamp and decodes only that frame, the frames are written as
+    # screenshots and/or tiled in the same filter graph.
+    interval = duration // (ss_nb + 1)
+    graph = []
+    for i in range(ss_nb):
+        chain = f"[{i}:v:0]trim=end_frame=1,setpts=PTS-STARTPTS"
+        if ss_dir and tile:
+            chain += f",split[s{i}][t{i}]"
+        else:
+            chain += f"[s{i}]" if ss_dir else f"[t{i}]"
+        graph.append(chain)
+    if tile:
+        layout, _ = tile
+        frames = "".join(f"[t{i}]" for i in range(ss_nb))
+        graph.append(f"{frames}concat=n={ss_nb}:v=1:a=0,tile={layout}[tile]")
+    async with cpu_scheduler.job("screenshot") as slot:
+        cmd = [
+            *slot.taskset(),
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+        ]
+        for i in range(ss_nb):
+            cmd.extend(
+                [
+                    "-skip_frame",
+                    "nokey",
+                    "-noaccurate_seek",
+                    "-ss",
+                    f"{interval * (i + 1)}",
+                    "-i",
+                    video_file,
+                ]
+            )
+        cmd.extend(["-filter_complex", ";".join(graph)])
+        outputs = []
+        if ss_dir:
+            dirpath, name = ss_dir
+            for i in range(ss_nb):
+                output = f"{dirpath}/SS.{name}_{i:02}.png"
+                cmd.extend(["-map", f"[s{i}]", "-frames:v", "1", output])
+                outputs.append(output)
+        if tile:
+            _, output = tile
+            cmd.extend(
+                [
+                    "-map",
+                    "[tile]",
+                    "-q:v",
+                    "1",
+                    "-frames:v",
+                    "1",
+                    "-f",
+                    "mjpeg",
+                    "-threads",
+                    f"{slot.threads}",
+                    output,
+                ]
+            )
+            outputs.append(output)
+        try:
+            _, err, code = await wait_for(cmd_exec(cmd), timeout=60)
+        except:
+            err, code = "Timeout", -1
+    if code == 0:
+        for output in outputs:
+            if not await aiopath.exists(output):
+                break
+        else:
+            return True
+    LOGGER.warning(
+        f"Single pass frame extraction failed, falling back to one ffmpeg per frame. Path: {video_file}. stderr: {err}"
+    )
+    return False
+
+
+async def _take_ss_each(video_file, duration, ss_nb, dirpath, name):
+    interval = duration // (ss_nb + 1)
+    cap_time = interval
+    async with cpu_scheduler.job(
+        "screenshot", min(ss_nb, max(1, cpu_scheduler.total // 2))
+    ) as slot:
         cmds = []
         for i in range(ss_nb):
             output = f"{dirpath}/SS.{name}_{i:02}.png"
             cmd = [
-                "taskset",
-                "-c",
-                f"{cores}",
+                *slot.taskset(),
                 "ffmpeg",
                 "-hide_banner",
                 "-loglevel",
                 "error",
+                "-y",
                 "-ss",
                 f"{cap_time}",
                 "-i",
@@ -160,7 +265,7 @@ async def take_ss(video_file, ss_nb) -> bool:
                 "-frames:v",
                 "1",
                 "-threads",
-                f"{threads}",
+                "1",
                 output,
             ]
             cap_time += interval
@@ -179,7 +284,19 @@ async def take_ss(video_file, ss_nb) -> bool:
             )
             await rmtree(dirpath, ignore_errors=True)
             return False
-        return dirpath
+    return True
+
+
+async def take_ss(video_file, ss_nb) -> bool:
+    duration = (await get_media_info(video_file))[0]
+    if duration != 0:
+        dirpath, name = _ss_dir(video_file)
+        await makedirs(dirpath, exist_ok=True)
+        if await _extract_frames(video_file, duration, ss_nb, (dirpath, name)):
+            return dirpath
+        if await _take_ss_each(video_file, duration, ss_nb, dirpath, name):
+            return dirpath
+        return False
     else:
         LOGGER.error("take_ss: Can't get the duration of video")
         return False
@@ -199,9 +316,6 @@ async def get_audio_thumbnail(audio_file):
     await makedirs(output_dir, exist_ok=True)
     output = ospath.join(output_dir, f"{time()}.jpg")
     cmd = [
-        "taskset",
-        "-c",
-        f"{cores}",
         "ffmpeg",
         "-hide_banner",
         "-loglevel",
@@ -211,9 +325,6 @@ async def get_audio_thumbnail(audio_file):
         "-an",
         "-vcodec",
         "copy",
-        "-threads",
-        f"{threads}",
-        output,
     ]
     return await _extract_thumbnail(
         cmd,
@@ -241,9 +352,6 @@ async def get_video_thumbnail(video_file, duration):
         duration = 3
     duration = duration // 2
     cmd = [
-        "taskset",
-        "-c",
-        f"{cores}",
         "ffmpeg",
         "-hide_banner",
         "-loglevel",
@@ -258,9 +366,6 @@ async def get_video_thumbnail(video_file, duration):
         "1",
         "-frames:v",
         "1",
-        "-threads",
-        f"{threads}",
-        output,
     ]
     return await _extract_thumbnail(
         cmd,
@@ -272,38 +377,50 @@ async def get_video_thumbnail(video_file, duration):
 async def get_multiple_frames_thumbnail(video_file, layout, keep_screenshots):
     ss_nb = layout.split("x")
     ss_nb = int(ss_nb[0]) * int(ss_nb[1])
-    dirpath = await take_ss(video_file, ss_nb)
-    if not dirpath:
+    duration = (await get_media_info(video_file))[0]
+    if duration == 0:
+        LOGGER.error("Can't get the duration of video for thumbnail layout")
         return None
     output_dir = f"{DOWNLOAD_DIR}thumbnails"
     await makedirs(output_dir, exist_ok=True)
     output = ospath.join(output_dir, f"{time()}.jpg")
-    cmd = [
-        "taskset",
-        "-c",
-        f"{cores}",
-        "ffmpeg",
-        "-hide_banner",
-        "-loglevel",
-        "error",
-        "-pattern_type",
-        "glob",
-        "-i",
-        f"{escape(dirpath)}/*.png",
-        "-vf",
-        f"tile={layout}, thumbnail",
-        "-q:v",
-        "1",
-        "-frames:v",
-        "1",
-        "-f",
-        "mjpeg",
-        "-threads",
-        f"{threads}",
-        output,
-    ]
+    dirpath, name = _ss_dir(video_file)
+    ss_dir = None
+    if keep_screenshots:
+        await makedirs(dirpath, exist_ok=True)
+        ss_dir = (dirpath, name)
+    if await _extract_frames(video_file, duration, ss_nb, ss_dir, (layout, output)):
+        return output
+    if await aiopath.exists(output):
+        await remove(output)
+    await makedirs(dirpath, exist_ok=True)
+    if not await _take_ss_each(video_file, duration, ss_nb, dirpath, name):
+        return None
     try:
-        _, err, code = await wait_for(cmd_exec(cmd), timeout=60)
+        async with cpu_scheduler.job("thumbnail") as slot:
+            cmd = [
+                *slot.taskset(),
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-pattern_type",
+                "glob",
+                "-i",
+                f"{escape(dirpath)}/*.png",
+                "-vf",
+                f"tile={layout}, thumbnail",
+                "-q:v",
+                "1",
+                "-frames:v",
+                "1",
+                "-f",
+                "mjpeg",
+                "-threads",
+                f"{slot.threads}",
+                output,
+            ]
+            _, err, code = await wait_for(cmd_exec(cmd), timeout=60)
         if code != 0 or not await aiopath.exists(output):
             LOGGER.error(
                 f"Error while combining thumbnails for video. Name: {video_file} stderr: {err}"
@@ -320,10 +437,93 @@ async def get_multiple_frames_thumbnail(video_file, layout, keep_screenshots):
     return output
 
 
+class KeyframeIndex:
+    __slots__ = ("times", "offsets", "total")
+
+    def __init__(self):
+        self.times = array("d")
+        self.offsets = array("q")
+        self.total = 0
+
+    @classmethod
+    async def scan(cls, path):
+        if not (info := await MediaProbe.probe(path)):
+            return None
+        video = next(
+            (
+                stream["index"]
+                for stream in info["streams"]
+                if stream.get("codec_type") == "video"
+                and not stream.get("disposition", {}).get("attached_pic")
+            ),
+            None,
+        )
+        if video is None:
+            return None
+        try:
+            start = float(info["format"].get("start_time") or 0)
+        except ValueError:
+            start = 0
+        video = str(video).encode()
+        index = cls()
+        async with cpu_scheduler.job("split") as slot:
+            proc = await create_subprocess_exec(
+                *slot.taskset(),
+                "ffprobe",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-show_entries",
+                "packet=stream_index,pts_time,dts_time,size,flags",
+                "-of",
+                "csv=p=0",
+                path,
+                stdout=PIPE,
+                stderr=DEVNULL,
+            )
+            try:
+                async for line in proc.stdout:
+                    fields = line.rstrip().split(b",")
+                    if len(fields) < 5 or not fields[3].isdigit():
+                        continue
+                    if fields[0] == video and b"K" in fields[4]:
+                        pts = fields[1] if fields[1] != b"N/A" else fields[2]
+                        if pts != b"N/A":
+                            index.times.append(float(pts) - start)
+                            index.offsets.append(index.total)
+                    index.total += int(fields[3])
+            finally:
+                if proc.returncode is None:
+                    try:
+                        proc.kill()
+                    except ProcessLookupError:
+                        pass
+                await proc.wait()
+        if proc.returncode != 0 or not index.times:
+            return None
+        return index
+
+    def cuts(self, budget):
+        cuts = []
+        start_time, start_byte, lo = 0.0, 0, 0
+        while self.total - start_byte > budget:
+            end = bisect_right(self.offsets, start_byte + budget, lo) - 1
+            if end < lo or self.times[end] <= start_time:
+                return None
+            cuts.append(
+                (start_time, self.times[end], self.offsets[end] - start_byte)
+            )
+            start_time, start_byte, lo = self.times[end], self.offsets[end], end + 1
+        cuts.append((start_time, None, self.total - start_byte))
+        return cuts
+
+
 class FFMpeg:
 
-    def __init__(self, listener):
+    def __init__(self, listener, group=None):
         self._listener = listener
+        self._group = group
+        self._proc = None
         self._processed_bytes = 0
         self._last_processed_bytes = 0
         self._processed_time = 0
@@ -362,14 +562,42 @@ class FFMpeg:
         self._last_processed_time = 0
         self._last_processed_bytes = 0
 
+    @property
+    def processed_time(self):
+        return self._processed_time
+
+    @asynccontextmanager
+    async def _cpu_slot(self, kind):
+        if self._group is not None:
+            async with cpu_scheduler.job(kind) as slot:
+                self._start_time = time()
+                yield slot
+            return
+        self._listener.progress = False
+        try:
+            async with cpu_scheduler.job(kind) as slot:
+                self._listener.progress = True
+                self._start_time = time()
+                yield slot
+        finally:
+            self._listener.progress = True
+
+    async def _spawn(self, *cmd, **kwargs):
+        self._proc = await create_subprocess_exec(*cmd, **kwargs)
+        if self._group is None:
+            self._listener.subproc = self._proc
+        else:
+            self._group.add(self._proc)
+        return self._proc
+
     async def _ffmpeg_progress(self):
         while not (
-            self._listener.subproc.returncode is not None
+            self._proc.returncode is not None
             or self._listener.is_cancelled
-            or self._listener.subproc.stdout.at_eof()
+            or self._proc.stdout.at_eof()
         ):
             try:
-                line = await wait_for(self._listener.subproc.stdout.readline(), 60)
+                line = await wait_for(self._proc.stdout.readline(), 60)
             except:
                 break
             line = line.decode().strip()
@@ -428,14 +656,15 @@ class FFMpeg:
             output = f"{dir}/{prefix}{output_file.replace("mltb", base_name)}{ext}"
             outputs.append(output)
             ffmpeg[index] = output
-        if self._listener.is_cancelled:
-            return False
-        self._listener.subproc = await create_subprocess_exec(
-            *ffmpeg, stdout=PIPE, stderr=PIPE
-        )
-        await self._ffmpeg_progress()
-        _, stderr = await self._listener.subproc.communicate()
-        code = self._listener.subproc.returncode
+        async with self._cpu_slot("ffmpeg") as slot:
+            if self._listener.is_cancelled:
+                return False
+            await self._spawn(
+                *slot.taskset(), *ffmpeg, stdout=PIPE, stderr=PIPE
+            )
+            await self._ffmpeg_progress()
+            _, stderr = await self._proc.communicate()
+        code = self._proc.returncode
         if self._listener.is_cancelled:
             return False
         if code == 0:
@@ -461,64 +690,61 @@ class FFMpeg:
         self._total_time = (await get_media_info(video_file))[0]
         base_name = ospath.splitext(video_file)[0]
         output = f"{base_name}.{ext}"
-        if retry:
-            cmd = [
-                "taskset",
-                "-c",
-                f"{cores}",
-                "ffmpeg",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-progress",
-                "pipe:1",
-                "-i",
-                video_file,
-                "-map",
-                "0",
-                "-c:v",
-                "libx264",
-                "-c:a",
-                "aac",
-                "-threads",
-                f"{threads}",
-                output,
-            ]
-            if ext == "mp4":
-                cmd[17:17] = ["-c:s", "mov_text"]
-            elif ext == "mkv":
-                cmd[17:17] = ["-c:s", "ass"]
+        async with self._cpu_slot("convert") as slot:
+            if retry:
+                cmd = [
+                    *slot.taskset(),
+                    "ffmpeg",
+                    "-hide_banner",
+                    "-loglevel",
+                    "error",
+                    "-progress",
+                    "pipe:1",
+                    "-i",
+                    video_file,
+                    "-map",
+                    "0",
+                    "-c:v",
+                    "libx264",
+                    "-c:a",
+                    "aac",
+                    "-threads",
+                    f"{slot.threads}",
+                    output,
+                ]
+                if ext == "mp4":
+                    cmd[17:17] = ["-c:s", "mov_text"]
+                elif ext == "mkv":
+                    cmd[17:17] = ["-c:s", "ass"]
+                else:
+                    cmd[17:17] = ["-c:s", "copy"]
             else:
-                cmd[17:17] = ["-c:s", "copy"]
-        else:
-            cmd = [
-                "taskset",
-                "-c",
-                f"{cores}",
-                "ffmpeg",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-progress",
-                "pipe:1",
-                "-i",
-                video_file,
-                "-map",
-                "0",
-                "-c",
-                "copy",
-                "-threads",
-                f"{threads}",
-                output,
-            ]
-        if self._listener.is_cancelled:
-            return False
-        self._listener.subproc = await create_subprocess_exec(
-            *cmd, stdout=PIPE, stderr=PIPE
-        )
-        await self._ffmpeg_progress()
-        _, stderr = await self._listener.subproc.communicate()
-        code = self._listener.subproc.returncode
+                cmd = [
+                    *slot.taskset(),
+                    "ffmpeg",
+                    "-hide_banner",
+                    "-loglevel",
+                    "error",
+                    "-progress",
+                    "pipe:1",
+                    "-i",
+                    video_file,
+                    "-map",
+                    "0",
+                    "-c",
+                    "copy",
+                    "-threads",
+                    f"{slot.threads}",
+                    output,
+                ]
+            if self._listener.is_cancelled:
+                return False
+            await self._spawn(
+                *cmd, stdout=PIPE, stderr=PIPE
+            )
+            await self._ffmpeg_progress()
+            _, stderr = await self._proc.communicate()
+        code = self._proc.returncode
         if self._listener.is_cancelled:
             return False
         if code == 0:
@@ -545,30 +771,29 @@ class FFMpeg:
         self._total_time = (await get_media_info(audio_file))[0]
         base_name = ospath.splitext(audio_file)[0]
         output = f"{base_name}.{ext}"
-        cmd = [
-            "taskset",
-            "-c",
-            f"{cores}",
-            "ffmpeg",
-            "-hide_banner",
-            "-loglevel",
-            "error",
-            "-progress",
-            "pipe:1",
-            "-i",
-            audio_file,
-            "-threads",
-            f"{threads}",
-            output,
-        ]
-        if self._listener.is_cancelled:
-            return False
-        self._listener.subproc = await create_subprocess_exec(
-            *cmd, stdout=PIPE, stderr=PIPE
-        )
-        await self._ffmpeg_progress()
-        _, stderr = await self._listener.subproc.communicate()
-        code = self._listener.subproc.returncode
+        async with self._cpu_slot("audio") as slot:
+            cmd = [
+                *slot.taskset(),
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-progress",
+                "pipe:1",
+                "-i",
+                audio_file,
+                "-threads",
+                f"{slot.threads}",
+                output,
+            ]
+            if self._listener.is_cancelled:
+                return False
+            await self._spawn(
+                *cmd, stdout=PIPE, stderr=PIPE
+            )
+            await self._ffmpeg_progress()
+            _, stderr = await self._proc.communicate()
+        code = self._proc.returncode
         if self._listener.is_cancelled:
             return False
         if code == 0:
@@ -618,41 +843,40 @@ class FFMpeg:
 
         filter_complex += f"concat=n={len(segments)}:v=1:a=1[vout][aout]"
 
-        cmd = [
-            "taskset",
-            "-c",
-            f"{cores}",
-            "ffmpeg",
-            "-hide_banner",
-            "-loglevel",
-            "error",
-            "-progress",
-            "pipe:1",
-            "-i",
-            video_file,
-            "-filter_complex",
-            filter_complex,
-            "-map",
-            "[vout]",
-            "-map",
-            "[aout]",
-            "-c:v",
-            "libx264",
-            "-c:a",
-            "aac",
-            "-threads",
-            f"{threads}",
-            output_file,
-        ]
+        async with self._cpu_slot("sample") as slot:
+            cmd = [
+                *slot.taskset(),
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-progress",
+                "pipe:1",
+                "-i",
+                video_file,
+                "-filter_complex",
+                filter_complex,
+                "-map",
+                "[vout]",
+                "-map",
+                "[aout]",
+                "-c:v",
+                "libx264",
+                "-c:a",
+                "aac",
+                "-threads",
+                f"{slot.threads}",
+                output_file,
+            ]
 
-        if self._listener.is_cancelled:
-            return False
-        self._listener.subproc = await create_subprocess_exec(
-            *cmd, stdout=PIPE, stderr=PIPE
-        )
-        await self._ffmpeg_progress()
-        _, stderr = await self._listener.subproc.communicate()
-        code = self._listener.subproc.returncode
+            if self._listener.is_cancelled:
+                return False
+            await self._spawn(
+                *cmd, stdout=PIPE, stderr=PIPE
+            )
+            await self._ffmpeg_progress()
+            _, stderr = await self._proc.communicate()
+        code = self._proc.returncode
         if self._listener.is_cancelled:
             return False
         if code == -9:
@@ -672,57 +896,169 @@ class FFMpeg:
                 await remove(output_file)
             return False
 
-    async def split(self, f_path, file_, parts, split_size):
-        self.clear()
-        multi_streams = True
-        self._total_time = duration = (await get_media_info(f_path))[0]
-        base_name, extension = ospath.splitext(file_)
-        split_size -= 3000000
-        start_time = 0
-        i = 1
-        while i <= parts or start_time < duration - 4:
-            out_path = f_path.replace(file_, f"{base_name}.part{i:03}{extension}")
+    def _cut_progress(self, processed_time):
+        self._last_processed_time = processed_time
+        self._processed_time = processed_time
+        self._processed_bytes = self._last_processed_bytes
+        self._speed_raw = self._processed_bytes / max(time() - self._start_time, 1)
+        try:
+            self._progress_raw = processed_time * 100 / self._total_time
+            self._eta_raw = (
+                (self._total_time - processed_time)
+                * (time() - self._start_time)
+                / processed_time
+            )
+        except ZeroDivisionError:
+            self._progress_raw = 0
+            self._eta_raw = 0
+
+    async def _cut(self, f_path, out_path, start, end, group):
+        async with cpu_scheduler.job("split") as slot:
+            if self._listener.is_cancelled:
+                return False
             cmd = [
-                "taskset",
-                "-c",
-                f"{cores}",
+                *slot.taskset(),
                 "ffmpeg",
                 "-hide_banner",
                 "-loglevel",
                 "error",
-                "-progress",
-                "pipe:1",
+                "-y",
                 "-ss",
-                str(start_time),
+                f"{start}",
                 "-i",
                 f_path,
-                "-fs",
-                str(split_size),
-                "-map",
-                "0",
-                "-map_chapters",
-                "-1",
-                "-async",
-                "1",
-                "-strict",
-                "-2",
-                "-c",
-                "copy",
-                "-threads",
-                f"{threads}",
-                out_path,
             ]
-            if not multi_streams:
-                del cmd[15]
-                del cmd[15]
+            if end is not None:
+                cmd.extend(["-t", f"{end - start}"])
+            cmd.extend(
+                [
+                    "-map",
+                    "0",
+                    "-map_chapters",
+                    "-1",
+                    "-async",
+                    "1",
+                    "-strict",
+                    "-2",
+                    "-c",
+                    "copy",
+                    "-threads",
+                    f"{slot.threads}",
+                    out_path,
+                ]
+            )
+            proc = group.add(
+                await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
+            )
+            _, stderr = await proc.communicate()
+        if proc.returncode == 0 and await aiopath.exists(out_path):
+            if await aiopath.getsize(out_path) <= self._listener.max_split_size:
+                return True
+            stderr = b"part is bigger than the split limit"
+        if not self._listener.is_cancelled:
+            LOGGER.warning(
+                f"{stderr.decode(errors='ignore').strip()}. Planned cut failed. Path: {out_path}"
+            )
+        if await aiopath.exists(out_path):
+            await remove(out_path)
+        return False
+
+    async def _split_planned(self, f_path, file_, cuts, on_part):
+        base_name, extension = ospath.splitext(file_)
+        group = self._listener.subproc = SubprocessGroup()
+        pending = deque()
+        done = 0
+        try:
+            while done < len(cuts):
+                while len(pending) < 2 and done + len(pending) < len(cuts):
+                    n = done + len(pending)
+                    out_path = f_path.replace(
+                        file_, f"{base_name}.part{n + 1:03}{extension}"
+                    )
+                    start, end, _ = cuts[n]
+                    task = create_task(self._cut(f_path, out_path, start, end, group))
+                    pending.append((out_path, task))
+                out_path, task = pending[0]
+                if not await task:
+                    return done
+                pending.popleft()
+                self._last_processed_bytes += await aiopath.getsize(out_path)
+                self._cut_progress(cuts[done][1] or self._total_time)
+                done += 1
+                if on_part is not None:
+                    await on_part(out_path)
+            return done
+        finally:
+            group.kill()
+            for out_path, task in pending:
+                task.cancel()
+            await gather(*(task for _, task in pending), return_exceptions=True)
+            for out_path, _ in pending:
+                if await aiopath.exists(out_path):
+                    await remove(out_path)
+
+    async def split(self, f_path, file_, parts, split_size, on_part=None):
+        self.clear()
+        multi_streams = True
+        self._total_time = duration = (await get_media_info(f_path))[0]
+        base_name, extension = ospath.splitext(file_)
+        split_size -= 3000000
+        start_time = 0
+        i = 1
+        if (index := await KeyframeIndex.scan(f_path)) and (
+            cuts := index.cuts(split_size)
+        ):
+            done = await self._split_planned(f_path, file_, cuts, on_part)
             if self._listener.is_cancelled:
                 return False
-            self._listener.subproc = await create_subprocess_exec(
-                *cmd, stdout=PIPE, stderr=PIPE
+            if done == len(cuts):
+                return True
+            start_time, i = cuts[done][0], done + 1
+            LOGGER.warning(
+                f"Continuing part {i} with trial and error split. Path: {f_path}"
             )
-            await self._ffmpeg_progress()
-            _, stderr = await self._listener.subproc.communicate()
-            code = self._listener.subproc.returncode
+        while i <= parts or start_time < duration - 4:
+            out_path = f_path.replace(file_, f"{base_name}.part{i:03}{extension}")
+            async with cpu_scheduler.job("split") as slot:
+                cmd = [
+                    *slot.taskset(),
+                    "ffmpeg",
+                    "-hide_banner",
+                    "-loglevel",
+                    "error",
+                    "-progress",
+                    "pipe:1",
+                    "-ss",
+                    str(start_time),
+                    "-i",
+                    f_path,
+                    "-fs",
+                    str(split_size),
+                    "-map",
+                    "0",
+                    "-map_chapters",
+                    "-1",
+                    "-async",
+                    "1",
+                    "-strict",
+                    "-2",
+                    "-c",
+                    "copy",
+                    "-threads",
+                    f"{slot.threads}",
+                    out_path,
+                ]
+                if not multi_streams:
+                    del cmd[15]
+                    del cmd[15]
+                if self._listener.is_cancelled:
+                    return False
+                await self._spawn(
+                    *cmd, stdout=PIPE, stderr=PIPE
+                )
+                await self._ffmpeg_progress()
+                _, stderr = await self._proc.communicate()
+            code = self._proc.returncode
             if self._listener.is_cancelled:
                 return False
             if code == -9:
@@ -761,11 +1097,15 @@ class FFMpeg:
                 LOGGER.error(
                     f"Something went wrong while splitting, mostly file is corrupted. Path: {f_path}"
                 )
+                if on_part is not None:
+                    await on_part(out_path)
                 break
             elif duration == lpd:
                 LOGGER.warning(
                     f"This file has been splitted with default stream and audio, so you will only see one part with less size from original one because it doesn't have all streams and audios. This happens mostly with MKV videos. Path: {f_path}"
                 )
+                if on_part is not None:
+                    await on_part(out_path)
                 break
             elif lpd <= 3:
                 await remove(out_path)
@@ -774,5 +1114,88 @@ class FFMpeg:
             self._last_processed_bytes += out_size
             start_time += lpd - 3
             i += 1
+            if on_part is not None:
+                await on_part(out_path)
         return True
 
+
+class FFMpegBatch:
+    def __init__(self, listener):
+        self._listener = listener
+        self._group = SubprocessGroup()
+        self._active = set()
+        self._done_bytes = 0
+        self._done_time = 0
+        self._total_time = 0
+        self._start_time = time()
+
+    @property
+    def processed_bytes(self):
+        return self._done_bytes + sum(
+            ffmpeg.processed_bytes for ffmpeg in self._active
+        )
+
+    @property
+    def processed_time(self):
+        return self._done_time + sum(ffmpeg.processed_time for ffmpeg in self._active)
+
+    @property
+    def speed_raw(self):
+        return self.processed_bytes / max(time() - self._start_time, 1)
+
+    @property
+    def progress_raw(self):
+        try:
+            return min(self.processed_time * 100 / self._total_time, 100)
+        except ZeroDivisionError:
+            return 0
+
+    @property
+    def eta_raw(self):
+        processed = self.processed_time
+        if not processed:
+            return 0
+        remaining = max(self._total_time - processed, 0)
+        return remaining * (time() - self._start_time) / processed
+
+    async def run(self, files, func):
+        files = list(files)
+        probes = await gather(*(get_media_info(f_path) for f_path, _ in files))
+        durations = [probe[0] for probe in probes]
+        self._total_time = sum(durations)
+        self._start_time = time()
+        # Workers run side by side, so the status shows the batch as a whole
+        listener = self._listener
+        listener.proceed_count = 0
+        if not listener.is_file:
+            listener.subname = f"{len(files)} files"
+            listener.subsize = sum(
+                listener.manifest.file_size(f_path) for f_path, _ in files
+            )
+        listener.subproc = self._group
+        results = [None] * len(files)
+        jobs = iter(enumerate(files))
+        failed = False
+
+        async def worker():
+            for index, (f_path, arg) in jobs:
+                if failed or self._listener.is_cancelled:
+                    return
+                ffmpeg = FFMpeg(self._listener, self._group)
+                self._active.add(ffmpeg)
+                try:
+                    results[index] = await func(ffmpeg, f_path, arg)
+                finally:
+                    self._active.discard(ffmpeg)
+                    self._done_bytes += ffmpeg.processed_bytes
+                    self._done_time += durations[index]
+                    listener.proceed_count += 1
+
+        workers = max(1, min(len(files), cpu_scheduler.total))
+        try:
+            await gather(*(worker() for _ in range(workers)))
+        except BaseException:
+            failed = True
+            self._group.kill()
+            raise
+        return results
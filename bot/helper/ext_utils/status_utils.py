@@ -1,9 +1,17 @@
 from html import escape
 from psutil import virtual_memory, cpu_percent, disk_usage
 from time import time
-from asyncio import iscoroutinefunction, gather
-
-from ... import task_dict, task_dict_lock, bot_start_time, status_dict, DOWNLOAD_DIR, user_data
+from asyncio import Lock, iscoroutinefunction, gather
+
+from ... import (
+    LOGGER,
+    task_dict,
+    task_dict_lock,
+    bot_start_time,
+    status_dict,
+    DOWNLOAD_DIR,
+    user_data,
+)
 from ...core.config_manager import Config
 from ..telegram_helper.button_build import ButtonMaker
 from ..telegram_helper.bot_commands import BotCommands
@@ -21,6 +29,7 @@ class MirrorStatus:
     STATUS_ARCHIVE = "Archive"
     STATUS_EXTRACT = "Extract"
     STATUS_SPLIT = "Split"
+    STATUS_JOIN = "Join"
     STATUS_CHECK = "CheckUp"
     STATUS_SEED = "Seed"
     STATUS_SAMVID = "SamVid"
@@ -40,6 +49,7 @@ STATUSES = {
     "CL": MirrorStatus.STATUS_CLONE,
     "CM": MirrorStatus.STATUS_CONVERT,
     "SP": MirrorStatus.STATUS_SPLIT,
+    "JN": MirrorStatus.STATUS_JOIN,
     "SV": MirrorStatus.STATUS_SAMVID,
     "FF": MirrorStatus.STATUS_FFMPEG,
     "PA": MirrorStatus.STATUS_PAUSED,
@@ -57,6 +67,7 @@ STATUS_EMOJI = {
     MirrorStatus.STATUS_ARCHIVE: "🗜️",
     MirrorStatus.STATUS_EXTRACT: "📦",
     MirrorStatus.STATUS_SPLIT: "✂️",
+    MirrorStatus.STATUS_JOIN: "🔗",
     MirrorStatus.STATUS_CHECK: "✅",
     MirrorStatus.STATUS_SAMVID: "🎞️",
     MirrorStatus.STATUS_CONVERT: "🎛️",
@@ -81,29 +92,75 @@ def speed_indicator(speed_text: str):
 
 
 async def get_task_by_gid(gid: str):
-    async with task_dict_lock:
-        for tk in task_dict.values():
-            if hasattr(tk, "seeding"):
-                await tk.update()
-            if tk.gid() == gid:
-                return tk
-        return None
+    return task_dict.get_by_gid(gid)
+
+
+async def get_task_by_tag(tag: str):
+    return task_dict.get_by_tag(tag)
+
+
+class TaskSnapshot:
+    """Tasks and their refreshed statuses, shared by every status message
+    rendered within ``max_age`` of each other."""
+
+    def __init__(self, tasks=(), statuses=None, stamp=0):
+        self.tasks = list(tasks)
+        self.statuses = statuses or {}
+        self.time = stamp
 
+    def live_tasks(self):
+        return [tk for tk in self.tasks if task_dict.get(tk.listener.mid) is tk]
 
-async def get_specific_tasks(status, user_id):
+
+_task_snapshot = TaskSnapshot()
+_task_snapshot_lock = Lock()
+
+
+async def _refresh_status(tk):
+    try:
+        if iscoroutinefunction(tk.status):
+            return await tk.status()
+        return tk.status()
+    except Exception as e:
+        LOGGER.error(f"Error while refreshing status of {tk.gid()}: {e}")
+        return MirrorStatus.STATUS_DOWNLOAD
+
+
+async def get_task_snapshot(max_age=None):
+    global _task_snapshot
+    if max_age is None:
+        max_age = Config.STATUS_UPDATE_INTERVAL / 2
+    snapshot = _task_snapshot
+    if time() - snapshot.time < max_age:
+        return snapshot
+    async with _task_snapshot_lock:
+        if _task_snapshot is not snapshot:
+            return _task_snapshot
+        async with task_dict_lock:
+            tasks = list(task_dict.values())
+        statuses = await gather(*[_refresh_status(tk) for tk in tasks])
+        _task_snapshot = TaskSnapshot(tasks, dict(zip(tasks, statuses)), time())
+        return _task_snapshot
+
+
+async def get_specific_tasks(status, user_id, snapshot=None):
+    all_tasks = snapshot.live_tasks() if snapshot else list(task_dict.values())
     tasks_to_check = (
-        [tk for tk in task_dict.values() if tk.listener.user_id == user_id]
+        [tk for tk in all_tasks if tk.listener.user_id == user_id]
         if user_id
-        else list(task_dict.values())
+        else all_tasks
     )
     if status == "All":
         return tasks_to_check
-    coro_tasks = [tk for tk in tasks_to_check if iscoroutinefunction(tk.status)]
-    coro_statuses = await gather(*[tk.status() for tk in coro_tasks])
-    coro_map = dict(zip(coro_tasks, coro_statuses))
+    if snapshot:
+        coro_map = snapshot.statuses
+    else:
+        coro_tasks = [tk for tk in tasks_to_check if iscoroutinefunction(tk.status)]
+        coro_statuses = await gather(*[tk.status() for tk in coro_tasks])
+        coro_map = dict(zip(coro_tasks, coro_statuses))
     result = []
     for tk in tasks_to_check:
-        st = coro_map.get(tk, tk.status())
+        st = coro_map[tk] if tk in coro_map else tk.status()
         if st == status or (
             status == MirrorStatus.STATUS_DOWNLOAD and st not in STATUSES.values()
         ):
@@ -123,9 +180,11 @@ def _get_view_mode(sid, is_user):
 def _normalize_page(page_no, pages, sid):
     if page_no > pages:
         page_no = (page_no - 1) % pages + 1
-        status_dict[sid]["page_no"] = page_no
     elif page_no < 1:
         page_no = pages - (abs(page_no) % pages)
+    else:
+        return page_no
+    if sid in status_dict:
         status_dict[sid]["page_no"] = page_no
     return page_no
 
@@ -214,11 +273,15 @@ def get_progress_bar_string(pct):
     return f"[{p_str}]"
 
 
-async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=1):
+async def get_readable_message(
+    sid, is_user, page_no=1, status="All", page_step=1, snapshot=None
+):
     msg = ""
     button = None
 
-    tasks = await get_specific_tasks(status, sid if is_user else None)
+    if snapshot is None:
+        snapshot = await get_task_snapshot()
+    tasks = await get_specific_tasks(status, sid if is_user else None, snapshot)
 
     view_mode = _get_view_mode(sid, is_user)
 
@@ -241,10 +304,10 @@ async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=
     ):
         if status != "All":
             tstatus = status
-        elif iscoroutinefunction(task.status):
-            tstatus = await task.status()
+        elif task in snapshot.statuses:
+            tstatus = snapshot.statuses[task]
         else:
-            tstatus = task.status()
+            tstatus = await _refresh_status(task)
         _update_counts(counts, tstatus)
 
         status_icon = STATUS_EMOJI.get(tstatus, "⚙️")
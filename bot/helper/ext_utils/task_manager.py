@@ -1,20 +1,114 @@
 from asyncio import Event
+from psutil import disk_usage
 
 from ... import (
     queued_dl,
     queued_up,
     non_queued_up,
     non_queued_dl,
-    queue_dict_lock,
+    user_data,
     LOGGER,
+    DOWNLOAD_DIR,
 )
 from ...core.config_manager import Config
+from ...core.metrics import metrics
 from ..mirror_leech_utils.gdrive_utils.search import GoogleDriveSearch
 from .bot_utils import sync_to_async, get_telegraph_list
-from .files_utils import get_base_name
+from .files_utils import get_base_name, SevenZ
 from .links_utils import is_gdrive_id
 
 
+class SpaceLedger:
+    def __init__(self):
+        self._reserved = {}
+        self._pending = {}
+        self._written = {}
+
+    @staticmethod
+    def footprint(listener, download=True, extract=True, compress=True, split=True):
+        size = listener.size or 0
+        need = size if download else 0
+        if extract and listener.extract:
+            need += size
+        if compress and listener.compress:
+            need += size
+        if split and listener.is_leech and listener.split_size:
+            need += min(size, 2 * listener.split_size)
+        return need
+
+    def _outstanding(self, mid, need):
+        if (written := self._written.get(mid)) is None:
+            return need
+        try:
+            return max(0, need - written())
+        except Exception:
+            return need
+
+    @property
+    def reserved(self):
+        return sum(
+            self._outstanding(mid, need) for mid, need in self._reserved.items()
+        )
+
+    def available(self):
+        try:
+            free = disk_usage(DOWNLOAD_DIR).free
+        except OSError:
+            return None
+        return free - self.reserved
+
+    def fits(self, need):
+        if not self.reserved:
+            return True
+        available = self.available()
+        return available is None or need <= available
+
+    def hold(self, mid, need):
+        self._pending[mid] = need
+
+    def reserve(self, mid, need=None):
+        pending = self._pending.pop(mid, 0)
+        self._reserved[mid] = pending if need is None else need
+
+    def track(self, mid, written):
+        self._written[mid] = written
+
+    def refit(self, mid, need):
+        self._reserved[mid] = 0
+        if self.fits(need):
+            self._reserved[mid] = need
+            return True
+        del self._reserved[mid]
+        return False
+
+    def update(self, mid, need):
+        if mid in self._reserved:
+            self._reserved[mid] = need
+            self._written.pop(mid, None)
+
+    def release(self, mid):
+        self._pending.pop(mid, None)
+        self._reserved.pop(mid, None)
+        self._written.pop(mid, None)
+
+    def startable(self, mids):
+        available = self.available()
+        reserved = self.reserved
+        startable = []
+        for mid in mids:
+            need = self._pending.get(mid, 0)
+            if reserved and available is not None and need > available:
+                continue
+            startable.append(mid)
+            reserved += need
+            if available is not None:
+                available -= need
+        return startable
+
+
+space_ledger = SpaceLedger()
+
+
 async def stop_duplicate_check(listener):
     if (
         listener.is_leech
@@ -29,7 +123,8 @@ async def stop_duplicate_check(listener):
     LOGGER.info(f"Checking File/Folder if already in Drive: {name}")
 
     if listener.compress:
-        name = f"{name}.zip"
+        pswd = listener.compress if isinstance(listener.compress, str) else ""
+        name = f"{name}{SevenZ.archive_ext(pswd)}"
     elif listener.extract:
         try:
             name = get_base_name(name)
@@ -51,104 +146,186 @@ async def stop_duplicate_check(listener):
     return False, None
 
 
-async def check_running_tasks(listener, state="dl"):
-    all_limit = Config.QUEUE_ALL
-    state_limit = Config.QUEUE_DOWNLOAD if state == "dl" else Config.QUEUE_UPLOAD
-    event = None
-    is_over_limit = False
-    async with queue_dict_lock:
-        if state == "up" and listener.mid in non_queued_dl:
-            non_queued_dl.remove(listener.mid)
-        if (
-            (all_limit or state_limit)
-            and not listener.force_run
-            and not (listener.force_upload and state == "up")
-            and not (listener.force_download and state == "dl")
-        ):
-            dl_count = len(non_queued_dl)
-            up_count = len(non_queued_up)
-            t_count = dl_count if state == "dl" else up_count
-            is_over_limit = (
-                all_limit
-                and dl_count + up_count >= all_limit
-                and (not state_limit or t_count >= state_limit)
-            ) or (state_limit and t_count >= state_limit)
-            if is_over_limit:
-                event = Event()
+def queue_priority(listener):
+    priority = listener.priority
+    if listener.user_id == Config.OWNER_ID or user_data.get(
+        listener.user_id, {}
+    ).get("SUDO"):
+        priority += 1
+    return priority
+
+
+class QueueController:
+    def __init__(self):
+        self.queues = {"dl": queued_dl, "up": queued_up}
+        self.running = {"dl": non_queued_dl, "up": non_queued_up}
+        self.promoted = {"dl": 0, "up": 0}
+        self.released = {"dl": 0, "up": 0}
+        self.paused = False
+
+    @staticmethod
+    def limit(state):
+        return Config.QUEUE_DOWNLOAD if state == "dl" else Config.QUEUE_UPLOAD
+
+    def has_slot(self, state):
+        if state == "dl" and self.paused:
+            return False
+        running = len(self.running[state])
+        limit = self.limit(state)
+        if all_limit := Config.QUEUE_ALL:
+            total = len(non_queued_dl) + len(non_queued_up)
+            return total < all_limit and (not limit or running < limit)
+        return not limit or running < limit
+
+    def admit(self, listener, state="dl"):
+        mid = listener.mid
+        if state == "up":
+            self._free(mid, "dl")
+        forced = listener.force_run or (
+            listener.force_upload if state == "up" else listener.force_download
+        )
+        need = space_ledger.footprint(listener) if state == "dl" else 0
+        event = None
+        if forced or self.has_slot(state):
+            if state == "up" or forced or space_ledger.fits(need):
+                self.running[state].add(mid)
                 if state == "dl":
-                    queued_dl[listener.mid] = event
-                else:
-                    queued_up[listener.mid] = event
-        if not is_over_limit:
-            if state == "up":
-                non_queued_up.add(listener.mid)
-            else:
-                non_queued_dl.add(listener.mid)
+                    space_ledger.reserve(mid, need)
+                self.promote()
+                return False, None
+            LOGGER.info(f"Waiting for free space: {listener.name or mid}")
+        event = Event()
+        self.queues[state].push(
+            mid, event, listener.user_id, queue_priority(listener), listener.size
+        )
+        if state == "dl":
+            space_ledger.hold(mid, need)
+        self.promote()
+        return True, event
 
-    return is_over_limit, event
+    def resize(self, listener):
+        mid = listener.mid
+        if mid not in self.running["dl"]:
+            return False, None
+        need = space_ledger.footprint(listener)
+        if listener.force_run or listener.force_download:
+            space_ledger.reserve(mid, need)
+            return False, None
+        if space_ledger.refit(mid, need):
+            return False, None
+        LOGGER.info(f"Waiting for free space: {listener.name or mid}")
+        self._free(mid, "dl")
+        event = Event()
+        self.queues["dl"].push(
+            mid, event, listener.user_id, queue_priority(listener), listener.size
+        )
+        space_ledger.hold(mid, need)
+        self.promote()
+        return True, event
 
+    def start(self, mid, state):
+        self.queues[state].start(mid).set()
+        self.running[state].add(mid)
+        self.promoted[state] += 1
+        if state == "dl":
+            space_ledger.reserve(mid)
 
-async def start_dl_from_queued(mid: int):
-    queued_dl[mid].set()
-    del queued_dl[mid]
-    non_queued_dl.add(mid)
+    def _next(self, state):
+        queue = self.queues[state]
+        head = queue.head()
+        if state == "up" or head is None or space_ledger.startable([head]):
+            return head
+        return next(iter(space_ledger.startable(queue.order())), None)
 
+    def promote(self, *states):
+        for state in states or ("up", "dl"):
+            while self.queues[state] and self.has_slot(state):
+                if (mid := self._next(state)) is None:
+                    break
+                self.start(mid, state)
+        self._publish()
 
-async def start_up_from_queued(mid: int):
-    queued_up[mid].set()
-    del queued_up[mid]
-    non_queued_up.add(mid)
+    def _free(self, mid, state):
+        if mid in self.running[state]:
+            self.running[state].remove(mid)
+            self.released[state] += 1
 
+    def release(self, mid, state):
+        self._free(mid, state)
+        self.promote()
 
-async def start_from_queued():
-    if all_limit := Config.QUEUE_ALL:
-        dl_limit = Config.QUEUE_DOWNLOAD
-        up_limit = Config.QUEUE_UPLOAD
-        async with queue_dict_lock:
-            dl = len(non_queued_dl)
-            up = len(non_queued_up)
-            all_ = dl + up
-            if all_ < all_limit:
-                f_tasks = all_limit - all_
-                if queued_up and (not up_limit or up < up_limit):
-                    for index, mid in enumerate(list(queued_up.keys()), start=1):
-                        await start_up_from_queued(mid)
-                        f_tasks -= 1
-                        if f_tasks == 0 or (up_limit and index >= up_limit - up):
-                            break
-                if queued_dl and (not dl_limit or dl < dl_limit) and f_tasks != 0:
-                    for index, mid in enumerate(list(queued_dl.keys()), start=1):
-                        await start_dl_from_queued(mid)
-                        if (dl_limit and index >= dl_limit - dl) or index == f_tasks:
-                            break
+    def remove(self, mid):
+        for state in ("dl", "up"):
+            if mid in self.queues[state]:
+                self.queues[state].pop(mid).set()
+            self._free(mid, state)
+        space_ledger.release(mid)
+        self.promote()
+
+    def force(self, mid, state):
+        if mid not in self.queues[state]:
+            return False
+        self.start(mid, state)
+        self._publish()
+        return True
+
+    def set_priority(self, listener):
+        priority = queue_priority(listener)
+        return any(
+            self.queues[state].set_priority(listener.mid, priority)
+            for state in ("dl", "up")
+        )
+
+    def bump(self, mid):
+        return any(self.queues[state].bump(mid) for state in ("dl", "up"))
+
+    def pause(self, paused=True):
+        self.paused = paused
+        if not paused:
+            self.promote()
+
+    def stats(self):
+        return {
+            state: {
+                "running": len(self.running[state]),
+                "queued": len(self.queues[state]),
+                "limit": self.limit(state),
+                "promoted": self.promoted[state],
+                "released": self.released[state],
+            }
+            for state in ("dl", "up")
+        }
+
+    def _publish(self):
+        for state in ("dl", "up"):
+            metrics.record_task_queue(
+                state, len(self.queues[state]), len(self.running[state])
+            )
+
+
+queue_controller = QueueController()
+
+
+async def check_running_tasks(listener, state="dl"):
+    return queue_controller.admit(listener, state)
+
+
+async def fit_download(task, size):
+    listener = task.listener
+    listener.size = size
+    space_ledger.track(listener.mid, task.written_bytes)
+    add_to_queue, event = queue_controller.resize(listener)
+    if not add_to_queue or event.is_set():
+        return
+    task.queued = True
+    await task.pause()
+    await event.wait()
+    if listener.is_cancelled:
         return
+    task.queued = False
+    await task.resume()
+    LOGGER.info(f"Resumed after waiting for free space: {listener.name}")
 
-    if up_limit := Config.QUEUE_UPLOAD:
-        async with queue_dict_lock:
-            up = len(non_queued_up)
-            if queued_up and up < up_limit:
-                f_tasks = up_limit - up
-                for index, mid in enumerate(list(queued_up.keys()), start=1):
-                    await start_up_from_queued(mid)
-                    if index == f_tasks:
-                        break
-    else:
-        async with queue_dict_lock:
-            if queued_up:
-                for mid in list(queued_up.keys()):
-                    await start_up_from_queued(mid)
-
-    if dl_limit := Config.QUEUE_DOWNLOAD:
-        async with queue_dict_lock:
-            dl = len(non_queued_dl)
-            if queued_dl and dl < dl_limit:
-                f_tasks = dl_limit - dl
-                for index, mid in enumerate(list(queued_dl.keys()), start=1):
-                    await start_dl_from_queued(mid)
-                    if index == f_tasks:
-                        break
-    else:
-        async with queue_dict_lock:
-            if queued_dl:
-                for mid in list(queued_dl.keys()):
-                    await start_dl_from_queued(mid)
+
+async def start_from_queued():
+    queue_controller.promote()
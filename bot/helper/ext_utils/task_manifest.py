@@ -0,0 +1,110 @@
+from aiofiles.os import remove
+
+from .bot_utils import sync_to_async
+from .files_utils import scan_path, create_link_tree, clean_tree
+from .media_utils import get_document_type
+
+
+class ManifestEntry:
+    __slots__ = ("size", "mtime", "inode", "kind")
+
+    def __init__(self, st):
+        self.size = st.st_size
+        self.mtime = st.st_mtime
+        self.inode = st.st_ino
+        self.kind = None
+
+
+def scan_tree(path):
+    return {
+        f_path: ManifestEntry(st) for f_path, st in scan_path(path, entries=True).entries.items()
+    }
+
+
+class TaskManifest:
+    def __init__(self, root):
+        self.root = root.rstrip("/")
+        self.files = {}
+        self.freed = 0
+
+    @classmethod
+    async def build(cls, root):
+        manifest = cls(root)
+        manifest.files = await sync_to_async(scan_tree, manifest.root)
+        return manifest
+
+    @classmethod
+    async def clean(cls, root, name_filter=None):
+        manifest = cls(root)
+        result = await sync_to_async(clean_tree, manifest.root, name_filter, False)
+        manifest.files = {f_path: ManifestEntry(st) for f_path, st in result.entries.items()}
+        manifest.freed = result.freed
+        return manifest
+
+    @classmethod
+    async def link(cls, source, destination):
+        manifest = cls(destination)
+        entries = await sync_to_async(create_link_tree, source, manifest.root)
+        manifest.files = {f_path: ManifestEntry(st) for f_path, st in entries.items()}
+        return manifest
+
+    def paths(self, path=None):
+        path = (path or self.root).rstrip("/")
+        prefix = f"{path}/"
+        return sorted(
+            f_path for f_path in self.files if f_path == path or f_path.startswith(prefix)
+        )
+
+    def tree(self, path=None):
+        dirs = {}
+        for f_path in self.paths(path):
+            dirpath, file_ = f_path.rsplit("/", 1)
+            dirs.setdefault(dirpath, []).append(file_)
+        return dirs
+
+    def walk(self, path=None):
+        return sorted(self.tree(path).items(), reverse=True)
+
+    def is_file(self, path):
+        return path in self.files
+
+    def size(self, path=None):
+        return sum(self.files[f_path].size for f_path in self.paths(path))
+
+    def file_size(self, f_path):
+        entry = self.files.get(f_path)
+        return entry.size if entry is not None else 0
+
+    async def rescan(self, path):
+        self.discard(path)
+        self.files.update(await sync_to_async(scan_tree, path.rstrip("/")))
+
+    def discard(self, path):
+        for f_path in self.paths(path):
+            del self.files[f_path]
+
+    def move(self, src, dst):
+        src = src.rstrip("/")
+        dst = dst.rstrip("/")
+        for f_path in self.paths(src):
+            self.files[f"{dst}{f_path[len(src):]}"] = self.files.pop(f_path)
+
+    async def remove(self, f_path):
+        await remove(f_path)
+        if (entry := self.files.pop(f_path, None)) is not None:
+            self.freed += entry.size
+
+    async def remove_files(self, predicate, path=None):
+        for dirpath, files in self.tree(path).items():
+            if dirpath.strip().endswith("/yt-dlp-thumb"):
+                continue
+            for file_ in files:
+                if predicate(file_.strip().lower()):
+                    await self.remove(f"{dirpath}/{file_}")
+
+    async def document_type(self, f_path):
+        if (entry := self.files.get(f_path)) is None:
+            return await get_document_type(f_path)
+        if entry.kind is None:
+            entry.kind = await get_document_type(f_path)
+        return entry.kind
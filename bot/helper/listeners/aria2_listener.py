@@ -9,7 +9,7 @@ from ...core.torrent_manager import TorrentManager, is_metadata, aria2_name
 from ..ext_utils.bot_utils import bt_selection_buttons
 from ..ext_utils.files_utils import clean_unwanted
 from ..ext_utils.status_utils import get_task_by_gid
-from ..ext_utils.task_manager import stop_duplicate_check
+from ..ext_utils.task_manager import stop_duplicate_check, fit_download
 from ..mirror_leech_utils.status_utils.aria2_status import Aria2Status
 from ..telegram_helper.message_utils import (
     send_message,
@@ -20,7 +20,7 @@ from ..telegram_helper.message_utils import (
 
 async def _on_download_started(api, data):
     gid = data["params"][0]["gid"]
-    download = await api.tellStatus(gid)
+    download = await TorrentManager.aria2_snapshot.fetch(gid)
     options = await api.getOption(gid)
     if options.get("follow-torrent", "") == "false":
         return
@@ -39,7 +39,7 @@ async def _on_download_started(api, data):
                     ):
                         await delete_message(meta)
                         break
-                    download = await api.tellStatus(gid)
+                    download = await TorrentManager.aria2_snapshot.fetch(gid)
         return
     else:
         LOGGER.info(f"onDownloadStarted: {aria2_name(download)} - Gid: {gid}")
@@ -47,7 +47,7 @@ async def _on_download_started(api, data):
 
     await sleep(2)
     if task := await get_task_by_gid(gid):
-        download = await api.tellStatus(gid)
+        download = await TorrentManager.aria2_snapshot.fetch(gid)
         if "bittorrent" in download:
             task.listener.is_torrent = True
         task.listener.name = aria2_name(download)
@@ -55,12 +55,15 @@ async def _on_download_started(api, data):
         if msg:
             await TorrentManager.aria2_remove(download)
             await task.listener.on_download_error(msg, button)
+            return
+        if download.get("status", "") == "active":
+            await fit_download(task, int(download.get("totalLength", "0")))
 
 
 async def _on_download_complete(api, data):
     try:
         gid = data["params"][0]["gid"]
-        download = await api.tellStatus(gid)
+        download = await TorrentManager.aria2_snapshot.fetch(gid)
         options = await api.getOption(gid)
     except (TimeoutError, ClientError, Exception) as e:
         LOGGER.error(f"onDownloadComplete: {e}")
@@ -70,7 +73,8 @@ async def _on_download_complete(api, data):
     if download.get("followedBy", []):
         new_gid = download.get("followedBy", [])[0]
         LOGGER.info(f"Gid changed from {gid} to {new_gid}")
-        if task := await get_task_by_gid(new_gid):
+        if task := await get_task_by_gid(gid):
+            task_dict.alias(new_gid, task)
             task.listener.is_torrent = True
             if Config.BASE_URL and task.listener.select:
                 if not task.queued:
@@ -101,7 +105,7 @@ async def _on_download_complete(api, data):
 async def _on_bt_download_complete(api, data):
     gid = data["params"][0]["gid"]
     await sleep(1)
-    download = await api.tellStatus(gid)
+    download = await TorrentManager.aria2_snapshot.fetch(gid)
     LOGGER.info(f"onBtDownloadComplete: {aria2_name(download)} - Gid: {gid}")
     if task := await get_task_by_gid(gid):
         task.listener.is_torrent = True
@@ -132,7 +136,7 @@ async def _on_bt_download_complete(api, data):
         await task.listener.on_download_complete()
         if intervals["stopAll"]:
             return
-        download = await api.tellStatus(gid)
+        download = await TorrentManager.aria2_snapshot.fetch(gid)
         if (
             task.listener.seed
             and download.get("status", "") == "complete"
@@ -175,7 +179,7 @@ async def _on_download_error(api, data):
     LOGGER.info(f"onDownloadError: {gid}")
     error = "None"
     try:
-        download = await api.tellStatus(gid)
+        download = await TorrentManager.aria2_snapshot.fetch(gid)
         options = await api.getOption(gid)
         error = download.get("errorMessage", "")
         LOGGER.info(f"Download Error: {error}")
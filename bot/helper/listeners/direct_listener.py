@@ -50,13 +50,15 @@ class DirectListener:
                 self._failed += 1
                 LOGGER.error(f"Unable to download {filename} due to: {e}")
                 continue
-            self.download_task = await TorrentManager.aria2.tellStatus(gid)
+            self.download_task = await TorrentManager.aria2_snapshot.fetch(gid)
             while True:
                 if self.listener.is_cancelled:
                     if self.download_task:
                         await TorrentManager.aria2_remove(self.download_task)
                     break
-                self.download_task = await TorrentManager.aria2.tellStatus(gid)
+                self.download_task = await TorrentManager.aria2_snapshot.get(
+                    gid, self.download_task
+                )
                 if error_message := self.download_task.get("errorMessage"):
                     self._failed += 1
                     LOGGER.error(
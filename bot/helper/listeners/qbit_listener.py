@@ -16,8 +16,8 @@ from ...core.config_manager import Config
 from ...core.torrent_manager import TorrentManager
 from ..ext_utils.bot_utils import new_task
 from ..ext_utils.files_utils import clean_unwanted
-from ..ext_utils.status_utils import get_readable_time, get_task_by_gid
-from ..ext_utils.task_manager import stop_duplicate_check
+from ..ext_utils.status_utils import get_readable_time, get_task_by_tag
+from ..ext_utils.task_manager import stop_duplicate_check, fit_download
 from ..mirror_leech_utils.status_utils.qbit_status import QbittorrentStatus
 from ..telegram_helper.message_utils import update_status_message
 
@@ -34,7 +34,7 @@ async def _remove_torrent(hash_, tag):
 async def _on_download_error(err, tor, button=None):
     LOGGER.info(f"Cancelling Download: {tor.name}")
     ext_hash = tor.hash
-    if task := await get_task_by_gid(ext_hash[:12]):
+    if task := await get_task_by_tag(tor.tags[0]):
         await task.listener.on_download_error(err, button)
     await TorrentManager.qbittorrent.torrents.stop([ext_hash])
     await sleep(0.3)
@@ -45,7 +45,7 @@ async def _on_download_error(err, tor, button=None):
 async def _on_seed_finish(tor):
     ext_hash = tor.hash
     LOGGER.info(f"Cancelling Seed: {tor.name}")
-    if task := await get_task_by_gid(ext_hash[:12]):
+    if task := await get_task_by_tag(tor.tags[0]):
         msg = f"Seeding stopped with Ratio: {round(tor.ratio, 3)} and Time: {get_readable_time(int(tor.seeding_time.total_seconds() or "0"))}"
         await task.listener.on_upload_error(msg)
     await _remove_torrent(ext_hash, tor.tags[0])
@@ -53,7 +53,7 @@ async def _on_seed_finish(tor):
 
 @new_task
 async def _stop_duplicate(tor):
-    if task := await get_task_by_gid(tor.hash[:12]):
+    if task := await get_task_by_tag(tor.tags[0]):
         if task.listener.stop_duplicate:
             task.listener.name = tor.content_path.rsplit("/", 1)[-1].rsplit(".!qB", 1)[
                 0
@@ -63,11 +63,17 @@ async def _stop_duplicate(tor):
                 _on_download_error(msg, tor, button)
 
 
+@new_task
+async def _fit_download(tor):
+    if task := await get_task_by_tag(tor.tags[0]):
+        await fit_download(task, tor.size)
+
+
 @new_task
 async def _on_download_complete(tor):
     ext_hash = tor.hash
     tag = tor.tags[0]
-    if task := await get_task_by_gid(ext_hash[:12]):
+    if task := await get_task_by_tag(tor.tags[0]):
         if not task.listener.seed:
             await TorrentManager.qbittorrent.torrents.stop([ext_hash])
         if task.listener.select:
@@ -113,13 +119,13 @@ async def _qb_listener():
     while True:
         async with qb_listener_lock:
             try:
-                torrents = await TorrentManager.qbittorrent.torrents.info()
-                if len(torrents) == 0:
+                if not await TorrentManager.qbit_mirror.refresh(force=True):
+                    raise Exception("Qbittorrent, unable to sync torrents")
+                if len(TorrentManager.qbit_mirror) == 0:
                     intervals["qb"] = ""
                     break
-                for tor_info in torrents:
-                    tag = tor_info.tags[0]
-                    if tag not in qb_torrents:
+                for tag in list(qb_torrents):
+                    if (tor_info := TorrentManager.qbit_mirror.get_by_tag(tag)) is None:
                         continue
                     state = tor_info.state
                     if state == "metaDL":
@@ -139,6 +145,7 @@ async def _qb_listener():
                         if not qb_torrents[tag]["stop_dup_check"]:
                             qb_torrents[tag]["stop_dup_check"] = True
                             await _stop_duplicate(tor_info)
+                            await _fit_download(tor_info)
                     elif state == "stalledDL":
                         if (
                             not qb_torrents[tag]["rechecked"]
@@ -9,11 +9,6 @@ from ... import (
     task_dict,
     task_dict_lock,
     LOGGER,
-    non_queued_up,
-    non_queued_dl,
-    queued_up,
-    queued_dl,
-    queue_dict_lock,
     same_directory_lock,
     DOWNLOAD_DIR,
 )
@@ -23,19 +18,19 @@ from ..common import TaskConfig
 from ..ext_utils.bot_utils import sync_to_async
 from ..ext_utils.db_handler import database
 from ..ext_utils.files_utils import (
-    get_path_size,
     clean_download,
     clean_target,
-    join_files,
-    create_recursive_symlink,
-    remove_excluded_files,
-    remove_non_included_files,
     move_and_merge,
 )
 from ..ext_utils.history_utils import add_history
 from ..ext_utils.links_utils import is_gdrive_id
 from ..ext_utils.status_utils import get_readable_file_size
-from ..ext_utils.task_manager import start_from_queued, check_running_tasks
+from ..ext_utils.task_manifest import TaskManifest
+from ..ext_utils.task_manager import (
+    check_running_tasks,
+    queue_controller,
+    space_ledger,
+)
 from ..mirror_leech_utils.gdrive_utils.upload import GoogleDriveUpload
 from ..mirror_leech_utils.rclone_utils.transfer import RcloneTransferHelper
 from ..mirror_leech_utils.status_utils.gdrive_status import GoogleDriveStatus
@@ -156,7 +151,7 @@ class TaskListener(TaskConfig):
                 files = await listdir(self.dir)
                 if not files:
                     try:
-                        a2status = await TorrentManager.aria2.tellStatus(gid)
+                        a2status = await TorrentManager.aria2_snapshot.fetch(gid)
                         a2files = a2status.get("files", [])
                         a2path = ""
                         for file_info in a2files:
@@ -186,48 +181,48 @@ class TaskListener(TaskConfig):
                 return
 
         dl_path = f"{self.dir}/{self.name}"
-        self.size = await get_path_size(dl_path)
-        self.is_file = await aiopath.isfile(dl_path)
 
         if self.seed:
             up_dir = self.up_dir = f"{self.dir}10000"
             up_path = f"{self.up_dir}/{self.name}"
-            await create_recursive_symlink(self.dir, self.up_dir)
-            LOGGER.info(f"Shortcut created: {dl_path} -> {up_path}")
+            self.manifest = await TaskManifest.link(self.dir, self.up_dir)
+            LOGGER.info(f"Link tree created: {dl_path} -> {up_path}")
         else:
             up_dir = self.dir
             up_path = dl_path
+            self.manifest = await TaskManifest.clean(up_dir, self.extension_filter())
+            if self.manifest.freed:
+                LOGGER.info(
+                    f"Cleaned {get_readable_file_size(self.manifest.freed)} from: {up_dir}"
+                )
 
-        if not self.included_extensions:
-            await remove_excluded_files(
-                self.up_dir or self.dir, self.excluded_extensions
-            )
-        else:
-            await remove_non_included_files(
-                self.up_dir or self.dir, self.included_extensions
-            )
+        if self.seed:
+            await self.remove_unwanted_extensions()
+        self.size = self.manifest.size(up_path)
+        self.is_file = self.manifest.is_file(up_path)
+        space_ledger.update(self.mid, space_ledger.footprint(self, download=False))
 
         if not Config.QUEUE_ALL:
-            async with queue_dict_lock:
-                if self.mid in non_queued_dl:
-                    non_queued_dl.remove(self.mid)
-            await start_from_queued()
+            queue_controller.release(self.mid, "dl")
 
         if self.join and not self.is_file:
-            await join_files(up_path)
+            await self.proceed_join(up_path, gid)
+            if self.is_cancelled:
+                return
+            self.clear()
 
         if self.extract and not self.is_nzb:
             up_path = await self.proceed_extract(up_path, gid)
             if self.is_cancelled:
                 return
-            self.is_file = await aiopath.isfile(up_path)
+            self.is_file = self.manifest.is_file(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = self.manifest.size(up_dir)
             self.clear()
-            if not self.included_extensions:
-                await remove_excluded_files(up_dir, self.excluded_extensions)
-            else:
-                await remove_non_included_files(up_dir, self.included_extensions)
+            await self.remove_unwanted_extensions()
+            space_ledger.update(
+                self.mid, space_ledger.footprint(self, download=False, extract=False)
+            )
 
         if self.ffmpeg_cmds:
             up_path = await self.proceed_ffmpeg(
@@ -236,9 +231,9 @@ class TaskListener(TaskConfig):
             )
             if self.is_cancelled:
                 return
-            self.is_file = await aiopath.isfile(up_path)
+            self.is_file = self.manifest.is_file(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = self.manifest.size(up_dir)
             self.clear()
 
         if self.name_sub:
@@ -246,16 +241,16 @@ class TaskListener(TaskConfig):
             up_path = await self.substitute(up_path)
             if self.is_cancelled:
                 return
-            self.is_file = await aiopath.isfile(up_path)
+            self.is_file = self.manifest.is_file(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
 
         if self.screen_shots:
             up_path = await self.generate_screenshots(up_path)
             if self.is_cancelled:
                 return
-            self.is_file = await aiopath.isfile(up_path)
+            self.is_file = self.manifest.is_file(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = self.manifest.size(up_dir)
 
         if self.convert_audio or self.convert_video:
             up_path = await self.convert_media(
@@ -264,18 +259,18 @@ class TaskListener(TaskConfig):
             )
             if self.is_cancelled:
                 return
-            self.is_file = await aiopath.isfile(up_path)
+            self.is_file = self.manifest.is_file(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = self.manifest.size(up_dir)
             self.clear()
 
         if self.sample_video:
             up_path = await self.generate_sample_video(up_path, gid)
             if self.is_cancelled:
                 return
-            self.is_file = await aiopath.isfile(up_path)
+            self.is_file = self.manifest.is_file(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = self.manifest.size(up_dir)
             self.clear()
 
         if self.compress:
@@ -283,24 +278,23 @@ class TaskListener(TaskConfig):
                 up_path,
                 gid,
             )
-            self.is_file = await aiopath.isfile(up_path)
+            self.is_file = self.manifest.is_file(up_path)
             if self.is_cancelled:
                 return
             self.clear()
+            space_ledger.update(self.mid, 0)
 
         self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-        self.size = await get_path_size(up_dir)
+        self.size = self.manifest.size(up_dir)
 
         if self.is_leech and not self.compress:
-            await self.proceed_split(up_path, gid)
+            await self.plan_split(up_path)
             if self.is_cancelled:
                 return
-            self.clear()
 
         self.subproc = None
 
         add_to_queue, event = await check_running_tasks(self, "up")
-        await start_from_queued()
         if add_to_queue:
             LOGGER.info(f"Added to Queue/Upload: {self.name}")
             async with task_dict_lock:
@@ -310,7 +304,7 @@ class TaskListener(TaskConfig):
                 return
             LOGGER.info(f"Start from Queued/Upload: {self.name}")
 
-        self.size = await get_path_size(up_dir)
+        self.size = self.manifest.size(up_dir)
 
         if self.is_leech:
             LOGGER.info(f"Leech Name: {self.name}")
@@ -424,10 +418,7 @@ class TaskListener(TaskConfig):
         )
         if self.seed:
             await clean_target(self.up_dir)
-            async with queue_dict_lock:
-                if self.mid in non_queued_up:
-                    non_queued_up.remove(self.mid)
-            await start_from_queued()
+            queue_controller.remove(self.mid)
             return
         await clean_download(self.dir)
         async with task_dict_lock:
@@ -439,11 +430,7 @@ class TaskListener(TaskConfig):
         else:
             await update_status_message(self.message.chat.id)
 
-        async with queue_dict_lock:
-            if self.mid in non_queued_up:
-                non_queued_up.remove(self.mid)
-
-        await start_from_queued()
+        queue_controller.remove(self.mid)
 
     async def on_download_error(self, error, button=None):
         async with task_dict_lock:
@@ -474,23 +461,12 @@ class TaskListener(TaskConfig):
         ):
             await database.rm_complete_task(self.message.link)
 
-        async with queue_dict_lock:
-            if self.mid in queued_dl:
-                queued_dl[self.mid].set()
-                del queued_dl[self.mid]
-            if self.mid in queued_up:
-                queued_up[self.mid].set()
-                del queued_up[self.mid]
-            if self.mid in non_queued_dl:
-                non_queued_dl.remove(self.mid)
-            if self.mid in non_queued_up:
-                non_queued_up.remove(self.mid)
-
-        await start_from_queued()
+        queue_controller.remove(self.mid)
         await sleep(3)
         await clean_download(self.dir)
         if self.up_dir:
             await clean_download(self.up_dir)
+        queue_controller.promote("dl")
         if self.thumb and await aiopath.exists(self.thumb):
             await remove(self.thumb)
 
@@ -521,22 +497,11 @@ class TaskListener(TaskConfig):
         ):
             await database.rm_complete_task(self.message.link)
 
-        async with queue_dict_lock:
-            if self.mid in queued_dl:
-                queued_dl[self.mid].set()
-                del queued_dl[self.mid]
-            if self.mid in queued_up:
-                queued_up[self.mid].set()
-                del queued_up[self.mid]
-            if self.mid in non_queued_dl:
-                non_queued_dl.remove(self.mid)
-            if self.mid in non_queued_up:
-                non_queued_up.remove(self.mid)
-
-        await start_from_queued()
+        queue_controller.remove(self.mid)
         await sleep(3)
         await clean_download(self.dir)
         if self.up_dir:
             await clean_download(self.up_dir)
+        queue_controller.promote("dl")
         if self.thumb and await aiopath.exists(self.thumb):
             await remove(self.thumb)
@@ -76,18 +76,14 @@ async def add_qb_torrent(listener, path, ratio, seed_time):
                 f"{e}. {listener.mid}. Already added torrent or unsupported link/file type!"
             )
             return
-        tor_info = await TorrentManager.qbittorrent.torrents.info(tag=f"{listener.mid}")
-        if len(tor_info) == 0:
-            while True:
-                if add_to_queue and event.is_set():
-                    add_to_queue = False
-                tor_info = await TorrentManager.qbittorrent.torrents.info(
-                    tag=f"{listener.mid}"
-                )
-                if len(tor_info) > 0:
-                    break
-                await sleep(1)
-        tor_info = tor_info[0]
+        mirror = TorrentManager.qbit_mirror
+        while True:
+            await mirror.refresh(force=True)
+            if tor_info := mirror.get_by_tag(f"{listener.mid}"):
+                break
+            if add_to_queue and event.is_set():
+                add_to_queue = False
+            await sleep(1)
         listener.name = tor_info.name
         ext_hash = tor_info.hash
 
@@ -107,24 +103,19 @@ async def add_qb_torrent(listener, path, ratio, seed_time):
                 metamsg = "Downloading Metadata, wait then you can select files. Use torrent file to avoid this wait."
                 meta = await send_message(listener.message, metamsg)
                 while True:
-                    tor_info = await TorrentManager.qbittorrent.torrents.info(
-                        tag=f"{listener.mid}"
-                    )
-                    if len(tor_info) == 0:
+                    await mirror.refresh()
+                    tor_info = mirror.get_by_tag(f"{listener.mid}")
+                    if tor_info is None:
                         await delete_message(meta)
                         return
-                    try:
-                        tor_info = tor_info[0]
-                        if tor_info.state not in [
-                            "metaDL",
-                            "checkingResumeData",
-                            "stoppedDL",
-                        ]:
-                            await delete_message(meta)
-                            break
-                    except:
+                    if tor_info.state not in [
+                        "metaDL",
+                        "checkingResumeData",
+                        "stoppedDL",
+                    ]:
                         await delete_message(meta)
-                        return
+                        break
+                    await sleep(0.5)
 
             ext_hash = tor_info.hash
             if not add_to_queue:
@@ -1,6 +1,6 @@
 from time import time
 
-from .... import LOGGER
+from .... import LOGGER, task_dict
 from ....core.torrent_manager import TorrentManager, aria2_name
 from ...ext_utils.status_utils import (
     MirrorStatus,
@@ -9,15 +9,6 @@ from ...ext_utils.status_utils import (
 )
 
 
-async def get_download(gid, old_info=None):
-    try:
-        res = await TorrentManager.aria2.tellStatus(gid)
-        return res or old_info
-    except Exception as e:
-        LOGGER.error(f"{e}: Aria2c, Error while getting torrent info")
-        return old_info
-
-
 class Aria2Status:
     def __init__(self, listener, gid, seeding=False, queued=False):
         self._gid = gid
@@ -29,10 +20,11 @@ class Aria2Status:
         self.tool = "aria2"
 
     async def update(self):
-        self._download = await get_download(self._gid, self._download)
-        if self._download.get("followedBy", []):
-            self._gid = self._download["followedBy"][0]
-            self._download = await get_download(self._gid)
+        snapshot = TorrentManager.aria2_snapshot
+        self._download = await snapshot.get(self._gid, self._download)
+        if (gid := snapshot.resolve(self._gid)) != self._gid:
+            self._gid = gid
+            task_dict.reindex(self)
 
     def progress(self):
         try:
@@ -43,6 +35,10 @@ class Aria2Status:
     def processed_bytes(self):
         return get_readable_file_size(int(self._download.get("completedLength", "0")))
 
+    def written_bytes(self):
+        download = TorrentManager.aria2_snapshot.peek(self._gid) or self._download
+        return int(download.get("completedLength", "0"))
+
     def speed(self):
         return (
             f"{get_readable_file_size(int(self._download.get("downloadSpeed", "0")))}/s"
@@ -113,6 +109,12 @@ class Aria2Status:
     def gid(self):
         return self._gid
 
+    async def pause(self):
+        await TorrentManager.aria2.forcePause(self._gid)
+
+    async def resume(self):
+        await TorrentManager.aria2.unpause(self._gid)
+
     async def cancel_task(self):
         self.listener.is_cancelled = True
         await self.update()
@@ -0,0 +1,59 @@
+from time import time
+
+from .... import LOGGER
+from ...ext_utils.status_utils import (
+    get_readable_file_size,
+    MirrorStatus,
+    get_readable_time,
+)
+
+
+class JoinStatus:
+    def __init__(self, listener, obj, gid):
+        self.listener = listener
+        self._obj = obj
+        self._gid = gid
+        self._start_time = time()
+        self.tool = "join"
+
+    def gid(self):
+        return self._gid
+
+    def _speed_raw(self):
+        try:
+            return self._obj.processed_bytes / (time() - self._start_time)
+        except:
+            return 0
+
+    def progress(self):
+        return self._obj.progress
+
+    def speed(self):
+        return f"{get_readable_file_size(self._speed_raw())}/s"
+
+    def processed_bytes(self):
+        return get_readable_file_size(self._obj.processed_bytes)
+
+    def name(self):
+        return self.listener.name
+
+    def size(self):
+        return get_readable_file_size(self.listener.size)
+
+    def eta(self):
+        try:
+            seconds = (self._obj.total - self._obj.processed_bytes) / self._speed_raw()
+            return get_readable_time(seconds)
+        except:
+            return "-"
+
+    def status(self):
+        return MirrorStatus.STATUS_JOIN
+
+    def task(self):
+        return self
+
+    async def cancel_task(self):
+        LOGGER.info(f"Cancelling Join: {self.listener.name}")
+        self.listener.is_cancelled = True
+        await self.listener.on_upload_error("Join stopped by user!")
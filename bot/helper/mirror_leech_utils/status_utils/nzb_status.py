@@ -106,8 +106,10 @@ class SabnzbdStatus:
         if self._info.get("mb", "0") == self._info.get("mbleft", "0"):
             return MirrorStatus.STATUS_QUEUEDL
         state = self._info.get("status")
-        if state == "Paused" and self.queued:
-            return MirrorStatus.STATUS_QUEUEDL
+        if state == "Paused":
+            return (
+                MirrorStatus.STATUS_QUEUEDL if self.queued else MirrorStatus.STATUS_PAUSED
+            )
         elif state in [
             "QuickCheck",
             "Verifying",
@@ -126,6 +128,12 @@ class SabnzbdStatus:
     def gid(self):
         return self._gid
 
+    async def pause(self):
+        await sabnzbd_client.pause_job(self._gid)
+
+    async def resume(self):
+        await sabnzbd_client.resume_job(self._gid)
+
     async def cancel_task(self):
         self.listener.is_cancelled = True
         await self.update()
@@ -1,6 +1,7 @@
 from asyncio import sleep, gather
+from time import time
 
-from .... import LOGGER, qb_torrents, qb_listener_lock
+from .... import LOGGER, qb_torrents, qb_listener_lock, task_dict
 from ....core.torrent_manager import TorrentManager
 from ...ext_utils.status_utils import (
     MirrorStatus,
@@ -10,12 +11,13 @@ from ...ext_utils.status_utils import (
 
 
 async def get_download(tag, old_info=None):
-    try:
-        res = (await TorrentManager.qbittorrent.torrents.info(tag=tag))[0]
-        return res or old_info
-    except Exception as e:
-        LOGGER.error(f"{e}: Qbittorrent, while getting torrent info. Tag: {tag}")
-        return old_info
+    await TorrentManager.qbit_mirror.refresh()
+    if res := TorrentManager.qbit_mirror.get_by_tag(tag):
+        return res
+    # Until the torrent shows up in the mirror it is still being added
+    if old_info is not None:
+        LOGGER.error(f"Qbittorrent, torrent not found while getting info. Tag: {tag}")
+    return old_info
 
 
 class QbittorrentStatus:
@@ -23,11 +25,14 @@ class QbittorrentStatus:
         self.queued = queued
         self.seeding = seeding
         self.listener = listener
-        self._info = None
+        self._info = TorrentManager.qbit_mirror.get_by_tag(f"{listener.mid}")
         self.tool = "qbittorrent"
 
     async def update(self):
+        known = self._info is not None
         self._info = await get_download(f"{self.listener.mid}", self._info)
+        if not known and self._info is not None:
+            task_dict.reindex(self)
 
     def progress(self):
         return f"{round(self._info.progress * 100, 2)}%"
@@ -35,6 +40,10 @@ class QbittorrentStatus:
     def processed_bytes(self):
         return get_readable_file_size(self._info.downloaded)
 
+    def written_bytes(self):
+        info = TorrentManager.qbit_mirror.get_by_tag(f"{self.listener.mid}")
+        return (info or self._info).downloaded
+
     def speed(self):
         return f"{get_readable_file_size(self._info.dlspeed)}/s"
 
@@ -93,6 +102,15 @@ class QbittorrentStatus:
     def hash(self):
         return self._info.hash
 
+    async def pause(self):
+        await TorrentManager.qbittorrent.torrents.stop([self._info.hash])
+
+    async def resume(self):
+        async with qb_listener_lock:
+            if (tag := f"{self.listener.mid}") in qb_torrents:
+                qb_torrents[tag]["stalled_time"] = time()
+        await TorrentManager.qbittorrent.torrents.start([self._info.hash])
+
     async def cancel_task(self):
         self.listener.is_cancelled = True
         await self.update()
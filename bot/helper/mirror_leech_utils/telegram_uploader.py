@@ -1,11 +1,13 @@
 from PIL import Image
 from aioshutil import rmtree
-from asyncio import sleep
+from asyncio import create_task
+from collections import deque
 from logging import getLogger
 from natsort import natsorted
-from os import walk, path as ospath
+from os import path as ospath
 from time import time
 from re import match as re_match, sub as re_sub
+from pyrogram import raw, utils
 from pyrogram.errors import FloodWait, RPCError, FloodPremiumWait, BadRequest
 from aiofiles.os import (
     remove,
@@ -16,6 +18,7 @@ from pyrogram.types import (
     InputMediaVideo,
     InputMediaDocument,
     InputMediaPhoto,
+    Message,
 )
 from tenacity import (
     retry,
@@ -27,9 +30,10 @@ from tenacity import (
 
 from ... import intervals
 from ...core.config_manager import Config
+from ...core.telegram_dispatcher import message_dispatcher
 from ...core.telegram_manager import TgClient
-from ..ext_utils.bot_utils import sync_to_async
-from ..ext_utils.files_utils import is_archive, get_base_name
+from ...core.thumbnail_manager import thumbnail_manager
+from ..ext_utils.files_utils import is_archive, get_base_name, FilePart
 from ..telegram_helper.message_utils import delete_message
 from ..ext_utils.media_utils import (
     get_media_info,
@@ -42,7 +46,46 @@ from ..ext_utils.media_utils import (
 LOGGER = getLogger(__name__)
 
 
+class _UploadItem:
+    __slots__ = (
+        "dirpath",
+        "file",
+        "o_path",
+        "up_path",
+        "size",
+        "user_session",
+        "cap_mono",
+        "desc",
+        "media",
+        "thumb_media",
+        "task",
+        "error",
+        "source",
+        "last_part",
+        "release",
+    )
+
+    def __init__(self, dirpath, file_, size, user_session, source=None):
+        self.dirpath = dirpath
+        self.file = file_
+        self.o_path = self.up_path = ospath.join(dirpath, file_)
+        self.size = size
+        self.user_session = user_session
+        self.source = source
+        self.last_part = False
+        self.release = None
+        self.cap_mono = None
+        self.desc = None
+        self.media = None
+        self.thumb_media = None
+        self.task = None
+        self.error = None
+
+
 class TelegramUploader:
+    PREPARE_AHEAD = 2
+    _flood_strikes = {}
+
     def __init__(self, listener, path):
         self._last_uploaded = 0
         self._processed_bytes = 0
@@ -128,13 +171,14 @@ class TelegramUploader:
             self._sent_msg = self._listener.message
         return True
 
-    async def _prepare_file(self, file_, dirpath):
+    async def _prepare_file(self, file_, dirpath, up_path, rename_file=True):
         if self._lprefix:
             cap_mono = f"{self._lprefix} <code>{file_}</code>"
             self._lprefix = re_sub("<.*?>", "", self._lprefix)
             new_path = ospath.join(dirpath, f"{self._lprefix} {file_}")
-            await rename(self._up_path, new_path)
-            self._up_path = new_path
+            if rename_file:
+                await rename(up_path, new_path)
+            up_path = new_path
         else:
             cap_mono = f"<code>{file_}</code>"
         if len(file_) > 60:
@@ -154,9 +198,10 @@ class TelegramUploader:
             remain = 60 - extn
             name = name[:remain]
             new_path = ospath.join(dirpath, f"{name}{ext}")
-            await rename(self._up_path, new_path)
-            self._up_path = new_path
-        return cap_mono
+            if rename_file:
+                await rename(up_path, new_path)
+            up_path = new_path
+        return cap_mono, up_path
 
     def _get_input_media(self, subkey, key):
         rlist = []
@@ -179,6 +224,7 @@ class TelegramUploader:
         ]
         for i in range(0, len(inputs), 10):
             batch = inputs[i : i + 10]
+            await message_dispatcher.acquire(self._sent_msg.chat.id)
             self._sent_msg = (
                 await self._sent_msg.reply_media_group(
                     media=batch,
@@ -196,6 +242,7 @@ class TelegramUploader:
                 msgs[index] = await TgClient.user.get_messages(
                     chat_id=msg[0], message_ids=msg[1]
                 )
+        await message_dispatcher.acquire(msgs[0].chat.id)
         msgs_list = await msgs[0].reply_to_message.reply_media_group(
             media=self._get_input_media(subkey, key),
             disable_notification=True,
@@ -215,23 +262,31 @@ class TelegramUploader:
         res = await self._msg_to_reply()
         if not res:
             return
-        for dirpath, _, files in natsorted(await sync_to_async(walk, self._path)):
-            if dirpath.strip().endswith("/yt-dlp-thumb"):
-                continue
-            if dirpath.strip().endswith("_mltbss"):
-                await self._send_screenshots(dirpath, files)
-                await rmtree(dirpath, ignore_errors=True)
-                continue
-            for file_ in natsorted(files):
-                self._error = ""
-                self._up_path = f_path = ospath.join(dirpath, file_)
-                if not await aiopath.exists(self._up_path):
-                    if intervals["stopAll"]:
+        pending = deque()
+        try:
+            manifest = self._listener.manifest
+            for dirpath, files in natsorted(manifest.tree(self._path).items()):
+                if dirpath.strip().endswith("/yt-dlp-thumb"):
+                    continue
+                if dirpath.strip().endswith("_mltbss"):
+                    if not await self._drain(pending, 0):
                         return
-                    LOGGER.error(f"{self._up_path} not exists! Continue uploading!")
+                    await self._send_screenshots(dirpath, files)
+                    await rmtree(dirpath, ignore_errors=True)
                     continue
-                try:
-                    f_size = await aiopath.getsize(self._up_path)
+                for file_ in natsorted(files):
+                    self._error = ""
+                    self._up_path = f_path = ospath.join(dirpath, file_)
+                    if not await aiopath.exists(self._up_path):
+                        if intervals["stopAll"]:
+                            return
+                        LOGGER.error(f"{self._up_path} not exists! Continue uploading!")
+                        continue
+                    if f_path in self._listener.split_plan:
+                        if not await self._upload_split(pending, f_path):
+                            return
+                        continue
+                    f_size = manifest.file_size(f_path)
                     self._total_files += 1
                     if f_size == 0:
                         LOGGER.error(
@@ -241,56 +296,33 @@ class TelegramUploader:
                         continue
                     if self._listener.is_cancelled:
                         return
-                    cap_mono = await self._prepare_file(file_, dirpath)
-                    if self._last_msg_in_group:
-                        group_lists = [
-                            x for v in self._media_dict.values() for x in v.keys()
-                        ]
-                        match = re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", f_path)
-                        if not match or match and match.group(0) not in group_lists:
-                            for key, value in list(self._media_dict.items()):
-                                for subkey, msgs in list(value.items()):
-                                    if len(msgs) > 1:
-                                        await self._send_media_group(subkey, key, msgs)
-                    if self._listener.hybrid_leech and self._listener.user_transmission:
-                        self._user_session = f_size > 2097152000
-                        if self._user_session:
-                            self._sent_msg = await TgClient.user.get_messages(
-                                chat_id=self._sent_msg.chat.id,
-                                message_ids=self._sent_msg.id,
+                    if parts := self._listener.virtual_parts.get(f_path):
+                        self._total_files += len(parts) - 1
+                        items = [
+                            _UploadItem(
+                                dirpath,
+                                ospath.basename(part_path),
+                                length,
+                                self._session_for(length),
+                                (f_path, offset, length),
                             )
-                        else:
-                            self._sent_msg = await self._listener.client.get_messages(
-                                chat_id=self._sent_msg.chat.id,
-                                message_ids=self._sent_msg.id,
+                            for part_path, offset, length in parts
+                        ]
+                        items[-1].last_part = True
+                    else:
+                        items = [
+                            _UploadItem(
+                                dirpath, file_, f_size, self._session_for(f_size)
                             )
-                    self._last_msg_in_group = False
-                    self._last_uploaded = 0
-                    await self._upload_file(cap_mono, file_, f_path)
-                    if self._listener.is_cancelled:
-                        return
-                    if (
-                        not self._is_corrupted
-                        and (self._listener.is_super_chat or self._listener.up_dest)
-                        and not self._is_private
-                    ):
-                        self._msgs_dict[self._sent_msg.link] = file_
-                    await sleep(1)
-                except Exception as err:
-                    if isinstance(err, RetryError):
-                        LOGGER.info(
-                            f"Total Attempts: {err.last_attempt.attempt_number}"
-                        )
-                        err = err.last_attempt.exception()
-                    LOGGER.error(f"{err}. Path: {self._up_path}")
-                    self._error = str(err)
-                    self._corrupted += 1
-                    if self._listener.is_cancelled:
-                        return
-                if not self._listener.is_cancelled and await aiopath.exists(
-                    self._up_path
-                ):
-                    await remove(self._up_path)
+                        ]
+                    for item in items:
+                        if not await self._schedule(pending, item):
+                            return
+            if not await self._drain(pending, 0):
+                return
+        finally:
+            for item in pending:
+                item.task.cancel()
         for key, value in list(self._media_dict.items()):
             for subkey, msgs in list(value.items()):
                 if len(msgs) > 1:
@@ -318,12 +350,303 @@ class TelegramUploader:
         )
         return
 
-    @retry(
-        wait=wait_exponential(multiplier=2, min=4, max=8),
-        stop=stop_after_attempt(3),
-        retry=retry_if_exception_type(Exception),
-    )
-    async def _upload_file(self, cap_mono, file, o_path, force_document=False):
+    def _parallel_uploads(self):
+        strikes, last = self._flood_strikes.get(self._sent_msg.chat.id, (0, 0))
+        if strikes >= 3 and time() - last < 3600:
+            return 1
+        return max(1, int(Config.LEECH_PARALLEL_UPLOADS or 1))
+
+    def _record_flood(self, f):
+        chat_id = self._sent_msg.chat.id
+        strikes, last = self._flood_strikes.get(chat_id, (0, 0))
+        if time() - last >= 3600:
+            strikes = 0
+        self._flood_strikes[chat_id] = (strikes + 1, time())
+        if strikes + 1 == 3:
+            LOGGER.warning(
+                f"Repeated FloodWaits in {chat_id}, leech uploads to this chat are sequential for the next hour"
+            )
+        message_dispatcher.flood(chat_id, f.value * 1.3)
+
+    def _session_for(self, f_size):
+        if self._listener.hybrid_leech and self._listener.user_transmission:
+            return f_size > 2097152000
+        return self._user_session
+
+    def _file_progress(self, client):
+        last = 0
+
+        async def progress(current, _):
+            nonlocal last
+            if self._listener.is_cancelled:
+                client.stop_transmission()
+            self._processed_bytes += current - last
+            last = current
+
+        return progress
+
+    async def _remove_thumb(self, thumb):
+        if (
+            self._thumb is None
+            and thumb is not None
+            and not thumbnail_manager.cache.owns(thumb)
+            and await aiopath.exists(thumb)
+        ):
+            await remove(thumb)
+
+    async def _schedule(self, pending, item):
+        parallel = self._parallel_uploads()
+        item.task = create_task(self._stage(item, parallel > 1))
+        pending.append(item)
+        return await self._drain(pending, max(parallel - 1, self.PREPARE_AHEAD))
+
+    async def _upload_split(self, pending, f_path):
+        stream = self._listener.split_stream(f_path)
+        try:
+            while True:
+                if stream.empty() and not await self._drain(pending, 0):
+                    return False
+                if (part := await stream.get()) is None:
+                    if stream.error is not None:
+                        # The original is kept, count the failed split as corrupted
+                        self._error = str(stream.error)
+                        self._total_files += 1
+                        self._corrupted += 1
+                    return not self._listener.is_cancelled
+                if self._listener.is_cancelled:
+                    return False
+                self._up_path = part
+                try:
+                    f_size = await aiopath.getsize(part)
+                except Exception as err:
+                    LOGGER.error(f"{err}. Path: {part}")
+                    self._error = str(err)
+                    self._corrupted += 1
+                    stream.release()
+                    continue
+                self._total_files += 1
+                if f_size == 0:
+                    LOGGER.error(
+                        f"{part} size is zero, telegram don't upload zero size files"
+                    )
+                    self._corrupted += 1
+                    stream.release()
+                    continue
+                dirpath, file_ = ospath.split(part)
+                item = _UploadItem(dirpath, file_, f_size, self._session_for(f_size))
+                item.release = stream.release
+                if not await self._schedule(pending, item):
+                    return False
+        finally:
+            stream.cancel()
+            if (
+                self._listener.is_cancelled
+                and self._listener.subproc is not None
+                and self._listener.subproc.returncode is None
+            ):
+                try:
+                    self._listener.subproc.kill()
+                except:
+                    pass
+
+    async def _drain(self, pending, keep):
+        while len(pending) > keep:
+            if not await self._commit(pending.popleft()):
+                return False
+        return True
+
+    async def _stage(self, item, transfer):
+        try:
+            item.cap_mono, item.up_path = await self._prepare_file(
+                item.file, item.dirpath, item.up_path, item.source is None
+            )
+            item.desc = await self._describe(
+                item.up_path, item.file, source=item.source
+            )
+            if not transfer or self._listener.is_cancelled:
+                return
+            client = TgClient.user if item.user_session else self._listener.client
+            progress = self._file_progress(client)
+            document = self._open_document(item.up_path, item.source)
+            try:
+                item.media = await client.save_file(document, progress=progress)
+            finally:
+                if item.source is not None:
+                    document.close()
+            if item.desc["thumb"] is not None:
+                item.thumb_media = await client.save_file(item.desc["thumb"])
+        except Exception as e:
+            item.media = None
+            item.error = e
+            if isinstance(e, (FloodWait, FloodPremiumWait)):
+                LOGGER.warning(str(e))
+                self._record_flood(e)
+
+    async def _commit(self, item):
+        self._error = ""
+        try:
+            await item.task
+            if item.cap_mono is None:
+                raise item.error
+            self._up_path = item.up_path
+            if self._listener.is_cancelled:
+                return False
+            if self._last_msg_in_group:
+                group_lists = [x for v in self._media_dict.values() for x in v.keys()]
+                match = re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", item.o_path)
+                if not match or match and match.group(0) not in group_lists:
+                    for key, value in list(self._media_dict.items()):
+                        for subkey, msgs in list(value.items()):
+                            if len(msgs) > 1:
+                                await self._send_media_group(subkey, key, msgs)
+            if self._listener.hybrid_leech and self._listener.user_transmission:
+                self._user_session = item.user_session
+                if self._user_session:
+                    self._sent_msg = await TgClient.user.get_messages(
+                        chat_id=self._sent_msg.chat.id,
+                        message_ids=self._sent_msg.id,
+                    )
+                else:
+                    self._sent_msg = await self._listener.client.get_messages(
+                        chat_id=self._sent_msg.chat.id,
+                        message_ids=self._sent_msg.id,
+                    )
+            self._last_msg_in_group = False
+            self._last_uploaded = 0
+            if item.media is not None:
+                await self._send_staged(item)
+            else:
+                await self._upload_file(
+                    item.cap_mono,
+                    item.file,
+                    item.o_path,
+                    desc=item.desc,
+                    source=item.source,
+                )
+            if self._listener.is_cancelled:
+                return False
+            if (
+                not self._is_corrupted
+                and (self._listener.is_super_chat or self._listener.up_dest)
+                and not self._is_private
+            ):
+                self._msgs_dict[self._sent_msg.link] = item.file
+        except Exception as err:
+            if isinstance(err, RetryError):
+                LOGGER.info(f"Total Attempts: {err.last_attempt.attempt_number}")
+                err = err.last_attempt.exception()
+            LOGGER.error(f"{err}. Path: {self._up_path}")
+            self._error = str(err)
+            self._corrupted += 1
+            if self._listener.is_cancelled:
+                return False
+        if item.source is not None:
+            path = item.source[0] if item.last_part else None
+        else:
+            path = self._up_path
+        if (
+            path is not None
+            and not self._listener.is_cancelled
+            and await aiopath.exists(path)
+        ):
+            await remove(path)
+        if item.release is not None:
+            item.release()
+        return True
+
+    @staticmethod
+    def _open_document(path, source):
+        if source is None:
+            return path
+        return FilePart(*source, ospath.basename(path))
+
+    def _input_media(self, item, client):
+        desc = item.desc
+        if desc["key"] == "photos":
+            return raw.types.InputMediaUploadedPhoto(file=item.media)
+        file_name = ospath.basename(item.up_path)
+        attributes = [raw.types.DocumentAttributeFilename(file_name=file_name)]
+        mime_type = client.guess_mime_type(item.up_path)
+        if desc["key"] == "videos":
+            attributes.insert(
+                0,
+                raw.types.DocumentAttributeVideo(
+                    supports_streaming=True,
+                    duration=desc["duration"],
+                    w=desc["width"],
+                    h=desc["height"],
+                ),
+            )
+            mime_type = mime_type or "video/mp4"
+        elif desc["key"] == "audios":
+            attributes.insert(
+                0,
+                raw.types.DocumentAttributeAudio(
+                    duration=desc["duration"],
+                    performer=desc["artist"],
+                    title=desc["title"],
+                ),
+            )
+            mime_type = mime_type or "audio/mpeg"
+        return raw.types.InputMediaUploadedDocument(
+            mime_type=mime_type or "application/zip",
+            file=item.media,
+            thumb=item.thumb_media,
+            attributes=attributes,
+            force_file=desc["key"] == "documents" or None,
+        )
+
+    async def _send_staged(self, item):
+        client = TgClient.user if self._user_session else self._listener.client
+        while True:
+            try:
+                # A FloodWait penalizes the chat bucket, acquire waits it out
+                await message_dispatcher.acquire(self._sent_msg.chat.id)
+                if self._listener.is_cancelled:
+                    return
+                r = await client.invoke(
+                    raw.functions.messages.SendMedia(
+                        peer=await client.resolve_peer(self._sent_msg.chat.id),
+                        media=self._input_media(item, client),
+                        silent=True,
+                        reply_to=raw.types.InputReplyToMessage(
+                            reply_to_msg_id=self._sent_msg.id,
+                            top_msg_id=self._sent_msg.message_thread_id,
+                        ),
+                        random_id=client.rnd_id(),
+                        **await utils.parse_text_entities(
+                            client, item.cap_mono, None, None
+                        ),
+                    )
+                )
+                break
+            except (FloodWait, FloodPremiumWait) as f:
+                LOGGER.warning(str(f))
+                self._record_flood(f)
+            except BadRequest as err:
+                LOGGER.error(f"{err}. Retrying sequentially. Path: {self._up_path}")
+                return await self._upload_file(
+                    item.cap_mono,
+                    item.file,
+                    item.o_path,
+                    desc=item.desc,
+                    source=item.source,
+                )
+        users = {u.id: u for u in r.users}
+        chats = {c.id: c for c in r.chats}
+        for update in r.updates:
+            if isinstance(
+                update,
+                (raw.types.UpdateNewMessage, raw.types.UpdateNewChannelMessage),
+            ):
+                self._sent_msg = await Message._parse(
+                    client, update.message, users, chats
+                )
+                break
+        await self._register_media_group(item.o_path)
+        await self._remove_thumb(item.desc["thumb"])
+
+    async def _describe(self, up_path, file, force_document=False, source=None):
         if (
             self._thumb is not None
             and not await aiopath.exists(self._thumb)
@@ -331,94 +654,149 @@ class TelegramUploader:
         ):
             self._thumb = None
         thumb = self._thumb
+        desc = {
+            "key": "photos",
+            "duration": 0,
+            "width": 0,
+            "height": 0,
+            "artist": None,
+            "title": None,
+        }
+        if source is not None:
+            desc["key"] = "documents"
+            desc["thumb"] = None if thumb == "none" else thumb
+            return desc
+        is_video, is_audio, is_image = await get_document_type(up_path)
+
+        if not is_image and thumb is None:
+            file_name = ospath.splitext(file)[0]
+            thumb_path = f"{self._path}/yt-dlp-thumb/{file_name}.jpg"
+            if await aiopath.isfile(thumb_path):
+                thumb = thumb_path
+            elif await aiopath.isfile(thumb_path.replace("/yt-dlp-thumb", "")):
+                thumb = thumb_path.replace("/yt-dlp-thumb", "")
+            elif is_audio and not is_video:
+                thumb = await get_audio_thumbnail(up_path)
+
+        if (
+            self._listener.as_doc
+            or force_document
+            or (not is_video and not is_audio and not is_image)
+        ):
+            desc["key"] = "documents"
+            if is_video and thumb is None:
+                thumb = await get_video_thumbnail(up_path, None)
+        elif is_video:
+            desc["key"] = "videos"
+            desc["duration"] = (await get_media_info(up_path))[0]
+            if thumb is None and self._listener.thumbnail_layout:
+                thumb = await get_multiple_frames_thumbnail(
+                    up_path,
+                    self._listener.thumbnail_layout,
+                    self._listener.screen_shots,
+                )
+            if thumb is None:
+                thumb = await get_video_thumbnail(up_path, desc["duration"])
+            if thumb is not None and thumb != "none":
+                with Image.open(thumb) as img:
+                    desc["width"], desc["height"] = img.size
+            else:
+                desc["width"] = 480
+                desc["height"] = 320
+        elif is_audio:
+            desc["key"] = "audios"
+            (
+                desc["duration"],
+                desc["artist"],
+                desc["title"],
+            ) = await get_media_info(up_path)
+        desc["thumb"] = None if thumb == "none" or desc["key"] == "photos" else thumb
+        return desc
+
+    async def _register_media_group(self, o_path):
+        if (
+            not self._listener.is_cancelled
+            and self._media_group
+            and (self._sent_msg.video or self._sent_msg.document)
+        ):
+            key = "documents" if self._sent_msg.document else "videos"
+            if match := re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", o_path):
+                pname = match.group(0)
+                if pname in self._media_dict[key].keys():
+                    self._media_dict[key][pname].append(
+                        [self._sent_msg.chat.id, self._sent_msg.id]
+                    )
+                else:
+                    self._media_dict[key][pname] = [
+                        [self._sent_msg.chat.id, self._sent_msg.id]
+                    ]
+                msgs = self._media_dict[key][pname]
+                if len(msgs) == 10:
+                    await self._send_media_group(pname, key, msgs)
+                else:
+                    self._last_msg_in_group = True
+
+    @retry(
+        wait=wait_exponential(multiplier=2, min=4, max=8),
+        stop=stop_after_attempt(3),
+        retry=retry_if_exception_type(Exception),
+    )
+    async def _upload_file(
+        self, cap_mono, file, o_path, force_document=False, desc=None, source=None
+    ):
         self._is_corrupted = False
         try:
-            is_video, is_audio, is_image = await get_document_type(self._up_path)
-
-            if not is_image and thumb is None:
-                file_name = ospath.splitext(file)[0]
-                thumb_path = f"{self._path}/yt-dlp-thumb/{file_name}.jpg"
-                if await aiopath.isfile(thumb_path):
-                    thumb = thumb_path
-                elif await aiopath.isfile(thumb_path.replace("/yt-dlp-thumb", "")):
-                    thumb = thumb_path.replace("/yt-dlp-thumb", "")
-                elif is_audio and not is_video:
-                    thumb = await get_audio_thumbnail(self._up_path)
-
             if (
-                self._listener.as_doc
+                desc is None
                 or force_document
-                or (not is_video and not is_audio and not is_image)
+                and desc["key"] != "documents"
+                or desc["thumb"] is not None
+                and not await aiopath.exists(desc["thumb"])
             ):
-                key = "documents"
-                if is_video and thumb is None:
-                    thumb = await get_video_thumbnail(self._up_path, None)
-
-                if self._listener.is_cancelled:
-                    return
-                if thumb == "none":
-                    thumb = None
-                self._sent_msg = await self._sent_msg.reply_document(
-                    document=self._up_path,
-                    thumb=thumb,
-                    caption=cap_mono,
-                    force_document=True,
-                    disable_notification=True,
-                    progress=self._upload_progress,
-                )
-            elif is_video:
-                key = "videos"
-                duration = (await get_media_info(self._up_path))[0]
-                if thumb is None and self._listener.thumbnail_layout:
-                    thumb = await get_multiple_frames_thumbnail(
-                        self._up_path,
-                        self._listener.thumbnail_layout,
-                        self._listener.screen_shots,
+                desc = await self._describe(self._up_path, file, force_document, source)
+            thumb = desc["thumb"]
+            await message_dispatcher.acquire(self._sent_msg.chat.id)
+            if self._listener.is_cancelled:
+                return
+            if desc["key"] == "documents":
+                document = self._open_document(self._up_path, source)
+                try:
+                    self._sent_msg = await self._sent_msg.reply_document(
+                        document=document,
+                        thumb=thumb,
+                        caption=cap_mono,
+                        file_name=ospath.basename(self._up_path),
+                        force_document=True,
+                        disable_notification=True,
+                        progress=self._upload_progress,
                     )
-                if thumb is None:
-                    thumb = await get_video_thumbnail(self._up_path, duration)
-                if thumb is not None and thumb != "none":
-                    with Image.open(thumb) as img:
-                        width, height = img.size
-                else:
-                    width = 480
-                    height = 320
-                if self._listener.is_cancelled:
-                    return
-                if thumb == "none":
-                    thumb = None
+                finally:
+                    if source is not None:
+                        document.close()
+            elif desc["key"] == "videos":
                 self._sent_msg = await self._sent_msg.reply_video(
                     video=self._up_path,
                     caption=cap_mono,
-                    duration=duration,
-                    width=width,
-                    height=height,
+                    duration=desc["duration"],
+                    width=desc["width"],
+                    height=desc["height"],
                     thumb=thumb,
                     supports_streaming=True,
                     disable_notification=True,
                     progress=self._upload_progress,
                 )
-            elif is_audio:
-                key = "audios"
-                duration, artist, title = await get_media_info(self._up_path)
-                if self._listener.is_cancelled:
-                    return
-                if thumb == "none":
-                    thumb = None
+            elif desc["key"] == "audios":
                 self._sent_msg = await self._sent_msg.reply_audio(
                     audio=self._up_path,
                     caption=cap_mono,
-                    duration=duration,
-                    performer=artist,
-                    title=title,
+                    duration=desc["duration"],
+                    performer=desc["artist"],
+                    title=desc["title"],
                     thumb=thumb,
                     disable_notification=True,
                     progress=self._upload_progress,
                 )
             else:
-                key = "photos"
-                if self._listener.is_cancelled:
-                    return
                 self._sent_msg = await self._sent_msg.reply_photo(
                     photo=self._up_path,
                     caption=cap_mono,
@@ -426,56 +804,26 @@ class TelegramUploader:
                     progress=self._upload_progress,
                 )
 
-            if (
-                not self._listener.is_cancelled
-                and self._media_group
-                and (self._sent_msg.video or self._sent_msg.document)
-            ):
-                key = "documents" if self._sent_msg.document else "videos"
-                if match := re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", o_path):
-                    pname = match.group(0)
-                    if pname in self._media_dict[key].keys():
-                        self._media_dict[key][pname].append(
-                            [self._sent_msg.chat.id, self._sent_msg.id]
-                        )
-                    else:
-                        self._media_dict[key][pname] = [
-                            [self._sent_msg.chat.id, self._sent_msg.id]
-                        ]
-                    msgs = self._media_dict[key][pname]
-                    if len(msgs) == 10:
-                        await self._send_media_group(pname, key, msgs)
-                    else:
-                        self._last_msg_in_group = True
-
-            if (
-                self._thumb is None
-                and thumb is not None
-                and await aiopath.exists(thumb)
-            ):
-                await remove(thumb)
+            await self._register_media_group(o_path)
+            await self._remove_thumb(thumb)
         except (FloodWait, FloodPremiumWait) as f:
             LOGGER.warning(str(f))
-            await sleep(f.value * 1.3)
-            if (
-                self._thumb is None
-                and thumb is not None
-                and await aiopath.exists(thumb)
-            ):
-                await remove(thumb)
-            return await self._upload_file(cap_mono, file, o_path)
+            self._record_flood(f)
+            if desc is not None:
+                await self._remove_thumb(desc["thumb"])
+            return await self._upload_file(cap_mono, file, o_path, source=source)
         except Exception as err:
-            if (
-                self._thumb is None
-                and thumb is not None
-                and await aiopath.exists(thumb)
-            ):
-                await remove(thumb)
+            if desc is not None:
+                await self._remove_thumb(desc["thumb"])
             err_type = "RPCError: " if isinstance(err, RPCError) else ""
             LOGGER.error(f"{err_type}{err}. Path: {self._up_path}")
-            if isinstance(err, BadRequest) and key != "documents":
+            if isinstance(err, BadRequest) and (
+                desc is None or desc["key"] != "documents"
+            ):
                 LOGGER.error(f"Retrying As Document. Path: {self._up_path}")
-                return await self._upload_file(cap_mono, file, o_path, True)
+                return await self._upload_file(
+                    cap_mono, file, o_path, True, source=source
+                )
             raise err
 
     @property
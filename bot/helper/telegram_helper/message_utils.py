@@ -1,46 +1,53 @@
 from asyncio import sleep
+from functools import partial
 from pyrogram.errors import FloodWait, FloodPremiumWait
 from re import match as re_match
 from time import time
 
 from ... import LOGGER, status_dict, task_dict_lock, intervals, DOWNLOAD_DIR
 from ...core.config_manager import Config
+from ...core.telegram_dispatcher import Lane, message_dispatcher
 from ...core.telegram_manager import TgClient
 from ..ext_utils.bot_utils import SetInterval
 from ..ext_utils.exceptions import TgLinkException
-from ..ext_utils.status_utils import get_readable_message
+from ..ext_utils.status_utils import get_readable_message, get_task_snapshot
 
 
-async def send_message(message, text, buttons=None, block=True):
+async def send_message(message, text, buttons=None, block=True, lane=Lane.RESULT):
     try:
-        return await message.reply(
-            text=text,
-            disable_notification=True,
-            reply_markup=buttons,
+        return await message_dispatcher.submit(
+            message.chat.id,
+            partial(
+                message.reply,
+                text=text,
+                disable_notification=True,
+                reply_markup=buttons,
+            ),
+            lane,
+            block=block,
         )
-    except FloodWait as f:
-        LOGGER.warning(str(f))
-        if not block:
-            return str(f)
-        await sleep(f.value * 1.2)
-        return await send_message(message, text, buttons)
+    except (FloodWait, FloodPremiumWait) as f:
+        return str(f)
     except Exception as e:
         LOGGER.error(str(e))
         return str(e)
 
 
-async def edit_message(message, text, buttons=None, block=True):
+async def edit_message(message, text, buttons=None, block=True, lane=Lane.RESULT):
     try:
-        return await message.edit(
-            text=text,
-            reply_markup=buttons,
+        return await message_dispatcher.submit(
+            message.chat.id,
+            partial(
+                message.edit,
+                text=text,
+                reply_markup=buttons,
+            ),
+            lane,
+            key=(message.chat.id, message.id),
+            block=block,
         )
-    except FloodWait as f:
-        LOGGER.warning(str(f))
-        if not block:
-            return str(f)
-        await sleep(f.value * 1.2)
-        return await edit_message(message, text, buttons)
+    except (FloodWait, FloodPremiumWait) as f:
+        return str(f)
     except Exception as e:
         LOGGER.error(str(e))
         return str(e)
@@ -48,13 +55,15 @@ async def edit_message(message, text, buttons=None, block=True):
 
 async def send_file(message, file, caption=""):
     try:
-        return await message.reply_document(
-            document=file, caption=caption, disable_notification=True
+        return await message_dispatcher.submit(
+            message.chat.id,
+            partial(
+                message.reply_document,
+                document=file,
+                caption=caption,
+                disable_notification=True,
+            ),
         )
-    except FloodWait as f:
-        LOGGER.warning(str(f))
-        await sleep(f.value * 1.2)
-        return await send_file(message, file, caption)
     except Exception as e:
         LOGGER.error(str(e))
         return str(e)
@@ -63,16 +72,17 @@ async def send_file(message, file, caption=""):
 async def send_rss(text, chat_id, thread_id):
     try:
         app = TgClient.user or TgClient.bot
-        return await app.send_message(
-            chat_id=chat_id,
-            text=text,
-            message_thread_id=thread_id,
-            disable_notification=True,
+        return await message_dispatcher.submit(
+            chat_id,
+            partial(
+                app.send_message,
+                chat_id=chat_id,
+                text=text,
+                message_thread_id=thread_id,
+                disable_notification=True,
+            ),
+            Lane.RSS,
         )
-    except (FloodWait, FloodPremiumWait) as f:
-        LOGGER.warning(str(f))
-        await sleep(f.value * 1.2)
-        return await send_rss(text)
     except Exception as e:
         LOGGER.error(str(e))
         return str(e)
@@ -176,14 +186,19 @@ async def temp_download(msg):
     return await msg.download(file_name=f"{path}/")
 
 
+def _stop_status(sid):
+    status_dict.pop(sid, None)
+    if obj := intervals["status"].get(sid):
+        obj.cancel()
+        del intervals["status"][sid]
+
+
 async def update_status_message(sid, force=False):
     if intervals["stopAll"]:
         return
     async with task_dict_lock:
         if not status_dict.get(sid):
-            if obj := intervals["status"].get(sid):
-                obj.cancel()
-                del intervals["status"][sid]
+            _stop_status(sid)
             return
         if not force and time() - status_dict[sid]["time"] < 3:
             return
@@ -192,31 +207,35 @@ async def update_status_message(sid, force=False):
         status = status_dict[sid]["status"]
         is_user = status_dict[sid]["is_user"]
         page_step = status_dict[sid]["page_step"]
-        text, buttons = await get_readable_message(
-            sid, is_user, page_no, status, page_step
-        )
+    snapshot = await get_task_snapshot(0 if force else None)
+    text, buttons = await get_readable_message(
+        sid, is_user, page_no, status, page_step, snapshot
+    )
+    async with task_dict_lock:
+        if not (data := status_dict.get(sid)):
+            return
         if text is None:
-            del status_dict[sid]
-            if obj := intervals["status"].get(sid):
-                obj.cancel()
-                del intervals["status"][sid]
+            _stop_status(sid)
             return
-        if text != status_dict[sid]["message"].text:
-            message = await edit_message(
-                status_dict[sid]["message"], text, buttons, block=False
-            )
-            if isinstance(message, str):
+        text_hash = hash(text)
+        if text_hash == data.get("hash"):
+            return
+        data["hash"] = text_hash
+        status_message = data["message"]
+    message = await edit_message(
+        status_message, text, buttons, block=False, lane=Lane.STATUS
+    )
+    if isinstance(message, str):
+        async with task_dict_lock:
+            if (data := status_dict.get(sid)) and data["message"] is status_message:
+                data.pop("hash", None)
                 if message.startswith("Telegram says: [40"):
-                    del status_dict[sid]
-                    if obj := intervals["status"].get(sid):
-                        obj.cancel()
-                        del intervals["status"][sid]
-                else:
-                    LOGGER.error(
-                        f"Status with id: {sid} haven't been updated. Error: {message}"
-                    )
-                return
-            status_dict[sid]["message"].text = text
+                    _stop_status(sid)
+                    return
+        LOGGER.error(f"Status with id: {sid} haven't been updated. Error: {message}")
+        return
+    async with task_dict_lock:
+        if sid in status_dict:
             status_dict[sid]["time"] = time()
 
 
@@ -226,43 +245,35 @@ async def send_status_message(msg, user_id=0):
     sid = user_id or msg.chat.id
     is_user = bool(user_id)
     async with task_dict_lock:
-        if sid in status_dict:
-            page_no = status_dict[sid]["page_no"]
-            status = status_dict[sid]["status"]
-            page_step = status_dict[sid]["page_step"]
-            text, buttons = await get_readable_message(
-                sid, is_user, page_no, status, page_step
-            )
-            if text is None:
-                del status_dict[sid]
-                if obj := intervals["status"].get(sid):
-                    obj.cancel()
-                    del intervals["status"][sid]
-                return
-            old_message = status_dict[sid]["message"]
-            message = await send_message(msg, text, buttons, block=False)
-            if isinstance(message, str):
-                LOGGER.error(
-                    f"Status with id: {sid} haven't been sent. Error: {message}"
-                )
-                return
-            await delete_message(old_message)
-            message.text = text
-            status_dict[sid].update({"message": message, "time": time()})
+        if old_data := status_dict.get(sid):
+            page_no = old_data["page_no"]
+            status = old_data["status"]
+            page_step = old_data["page_step"]
+        else:
+            page_no, status, page_step = 1, "All", 1
+    snapshot = await get_task_snapshot(0)
+    text, buttons = await get_readable_message(
+        sid, is_user, page_no, status, page_step, snapshot
+    )
+    if text is None:
+        if old_data:
+            async with task_dict_lock:
+                _stop_status(sid)
+        return
+    message = await send_message(msg, text, buttons, block=False, lane=Lane.STATUS)
+    if isinstance(message, str):
+        LOGGER.error(f"Status with id: {sid} haven't been sent. Error: {message}")
+        return
+    async with task_dict_lock:
+        if old_data := status_dict.get(sid):
+            old_message = old_data["message"]
+            old_data.update({"message": message, "time": time(), "hash": hash(text)})
         else:
-            text, buttons = await get_readable_message(sid, is_user)
-            if text is None:
-                return
-            message = await send_message(msg, text, buttons, block=False)
-            if isinstance(message, str):
-                LOGGER.error(
-                    f"Status with id: {sid} haven't been sent. Error: {message}"
-                )
-                return
-            message.text = text
+            old_message = None
             status_dict[sid] = {
                 "message": message,
                 "time": time(),
+                "hash": hash(text),
                 "page_no": 1,
                 "page_step": 1,
                 "status": "All",
@@ -272,3 +283,5 @@ async def send_status_message(msg, user_id=0):
             intervals["status"][sid] = SetInterval(
                 Config.STATUS_UPDATE_INTERVAL, update_status_message, sid
             )
+    if old_message is not None:
+        await delete_message(old_message)
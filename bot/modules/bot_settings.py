@@ -59,6 +59,9 @@ state = "view"
 handler_dict = {}
 DEFAULT_VALUES = {
     "LEECH_SPLIT_SIZE": TgClient.MAX_SPLIT_SIZE,
+    "LEECH_PARALLEL_UPLOADS": 1,
+    "ARCHIVE_ENGINE": "7z",
+    "ARCHIVE_LEVEL": 0,
     "RSS_DELAY": 600,
     "STATUS_UPDATE_INTERVAL": 15,
     "SEARCH_LIMIT": 0,
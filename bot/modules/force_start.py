@@ -2,16 +2,13 @@ from .. import (
     task_dict,
     task_dict_lock,
     user_data,
-    queued_up,
-    queued_dl,
-    queue_dict_lock,
 )
 from ..core.config_manager import Config
 from ..helper.ext_utils.bot_utils import new_task
 from ..helper.ext_utils.status_utils import get_task_by_gid
 from ..helper.telegram_helper.bot_commands import BotCommands
 from ..helper.telegram_helper.message_utils import send_message
-from ..helper.ext_utils.task_manager import start_dl_from_queued, start_up_from_queued
+from ..helper.ext_utils.task_manager import queue_controller
 
 
 @new_task
@@ -53,31 +50,26 @@ By reply to task cmd:
         return
     listener = task.listener
     msg = ""
-    async with queue_dict_lock:
-        if status == "fu":
-            listener.force_upload = True
-            if listener.mid in queued_up:
-                await start_up_from_queued(listener.mid)
-                msg = "Task have been force started to upload!"
-            else:
-                msg = "Force upload enabled for this task!"
-        elif status == "fd":
-            listener.force_download = True
-            if listener.mid in queued_dl:
-                await start_dl_from_queued(listener.mid)
-                msg = "Task have been force started to download only!"
-            else:
-                msg = "This task not in download queue!"
+    if status == "fu":
+        listener.force_upload = True
+        if queue_controller.force(listener.mid, "up"):
+            msg = "Task have been force started to upload!"
         else:
-            listener.force_download = True
-            listener.force_upload = True
-            if listener.mid in queued_up:
-                await start_up_from_queued(listener.mid)
-                msg = "Task have been force started to upload!"
-            elif listener.mid in queued_dl:
-                await start_dl_from_queued(listener.mid)
-                msg = "Task have been force started to download and upload will start once download finish!"
-            else:
-                msg = "This task not in queue!"
+            msg = "Force upload enabled for this task!"
+    elif status == "fd":
+        listener.force_download = True
+        if queue_controller.force(listener.mid, "dl"):
+            msg = "Task have been force started to download only!"
+        else:
+            msg = "This task not in download queue!"
+    else:
+        listener.force_download = True
+        listener.force_upload = True
+        if queue_controller.force(listener.mid, "up"):
+            msg = "Task have been force started to upload!"
+        elif queue_controller.force(listener.mid, "dl"):
+            msg = "Task have been force started to download and upload will start once download finish!"
+        else:
+            msg = "This task not in queue!"
     if msg:
         await send_message(message, msg)
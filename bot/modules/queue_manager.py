@@ -5,6 +5,7 @@ from .. import task_dict, task_dict_lock, LOGGER
 from ..core.config_manager import Config
 from ..helper.ext_utils.bot_utils import new_task
 from ..helper.ext_utils.status_utils import get_task_by_gid, get_all_tasks, MirrorStatus
+from ..helper.ext_utils.task_manager import queue_controller
 from ..helper.telegram_helper.bot_commands import BotCommands
 from ..helper.telegram_helper.button_build import ButtonMaker
 from ..helper.telegram_helper.interactive_keyboards import InteractiveKeyboards
@@ -17,40 +18,12 @@ from ..helper.telegram_helper.message_utils import (
 
 # Queue manager state - stores task metadata
 queue_info = {}  # gid -> {"priority": int, "timeout": int, "paused": bool, "created_at": time}
+auto_paused = {}  # mid -> status object paused by the auto-pause monitor
 
 
-async def pause_all_tasks_auto():
+async def _pausable_tasks():
     async with task_dict_lock:
-        tasks = list(task_dict.values())
-    paused_count = 0
-    for task in tasks:
-        try:
-            obj = task.task()
-            if hasattr(obj, "pause"):
-                await obj.pause()
-                queue_info[task.gid()] = queue_info.get(task.gid(), {})
-                queue_info[task.gid()]["paused"] = True
-                paused_count += 1
-        except Exception:
-            continue
-    return paused_count, len(tasks)
-
-
-async def resume_all_tasks_auto():
-    async with task_dict_lock:
-        tasks = list(task_dict.values())
-    resumed_count = 0
-    for task in tasks:
-        try:
-            obj = task.task()
-            if hasattr(obj, "resume"):
-                await obj.resume()
-                queue_info[task.gid()] = queue_info.get(task.gid(), {})
-                queue_info[task.gid()]["paused"] = False
-                resumed_count += 1
-        except Exception:
-            continue
-    return resumed_count, len(tasks)
+        return [task for task in task_dict.values() if hasattr(task, "pause")]
 
 
 @new_task
@@ -223,20 +196,23 @@ async def set_priority(_, message):
             "Priority Levels:\n"
             "• <code>1</code> = ⬆️ High\n"
             "• <code>0</code> = ➡️ Normal\n"
-            "• <code>-1</code> = ⬇️ Low\n\n"
+            "• <code>-1</code> = ⬇️ Low\n"
+            "• <code>top</code> = ⏫ Start next\n\n"
             "<i>Modified by: justadi</i>"
         )
         return
     
     gid = msg[1]
-    try:
-        priority = int(msg[2])
-        if priority not in [-1, 0, 1]:
-            await send_message(message, "❌ <b>Invalid Priority!</b>\nMust be -1, 0, or 1")
+    bump = msg[2].lower() == "top"
+    if not bump:
+        try:
+            priority = int(msg[2])
+            if priority not in [-1, 0, 1]:
+                await send_message(message, "❌ <b>Invalid Priority!</b>\nMust be -1, 0, 1 or top")
+                return
+        except (ValueError, IndexError):
+            await send_message(message, "❌ <b>Error!</b> Invalid priority value")
             return
-    except (ValueError, IndexError):
-        await send_message(message, "❌ <b>Error!</b> Invalid priority value")
-        return
     
     task = await get_task_by_gid(gid)
     if task is None:
@@ -251,10 +227,18 @@ async def set_priority(_, message):
         await send_message(message, "❌ <b>Unauthorized!</b> This task is not for you!")
         return
     
-    queue_info[gid] = queue_info.get(gid, {})
-    queue_info[gid]["priority"] = priority
+    if bump:
+        if not queue_controller.bump(task.listener.mid):
+            await send_message(message, "⚠️ <b>Not Queued!</b>\nOnly queued tasks can be moved to the top.")
+            return
+        priority_text = "⏫ Start next"
+    else:
+        task.listener.priority = priority
+        queue_controller.set_priority(task.listener)
+        queue_info[gid] = queue_info.get(gid, {})
+        queue_info[gid]["priority"] = priority
+        priority_text = {-1: "⬇️ Low", 0: "➡️ Normal", 1: "⬆️ High"}[priority]
     
-    priority_text = {-1: "⬇️ Low", 0: "➡️ Normal", 1: "⬆️ High"}[priority]
     resp = await send_message(
         message,
         f"✅ <b>Priority Updated!</b>\n"
@@ -272,7 +256,19 @@ async def pause_all_queue(_, message):
         await send_message(message, "❌ <b>Owner Only!</b>\nThis command is only for the owner!")
         return
     
-    paused_count, total = await pause_all_tasks_auto()
+    tasks = await _pausable_tasks()
+    total = len(tasks)
+    paused_count = 0
+    for task in tasks:
+        try:
+            await task.pause()
+        except Exception as e:
+            LOGGER.error(f"Error pausing task {task.gid()}: {e}")
+            continue
+        # Manually paused tasks must not be resumed by the auto-pause monitor
+        auto_paused.pop(task.listener.mid, None)
+        queue_info.setdefault(task.gid(), {})["paused"] = True
+        paused_count += 1
     if total == 0:
         await send_message(message, "❌ <b>No Active Tasks!</b>")
         return
@@ -293,7 +289,20 @@ async def resume_all_queue(_, message):
         await send_message(message, "❌ <b>Owner Only!</b>\nThis command is only for the owner!")
         return
     
-    resumed_count, total = await resume_all_tasks_auto()
+    tasks = await _pausable_tasks()
+    total = len(tasks)
+    resumed_count = 0
+    # Take back what the auto-pause monitor was holding
+    auto_paused.clear()
+    queue_controller.pause(False)
+    for task in tasks:
+        try:
+            await task.resume()
+        except Exception as e:
+            LOGGER.error(f"Error resuming task {task.gid()}: {e}")
+            continue
+        queue_info.setdefault(task.gid(), {})["paused"] = False
+        resumed_count += 1
     if total == 0:
         await send_message(message, "❌ <b>No Active Tasks!</b>")
         return
@@ -4,15 +4,29 @@ from re import findall
 
 from apscheduler.triggers.interval import IntervalTrigger
 
-from .. import user_data, ui_settings, DOWNLOAD_DIR, LOGGER, scheduler
+from .. import (
+    user_data,
+    ui_settings,
+    task_dict,
+    task_dict_lock,
+    DOWNLOAD_DIR,
+    LOGGER,
+    scheduler,
+)
 from ..core.config_manager import Config
+from ..core.cpu_scheduler import cpu_scheduler
+from ..core.pressure_controller import PressureController
 from ..core.telegram_manager import TgClient
-from .queue_manager import pause_all_tasks_auto
+from ..core.torrent_manager import TorrentManager
+from .queue_manager import queue_info, auto_paused
 from ..helper.ext_utils.bot_utils import new_task
-from ..helper.ext_utils.status_utils import get_readable_file_size
+from ..helper.ext_utils.status_utils import get_readable_file_size, MirrorStatus
+from ..helper.ext_utils.task_manager import queue_controller, queue_priority
 from ..helper.telegram_helper.button_build import ButtonMaker
 from ..helper.telegram_helper.message_utils import send_message, edit_message
 
+pressure = PressureController()
+
 
 def _get_user_pref(user_id):
     prefs = user_data.get(user_id, {})
@@ -36,7 +50,9 @@ def _settings_message(user_id):
     text += "<b>Auto-Pause Thresholds</b>\n"
     text += f"• Enabled: {'Yes' if ap['enabled'] else 'No'}\n"
     text += f"• CPU: {ap['cpu']}% | RAM: {ap['ram']}% | Disk: {ap['disk']}%\n"
-    text += "\nUse /setalert cpu=85 ram=85 disk=90 on|off to update thresholds."
+    net = f"{ap['net']} MiB/s" if ap.get("net") else "Off"
+    text += f"• Bandwidth: {net}\n"
+    text += "\nUse /setalert cpu=85 ram=85 disk=90 net=50 on|off to update thresholds."
     return text
 
 
@@ -82,12 +98,15 @@ async def set_alerts(_, message):
     cpu = findall(r"cpu=(\d+)", text)
     ram = findall(r"ram=(\d+)", text)
     disk = findall(r"disk=(\d+)", text)
+    net = findall(r"net=(\d+)", text)
     if cpu:
         ui_settings["auto_pause"]["cpu"] = min(99, max(1, int(cpu[0])))
     if ram:
         ui_settings["auto_pause"]["ram"] = min(99, max(1, int(ram[0])))
     if disk:
         ui_settings["auto_pause"]["disk"] = min(99, max(1, int(disk[0])))
+    if net:
+        ui_settings["auto_pause"]["net"] = int(net[0])
 
     if " on" in text:
         ui_settings["auto_pause"]["enabled"] = True
@@ -97,7 +116,7 @@ async def set_alerts(_, message):
     ap = ui_settings["auto_pause"]
     await send_message(
         message,
-        f"✅ Auto-Pause settings updated.\nCPU: {ap['cpu']}% | RAM: {ap['ram']}% | Disk: {ap['disk']}%\nEnabled: {'Yes' if ap['enabled'] else 'No'}",
+        f"✅ Auto-Pause settings updated.\nCPU: {ap['cpu']}% | RAM: {ap['ram']}% | Disk: {ap['disk']}% | Bandwidth: {ap.get('net') or 'Off'}\nEnabled: {'Yes' if ap['enabled'] else 'No'}",
     )
 
 
@@ -129,37 +148,123 @@ async def settings_callback(_, query):
     await edit_message(query.message, _settings_message(user_id), _settings_buttons(user_id))
 
 
+async def _sample(ap):
+    readings = {
+        "cpu": cpu_percent(),
+        "ram": virtual_memory().percent,
+        "disk": disk_usage(DOWNLOAD_DIR).percent,
+    }
+    if ap.get("net"):
+        try:
+            download_speed, _ = await TorrentManager.overall_speed()
+            readings["net"] = download_speed / 1048576
+        except Exception as e:
+            LOGGER.error(f"Auto-Pause: {e}")
+    return readings
+
+
+def _task_priority(task):
+    return queue_priority(task.listener)
+
+
+async def _active_downloads():
+    async with task_dict_lock:
+        tasks = list(task_dict.values())
+    downloads = []
+    for task in tasks:
+        if task.listener.mid in auto_paused or not hasattr(task, "pause"):
+            continue
+        try:
+            if await task.status() == MirrorStatus.STATUS_DOWNLOAD:
+                downloads.append(task)
+        except Exception:
+            continue
+    return sorted(downloads, key=lambda t: (_task_priority(t), -t.listener.mid))
+
+
+async def _pause_downloads(count=None):
+    paused = 0
+    for task in (await _active_downloads())[:count]:
+        try:
+            await task.pause()
+        except Exception as e:
+            LOGGER.error(f"Auto-Pause: {e}")
+            continue
+        auto_paused[task.listener.mid] = task
+        queue_info.setdefault(task.gid(), {})["paused"] = True
+        LOGGER.info(f"Auto-Pause: paused {task.name()}")
+        paused += 1
+    return paused
+
+
+async def _resume_download():
+    async with task_dict_lock:
+        for mid in list(auto_paused):
+            if task_dict.get(mid) is not auto_paused[mid]:
+                del auto_paused[mid]
+    if not auto_paused:
+        return False
+    task = max(auto_paused.values(), key=lambda t: (_task_priority(t), -t.listener.mid))
+    del auto_paused[task.listener.mid]
+    try:
+        await task.resume()
+    except Exception as e:
+        LOGGER.error(f"Auto-Pause: {e}")
+        return True
+    queue_info.setdefault(task.gid(), {})["paused"] = False
+    LOGGER.info(f"Auto-Pause: resumed {task.name()}")
+    return True
+
+
+async def _notify(text):
+    try:
+        await TgClient.bot.send_message(Config.OWNER_ID, text)
+    except Exception as e:
+        LOGGER.error(str(e))
+
+
 async def auto_pause_monitor():
     ap = ui_settings.get("auto_pause", {})
     if not ap.get("enabled"):
+        if auto_paused or queue_controller.paused:
+            pressure.reset()
+            cpu_scheduler.throttle()
+            queue_controller.pause(False)
+            while await _resume_download():
+                pass
         return
 
-    now = time()
-    last_trigger = ap.get("last_trigger", 0)
-    if now - last_trigger < 300:
-        return
-
-    cpu = cpu_percent()
-    ram = virtual_memory().percent
-    disk = disk_usage(DOWNLOAD_DIR).percent
+    readings = await _sample(ap)
+    action = pressure.sample(
+        readings, {name: ap.get(name, 0) for name in ("cpu", "ram", "disk", "net")}
+    )
+    cpu_scheduler.throttle(max(1, cpu_scheduler.total // 2) if "cpu" in pressure.active else None)
 
-    if cpu >= ap.get("cpu", 90) or ram >= ap.get("ram", 90) or disk >= ap.get("disk", 95):
-        paused_count, total = await pause_all_tasks_auto()
-        ap["last_trigger"] = now
-        try:
-            await TgClient.bot.send_message(
-                Config.OWNER_ID,
-                f"⚠️ Auto-Pause Triggered!\nCPU: {cpu}% | RAM: {ram}% | Disk: {disk}%\nPaused: {paused_count}/{total} tasks.",
+    if action == "pause":
+        started = not queue_controller.paused
+        queue_controller.pause()
+        paused = await _pause_downloads(None if "disk" in pressure.active else 1)
+        now = time()
+        if (started or paused) and now - ap.get("last_trigger", 0) >= 300:
+            ap["last_trigger"] = now
+            levels = " | ".join(
+                f"{name.upper()}: {round(pressure.levels[name], 1)}"
+                for name in sorted(pressure.active)
             )
-        except Exception as e:
-            LOGGER.error(str(e))
+            await _notify(
+                f"⚠️ Auto-Pause Triggered!\n{levels}\nPaused: {len(auto_paused)} downloads, new downloads are held in queue."
+            )
+    elif action == "resume" and (auto_paused or queue_controller.paused):
+        if not await _resume_download():
+            queue_controller.pause(False)
+            await _notify("✅ Auto-Pause: pressure cleared, downloads resumed.")
 
 
 def init_ui_monitor():
     try:
         scheduler.add_job(
             auto_pause_monitor,
-            trigger=IntervalTrigger(seconds=60),
+            trigger=IntervalTrigger(seconds=10),
             id="ui_auto_pause",
             replace_existing=True,
         )
@@ -124,6 +124,7 @@ async def status_pages(_, query):
             "Archive": 0,
             "Extract": 0,
             "Split": 0,
+            "Join": 0,
             "QueueDl": 0,
             "QueueUp": 0,
             "Clone": 0,
@@ -157,6 +158,8 @@ async def status_pages(_, query):
                         tasks["Extract"] += 1
                     case MirrorStatus.STATUS_SPLIT:
                         tasks["Split"] += 1
+                    case MirrorStatus.STATUS_JOIN:
+                        tasks["Join"] += 1
                     case MirrorStatus.STATUS_QUEUEDL:
                         tasks["QueueDl"] += 1
                     case MirrorStatus.STATUS_QUEUEUP:
@@ -179,7 +182,7 @@ async def status_pages(_, query):
         msg = f"""<b>DL:</b> {tasks['Download']} | <b>UP:</b> {tasks['Upload']} | <b>SD:</b> {tasks['Seed']} | <b>AR:</b> {tasks['Archive']}
 <b>EX:</b> {tasks['Extract']} | <b>SP:</b> {tasks['Split']} | <b>QD:</b> {tasks['QueueDl']} | <b>QU:</b> {tasks['QueueUp']}
 <b>CL:</b> {tasks['Clone']} | <b>CK:</b> {tasks['CheckUp']} | <b>PA:</b> {tasks['Pause']} | <b>SV:</b> {tasks['SamVid']}
-<b>CM:</b> {tasks['ConvertMedia']} | <b>FF:</b> {tasks['FFmpeg']}
+<b>CM:</b> {tasks['ConvertMedia']} | <b>FF:</b> {tasks['FFmpeg']} | <b>JN:</b> {tasks['Join']}
 
 <b>ODLS:</b> {get_readable_file_size(dl_speed)}/s
 <b>OULS:</b> {get_readable_file_size(up_speed)}/s
@@ -96,7 +96,11 @@ UPSTREAM_BRANCH = "master"
 LEECH_SPLIT_SIZE = 0
 AS_DOCUMENT = False
 EQUAL_SPLITS = False
+LEECH_VIRTUAL_SPLIT = False  # Upload byte ranges of the original file instead of writing split parts
 MEDIA_GROUP = False
+LEECH_PARALLEL_UPLOADS = 1  # Files uploaded concurrently per leech task (1 = sequential)
+ARCHIVE_ENGINE = "7z"  # 7z (zip) or zstd (tar.zst streamed into split volumes, no password)
+ARCHIVE_LEVEL = 0  # Compression level: 0 stores (7z: 0-9, zstd: 1-19)
 USER_TRANSMISSION = False
 HYBRID_LEECH = False
 LEECH_FILENAME_PREFIX = ""
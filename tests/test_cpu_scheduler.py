@@ -0,0 +1,87 @@
+"""
+Test suite for the ffmpeg/7z CPU scheduler
+"""
+
+import asyncio
+
+import pytest
+
+from bot.core.cpu_scheduler import CpuScheduler
+
+
+def _scheduler(cpus):
+    scheduler = CpuScheduler(range(cpus))
+    scheduler._load = lambda: 0
+    return scheduler
+
+
+@pytest.mark.asyncio
+async def test_jobs_get_disjoint_cores():
+    scheduler = _scheduler(9)
+    assert scheduler.total == 8
+    heavy = await scheduler.acquire("convert")
+    light = await scheduler.acquire("thumbnail")
+    assert heavy.threads == 4
+    assert light.threads == 1
+    assert not set(heavy.cpus) & set(light.cpus)
+    assert 0 not in heavy.cpus + light.cpus
+    assert heavy.taskset() == ["taskset", "-c", heavy.cores]
+    scheduler.release(heavy)
+    scheduler.release(light)
+    assert scheduler.stats() == {"total": 8, "free": 8, "queued": 0}
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_queues_in_order():
+    scheduler = _scheduler(2)
+    first = await scheduler.acquire("convert", 2)
+    order = []
+
+    async def job(name):
+        async with scheduler.job("split") as slot:
+            order.append((name, slot.threads))
+
+    waiters = [asyncio.create_task(job(name)) for name in ("a", "b")]
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queued"] == 2
+    scheduler.release(first)
+    await asyncio.gather(*waiters)
+    assert order == [("a", 1), ("b", 1)]
+    assert scheduler.stats()["free"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_cores():
+    scheduler = _scheduler(2)
+    first = await scheduler.acquire("convert", 2)
+    waiter = asyncio.create_task(scheduler.acquire("thumbnail"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    scheduler.release(first)
+    assert scheduler.stats() == {"total": 2, "free": 2, "queued": 0}
+
+
+@pytest.mark.asyncio
+async def test_busy_machine_halves_grants():
+    scheduler = _scheduler(9)
+    scheduler._load = lambda: 20
+    slot = await scheduler.acquire("convert")
+    assert slot.threads == 2
+
+
+@pytest.mark.asyncio
+async def test_throttle_caps_grants_until_lifted():
+    scheduler = _scheduler(9)
+    scheduler.throttle(2)
+    first = await scheduler.acquire("convert")
+    assert first.threads == 2
+    waiter = asyncio.create_task(scheduler.acquire("thumbnail"))
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queued"] == 1
+    scheduler.throttle()
+    second = await waiter
+    assert second.threads == 1
+    scheduler.release(first)
+    scheduler.release(second)
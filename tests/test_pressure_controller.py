@@ -0,0 +1,36 @@
+"""
+Test suite for the auto-pause pressure controller
+"""
+
+from bot.core.pressure_controller import PressureController
+
+
+def test_single_spike_is_smoothed_out():
+    controller = PressureController()
+    assert controller.sample({"cpu": 50}, {"cpu": 90}, now=0) is None
+    assert controller.sample({"cpu": 100}, {"cpu": 90}, now=10) is None
+    assert controller.levels["cpu"] == 65
+    for now in range(20, 100, 10):
+        action = controller.sample({"cpu": 100}, {"cpu": 90}, now=now)
+    assert action == "pause"
+    assert controller.active == {"cpu"}
+
+
+def test_hysteresis_and_hold_before_resume():
+    controller = PressureController()
+    controller.sample({"disk": 96}, {"disk": 95}, now=0)
+    assert controller.active == {"disk"}
+    # Between the threshold and the band: still under pressure.
+    controller.levels["disk"] = 92
+    assert controller.sample({"disk": 92}, {"disk": 95}, now=10) == "pause"
+    assert controller.sample({"disk": 80}, {"disk": 95}, now=20) is None
+    controller.levels["disk"] = 80
+    assert controller.sample({"disk": 80}, {"disk": 95}, now=30) is None
+    assert controller.sample({"disk": 80}, {"disk": 95}, now=90) == "resume"
+
+
+def test_signals_without_threshold_never_pause():
+    controller = PressureController()
+    assert controller.sample({"net": 10**9}, {"net": 0}, now=0) is None
+    assert controller.levels["net"] == 10**9
+    assert controller.active == set()
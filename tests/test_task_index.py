@@ -0,0 +1,74 @@
+"""
+Test suite for the task_dict gid/tag index
+"""
+
+from bot.core.task_index import TaskDict
+
+
+class _Listener:
+    def __init__(self, mid):
+        self.mid = mid
+
+
+class _Status:
+    def __init__(self, mid, gid):
+        self.listener = _Listener(mid)
+        self._gid = gid
+
+    def gid(self):
+        if self._gid is None:
+            raise AttributeError("gid not known yet")
+        return self._gid
+
+
+def test_add_replace_remove_keeps_index_in_step():
+    tasks = TaskDict()
+    first = _Status(1, "aaa")
+    tasks[1] = first
+    assert tasks.get_by_gid("aaa") is first
+    assert tasks.get_by_tag("1") is first
+
+    second = _Status(1, "bbb")
+    tasks[1] = second
+    assert tasks.get_by_gid("aaa") is None
+    assert tasks.get_by_gid("bbb") is second
+
+    del tasks[1]
+    assert tasks.get_by_gid("bbb") is None
+    assert tasks.get_by_tag("1") is None
+
+
+def test_pop_and_clear_drop_index_entries():
+    tasks = TaskDict({1: _Status(1, "aaa"), 2: _Status(2, "bbb")})
+    tasks.pop(1)
+    assert tasks.get_by_gid("aaa") is None
+    assert tasks.get_by_gid("bbb") is not None
+    tasks.clear()
+    assert tasks.get_by_gid("bbb") is None
+
+
+def test_reindex_and_alias_for_changing_gids():
+    tasks = TaskDict()
+    status = _Status(7, None)
+    tasks[7] = status
+    assert tasks.get_by_tag(7) is status
+
+    status._gid = "hash12chars0"
+    tasks.reindex(status)
+    assert tasks.get_by_gid("hash12chars0") is status
+
+    tasks.alias("followed", status)
+    assert tasks.get_by_gid("followed") is status
+    assert tasks.get_by_gid("hash12chars0") is status
+
+
+def test_stale_status_is_not_reindexed():
+    tasks = TaskDict()
+    stale = _Status(3, "old")
+    tasks[3] = stale
+    tasks[3] = _Status(3, "new")
+    stale._gid = "other"
+    tasks.reindex(stale)
+    tasks.alias("x", stale)
+    assert tasks.get_by_gid("other") is None
+    assert tasks.get_by_gid("x") is None
@@ -0,0 +1,63 @@
+"""
+Test suite for the weighted-fair task queue
+"""
+
+from asyncio import Event
+
+from bot.core.task_queue import FairQueue
+
+
+def _queue(*tasks):
+    queue = FairQueue()
+    for mid, user_id, *rest in tasks:
+        queue.push(mid, Event(), user_id, *rest)
+    return queue
+
+
+def test_users_are_interleaved():
+    queue = _queue(*((mid, "bulk") for mid in range(1, 6)), (10, "other"))
+    assert queue.order()[:3] == [1, 10, 2]
+    queue.start(1).set()
+    queue.push(11, Event(), "late")
+    assert queue.order()[:3] == [10, 2, 11]
+    assert queue.stats()["users"] == {"bulk": 4, "other": 1, "late": 1}
+
+
+def test_priority_and_size_change_the_share():
+    queue = _queue(
+        *((mid, "user") for mid in range(1, 4)),
+        *((mid, "sudo", 1) for mid in range(10, 14)),
+    )
+    assert queue.order()[:4] == [10, 1, 11, 12]
+
+    queue = _queue((1, "a", 0, FairQueue.LARGE), (2, "b", 0, 1024))
+    assert queue.order() == [2, 1]
+
+
+def test_bump_move_and_remove():
+    queue = _queue(*((mid, "user") for mid in range(1, 5)))
+    assert queue.bump(4)
+    assert queue.order() == [4, 1, 2, 3]
+    assert queue.head() == 4
+    assert queue.move(4, 2)
+    assert queue.position(4) == 3
+    assert queue.set_priority(3, 3)
+    assert queue.order() == [1, 2, 3, 4]
+    del queue[1]
+    assert 1 not in queue
+    assert queue.order() == [2, 3, 4]
+    assert queue.head() == 2
+    assert not queue.bump(1)
+
+
+def test_head_follows_starts_and_aging():
+    queue = _queue((1, "a"), (2, "a"), (3, "b"))
+    queue._meta[2].queued_at -= 2 * FairQueue.AGING
+    queue._index(2)
+    assert queue.head() == 2
+    started = []
+    while (mid := queue.head()) is not None:
+        queue.start(mid)
+        started.append(mid)
+    assert started == [2, 1, 3]
+    assert not queue and queue.stats()["users"] == {}
@@ -0,0 +1,92 @@
+"""
+Test suite for the outbound Telegram dispatcher
+"""
+
+import asyncio
+
+import pytest
+from pyrogram.errors import FloodWait
+
+from bot.core.telegram_dispatcher import Lane, TelegramDispatcher, TokenBucket
+
+
+def test_token_bucket_backs_off_and_recovers():
+    bucket = TokenBucket(1, 3)
+    for _ in range(3):
+        assert bucket.wait_time() == 0
+        bucket.take()
+    assert bucket.wait_time() > 0
+
+    bucket.penalize(30)
+    assert bucket.rate == 0.5
+    assert bucket.wait_time() >= 29
+    for _ in range(20):
+        bucket.reward()
+    assert bucket.rate == 1
+
+
+@pytest.mark.asyncio
+async def test_pending_edits_are_coalesced():
+    dispatcher = TelegramDispatcher()
+    sent = []
+
+    def edit(text):
+        async def call():
+            sent.append(text)
+            return text
+
+        return call
+
+    # Drain the burst so that the edits below stay queued together.
+    dispatcher._bucket(1).tokens = 0
+    futures = [dispatcher.submit(1, edit(f"v{i}"), Lane.STATUS, key=(1, 10)) for i in range(5)]
+    results = await asyncio.gather(*futures)
+    assert sent == ["v4"]
+    assert results == ["v4"] * 5
+
+
+@pytest.mark.asyncio
+async def test_lanes_order_ready_jobs():
+    dispatcher = TelegramDispatcher()
+    order = []
+
+    def record(name):
+        async def call():
+            order.append(name)
+
+        return call
+
+    dispatcher._bucket(1).tokens = 0
+    futures = [
+        dispatcher.submit(1, record("rss"), Lane.RSS),
+        dispatcher.submit(1, record("status"), Lane.STATUS),
+        dispatcher.submit(1, record("result"), Lane.RESULT),
+    ]
+    dispatcher._bucket(1).rate = 100
+    await asyncio.gather(*futures)
+    assert order == ["result", "status", "rss"]
+
+
+@pytest.mark.asyncio
+async def test_non_blocking_calls_fail_fast_while_banned():
+    dispatcher = TelegramDispatcher()
+    dispatcher.flood(-100, 60)
+
+    async def call():
+        return "sent"
+
+    with pytest.raises(FloodWait):
+        await dispatcher.submit(-100, call, Lane.STATUS, block=False)
+    other = await dispatcher.submit(-200, call, Lane.STATUS, block=False)
+    assert other == "sent"
+
+
+def test_idle_buckets_are_pruned():
+    dispatcher = TelegramDispatcher()
+    dispatcher._bucket(1)
+    dispatcher._bucket(-100).take()
+    dispatcher.flood(2, 2 * dispatcher.PRUNE_INTERVAL)
+    dispatcher._prune(dispatcher._pruned + 1)
+    assert set(dispatcher._chats) == {1, -100, 2}
+    dispatcher._prune(dispatcher._pruned + dispatcher.PRUNE_INTERVAL)
+    assert set(dispatcher._chats) == {2}
@@ -0,0 +1,53 @@
+"""
+Test suite for the content-addressed thumbnail cache
+"""
+
+from bot.core.thumbnail_manager import ThumbnailCache
+
+
+def _thumb(cache, key, size=10):
+    path = cache.path_for(key)
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_same_content_under_another_path_hits(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / "cache"))
+    first = tmp_path / "task1" / "video.mkv"
+    second = tmp_path / "task2" / "renamed.mkv"
+    for path in (first, second):
+        path.parent.mkdir()
+        path.write_bytes(b"frame" * 100000)
+
+    key = cache.key(str(first), (320, 180))
+    cache.set(key, str(first), _thumb(cache, key))
+    assert cache.key(str(second), (320, 180)) == key
+    assert cache.get(key) == cache.path_for(key)
+    assert cache.key(str(second), (320, 320)) != key
+
+
+def test_lru_is_bounded_by_entries_and_bytes(tmp_path):
+    cache = ThumbnailCache(str(tmp_path), max_entries=2, max_bytes=25)
+    for key in ("a", "b"):
+        cache.set(key, key, _thumb(cache, key))
+    assert cache.get("a") is not None
+    cache.set("c", "c", _thumb(cache, "c"))
+    assert cache.get("b") is None
+    assert not cache.path_for("b").exists()
+
+    cache.set("d", "d", _thumb(cache, "d", 20))
+    assert list(cache.entries) == ["d"]
+    assert cache.total_bytes == 20
+
+
+def test_index_is_flushed_in_batches_and_reloaded(tmp_path):
+    cache = ThumbnailCache(str(tmp_path))
+    cache.set("a", "src", _thumb(cache, "a"))
+    assert not cache.log_file.exists()
+    cache.flush()
+
+    reloaded = ThumbnailCache(str(tmp_path))
+    assert reloaded.get("a") == cache.path_for("a")
+    reloaded.invalidate("src")
+    assert not cache.path_for("a").exists()
+    assert ThumbnailCache(str(tmp_path)).entries == {}
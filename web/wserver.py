@@ -17,6 +17,8 @@ from aiohttp.client_exceptions import ClientError
 from aioqbt.exc import AQError
 
 from web.nodes import extract_file_ids, make_tree
+from bot.core.aria2_snapshot import Aria2Snapshot
+from bot.core.qbit_mirror import QbittorrentMirror
 
 try:
     from bot.core.api_endpoints import add_enhanced_endpoints
@@ -49,7 +51,9 @@ getLogger("httpx").setLevel(WARNING)
 getLogger("aiohttp").setLevel(WARNING)
 
 aria2 = None
+aria2_snapshot = None
 qbittorrent = None
+qbit_mirror = None
 sabnzbd_client = SabnzbdClient(
     host="http://localhost",
     api_key="mltb",
@@ -59,7 +63,7 @@ sabnzbd_client = SabnzbdClient(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global aria2, qbittorrent
+    global aria2, aria2_snapshot, qbittorrent, qbit_mirror
     aria2_host = environ.get("ARIA2_HOST", "localhost")
     aria2_port = environ.get("ARIA2_PORT", "6800")
     qb_host = environ.get("QB_HOST", "localhost")
@@ -67,6 +71,7 @@ async def lifespan(app: FastAPI):
     
     try:
         aria2 = Aria2HttpClient(f"http://{aria2_host}:{aria2_port}/jsonrpc")
+        aria2_snapshot = Aria2Snapshot(aria2, max_age=2)
     except Exception as e:
         aria2 = None
         LOGGER.warning(f"Aria2 not available: {e}")
@@ -77,6 +82,7 @@ async def lifespan(app: FastAPI):
             username="admin",
             password="mltbmltb",
         )
+        qbit_mirror = QbittorrentMirror(qbittorrent, max_age=2)
     except Exception as e:
         qbittorrent = None
         LOGGER.warning(f"qBittorrent not available: {e}")
@@ -207,11 +213,11 @@ def _map_status(raw_status: str):
 
 async def _collect_aria2_tasks():
     tasks = []
-    if not aria2:
+    if not aria2_snapshot:
         return tasks
     try:
-        active = await aria2.tellActive()
-        for item in active:
+        await aria2_snapshot.refresh()
+        for item in aria2_snapshot.downloads("active"):
             total = _to_int(item.get("totalLength", 0))
             completed = _to_int(item.get("completedLength", 0))
             progress = (completed / total * 100) if total > 0 else 0
@@ -236,11 +242,11 @@ async def _collect_aria2_tasks():
 
 async def _collect_qbittorrent_tasks():
     tasks = []
-    if not qbittorrent:
+    if qbit_mirror is None:
         return tasks
     try:
-        torrents = await qbittorrent.torrents.info()
-        for item in torrents:
+        await qbit_mirror.refresh()
+        for item in qbit_mirror.torrents():
             total = _to_int(_safe_get(item, "size", 0))
             completed = _to_int(_safe_get(item, "downloaded", 0))
             progress = _safe_get(item, "progress", 0) * 100
@@ -277,9 +283,9 @@ async def dashboard_stats():
         if aria2:
             global_stats = await aria2.getGlobalStat()
             total_speed += _to_int(global_stats.get("downloadSpeed", 0))
-        if qbittorrent:
-            transfer = await qbittorrent.transfer.info()
-            total_speed += _to_int(_safe_get(transfer, "dl_info_speed", 0))
+        if qbit_mirror is not None:
+            await qbit_mirror.refresh()
+            total_speed += _to_int(qbit_mirror.server_state.get("dl_info_speed", 0))
     except Exception as e:
         LOGGER.error(f"Dashboard stats error: {e}")
 